@@ -0,0 +1,89 @@
+import argparse
+import sys
+
+from benchmarks.corpus import DEFAULT_MIX, adversarial_corpus, generate_corpus
+from benchmarks.runner import (
+    BENCHMARKS,
+    compare,
+    format_table,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for item in value.split(","):
+        kind, _, weight = item.partition("=")
+        if kind not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown block kind: {kind}")
+        mix[kind] = float(weight)
+    return mix
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog="benchmarks", description="Time the parser, converter and renderer."
+    )
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument(
+        "--size", type=int, default=20000, help="characters per document"
+    )
+    parser.add_argument(
+        "--inline-density",
+        type=float,
+        default=0.1,
+        help="share of words turned into inline elements",
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=None,
+        help="block weights, e.g. paragraph=6,code=1,quote=1",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--adversarial",
+        action="store_true",
+        help="time pathological one-line inputs of --size characters instead",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run"
+    )
+    parser.add_argument("--json", help="write the results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.1,
+        help="tolerated slowdown against the baseline, as a fraction",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.adversarial:
+        corpus = list(adversarial_corpus(args.size).values())
+    else:
+        corpus = generate_corpus(
+            args.documents, args.size, args.inline_density, args.mix, args.seed
+        )
+    results = run_benchmarks(corpus, args.only, args.repeat)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.max_regression)
+
+    print(format_table(results))
+    if args.json:
+        save_results(results, args.json)
+    if regressions:
+        print(f"Regressed: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import random
+
+WORDS = (
+    "the",
+    "ring",
+    "of",
+    "power",
+    "was",
+    "forged",
+    "in",
+    "the",
+    "fires",
+    "of",
+    "mount",
+    "doom",
+    "by",
+    "sauron",
+    "while",
+    "elves",
+    "dwarves",
+    "and",
+    "men",
+    "wandered",
+    "middle",
+    "earth",
+    "seeking",
+    "lost",
+    "lore",
+    "hobbits",
+    "lived",
+    "quietly",
+    "in",
+    "the",
+    "shire",
+    "until",
+    "a",
+    "wizard",
+    "came",
+    "knocking",
+)
+
+DEFAULT_MIX = {
+    "paragraph": 6,
+    "heading": 2,
+    "unordered_list": 2,
+    "ordered_list": 1,
+    "quote": 1,
+    "code": 1,
+}
+
+
+class CorpusGenerator:
+    """
+    A seeded generator of synthetic markdown documents.
+
+    Documents are made of blocks chosen by weight from the mix. Within text, each
+    word is replaced by an inline element (bold, italic, code, link or image) with
+    probability inline_density.
+    """
+
+    def __init__(
+        self, seed: int = 0, inline_density: float = 0.1, mix: dict | None = None
+    ):
+        """
+        Initialize the CorpusGenerator.
+
+        :param seed: An integer seeding the random generator, so corpora are reproducible.
+        :param inline_density: A float between 0 and 1, the share of words turned into inline elements.
+        :param mix: A dictionary mapping block kinds (see DEFAULT_MIX) to relative weights.
+        """
+        self.random = random.Random(seed)
+        self.inline_density = inline_density
+        self.mix = mix if mix is not None else DEFAULT_MIX
+        self.kinds = list(self.mix)
+        self.weights = [self.mix[kind] for kind in self.kinds]
+
+    def words(self, count: int) -> list[str]:
+        return [self.random.choice(WORDS) for _ in range(count)]
+
+    def inline_text(self, count: int) -> str:
+        parts = []
+        for word in self.words(count):
+            if self.random.random() >= self.inline_density:
+                parts.append(word)
+                continue
+            match self.random.randrange(5):
+                case 0:
+                    parts.append(f"**{word}**")
+                case 1:
+                    parts.append(f"_{word}_")
+                case 2:
+                    parts.append(f"`{word}`")
+                case 3:
+                    parts.append(f"[{word}](https://example.com/{word})")
+                case _:
+                    parts.append(f"![{word}](/images/{word}.png)")
+        return " ".join(parts)
+
+    def block(self, kind: str) -> str:
+        match kind:
+            case "heading":
+                return "#" * self.random.randint(1, 6) + " " + self.inline_text(6)
+            case "unordered_list":
+                items = self.random.randint(2, 8)
+                return "\n".join(f"- {self.inline_text(10)}" for _ in range(items))
+            case "ordered_list":
+                items = self.random.randint(2, 8)
+                return "\n".join(
+                    f"{i}. {self.inline_text(10)}" for i in range(1, items + 1)
+                )
+            case "quote":
+                lines = self.random.randint(1, 4)
+                return "\n".join(f"> {self.inline_text(12)}" for _ in range(lines))
+            case "code":
+                lines = self.random.randint(2, 12)
+                body = "\n".join("    " + " ".join(self.words(6)) for _ in range(lines))
+                return f"```\n{body}\n```"
+            case _:
+                lines = self.random.randint(1, 5)
+                return "\n".join(self.inline_text(14) for _ in range(lines))
+
+    def document(self, size: int) -> str:
+        """Generates a document of roughly size characters.
+
+        Args:
+            size (int): approximate length of the document in characters
+
+        Returns:
+            str: the markdown document, starting with a title heading
+        """
+        blocks = [f"# {' '.join(self.words(5))}"]
+        length = len(blocks[0])
+        while length < size:
+            kind = self.random.choices(self.kinds, self.weights)[0]
+            block = self.block(kind)
+            blocks.append(block)
+            length += len(block) + 2
+        return "\n\n".join(blocks)
+
+
+def generate_corpus(
+    documents: int = 20,
+    size: int = 20000,
+    inline_density: float = 0.1,
+    mix: dict | None = None,
+    seed: int = 0,
+) -> list[str]:
+    """Generates a reproducible list of synthetic markdown documents.
+
+    Args:
+        documents (int): number of documents
+        size (int): approximate length of each document in characters
+        inline_density (float): share of words turned into inline elements
+        mix (dict | None): block kinds mapped to relative weights, DEFAULT_MIX if None
+        seed (int): seed of the random generator
+
+    Returns:
+        list: the markdown documents
+    """
+    generator = CorpusGenerator(seed, inline_density, mix)
+    return [generator.document(size) for _ in range(documents)]
+
+
+ADVERSARIAL_CASES = {
+    "brackets": "[",
+    "image_opens": "![",
+    "unclosed_urls": "[a](",
+    "closed_labels": "[a]",
+    "nested_images": "![a[b](c)",
+    "images_with_links": "![x [y](z) w](v) ",
+    "spread_bold": "**a ",
+    "italics": "_a_ ",
+    "paragraph": "the ring of [power](/power) was **forged** in `fire` ",
+}
+
+
+def adversarial_corpus(size: int = 200000) -> dict[str, str]:
+    """Builds single-paragraph inputs that are slow for a parser that rescans its text.
+
+    Each case repeats a short unit, e.g. a run of `[` that never closes or images whose
+    labels hold links, up to about size characters on one line. A parser that looks for
+    the end of every opener from scratch takes quadratic time on most of them.
+
+    Args:
+        size (int): approximate length of each input in characters
+
+    Returns:
+        dict: the case names mapped to their input
+    """
+    corpus = {}
+    for name, unit in ADVERSARIAL_CASES.items():
+        text = unit * (size // len(unit) + 1)
+        if text.count("**") % 2:
+            # close the last bold span, an unbalanced delimiter is a parse error
+            text += "**"
+        corpus[name] = text
+    return corpus
@@ -0,0 +1,159 @@
+import json
+import platform
+import statistics
+import time
+
+from markdown.blocks import BlockType, lex_blocks
+from markdown.converter import markdown_to_html, markdown_to_html_node
+from markdown.parser import text_to_text_nodes
+
+
+def _inline_texts(corpus: list[str]) -> list[str]:
+    texts = []
+    for document in corpus:
+        for block_type, start, end in lex_blocks(document):
+            if block_type != BlockType.CODE:
+                texts.append(document[start:end].replace("\n", " "))
+    return texts
+
+
+def setup_blocks(corpus: list[str]):
+    return lambda: [list(lex_blocks(document)) for document in corpus]
+
+
+def setup_inline(corpus: list[str]):
+    texts = _inline_texts(corpus)
+    return lambda: [text_to_text_nodes(text) for text in texts]
+
+
+def setup_convert(corpus: list[str]):
+    return lambda: [markdown_to_html_node(document) for document in corpus]
+
+
+def setup_render(corpus: list[str]):
+    trees = [markdown_to_html_node(document) for document in corpus]
+    return lambda: [tree.to_html() for tree in trees]
+
+
+def setup_page(corpus: list[str]):
+    return lambda: [markdown_to_html_node(document).to_html() for document in corpus]
+
+
+def setup_fused(corpus: list[str]):
+    return lambda: [markdown_to_html(document) for document in corpus]
+
+
+BENCHMARKS = {
+    "blocks": setup_blocks,
+    "inline": setup_inline,
+    "convert": setup_convert,
+    "render": setup_render,
+    "page": setup_page,
+    "fused": setup_fused,
+}
+
+
+def time_benchmark(run, repeat: int) -> list[float]:
+    """Times repeated calls of a benchmark.
+
+    Args:
+        run (callable): the benchmark body, processing the whole corpus once
+        repeat (int): number of timed calls
+
+    Returns:
+        list: wall-clock seconds of each call
+    """
+    run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_benchmarks(
+    corpus: list[str], names: list[str] | None = None, repeat: int = 5
+) -> dict:
+    """Runs the selected benchmarks over a corpus.
+
+    Args:
+        corpus (list): markdown documents to process
+        names (list | None): benchmarks to run, all of BENCHMARKS if None
+        repeat (int): number of timed runs per benchmark
+
+    Returns:
+        dict: machine-readable results, with environment metadata and per-benchmark timings
+    """
+    corpus_bytes = sum(len(document.encode()) for document in corpus)
+    results = {}
+    for name in names or BENCHMARKS:
+        timings = time_benchmark(BENCHMARKS[name](corpus), repeat)
+        best = min(timings)
+        results[name] = {
+            "min": best,
+            "median": statistics.median(timings),
+            "mb_per_s": corpus_bytes / best / 1e6 if best else None,
+            "timings": timings,
+        }
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "documents": len(corpus),
+            "corpus_bytes": corpus_bytes,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Compares results against a baseline and lists the regressed benchmarks.
+
+    A benchmark regresses when its best time exceeds the baseline's best time by more
+    than max_regression, a fraction (0.1 means 10% slower).
+
+    Args:
+        results (dict): results as returned by run_benchmarks
+        baseline (dict): results of an earlier run, e.g. loaded from JSON
+        max_regression (float): tolerated slowdown as a fraction
+
+    Returns:
+        list: names of the benchmarks that regressed
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        ratio = result["min"] / previous["min"]
+        result["baseline_ratio"] = ratio
+        if ratio > 1 + max_regression:
+            regressions.append(name)
+    return regressions
+
+
+def format_table(results: dict) -> str:
+    lines = [
+        f"{'benchmark':<12}{'min (ms)':>12}{'median (ms)':>14}{'MB/s':>10}{'vs base':>10}"
+    ]
+    for name, result in results["results"].items():
+        ratio = result.get("baseline_ratio")
+        lines.append(
+            f"{name:<12}{result['min'] * 1000:>12.2f}{result['median'] * 1000:>14.2f}"
+            f"{result['mb_per_s'] or 0:>10.2f}"
+            f"{f'{ratio:.2f}x' if ratio is not None else '-':>10}"
+        )
+    return "\n".join(lines)
+
+
+def load_results(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_results(results: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
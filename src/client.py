@@ -0,0 +1,59 @@
+import argparse
+import sys
+
+from utils.client import DEFAULT_SOCKET, send_request
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Ask a build daemon started with main.py --serve to build the site."
+    )
+    parser.add_argument(
+        "command",
+        choices=["build", "rebuild", "status", "stop"],
+        help="build whatever changed, rebuild the given paths, report status or stop the daemon",
+    )
+    parser.add_argument("paths", nargs="*", help="changed files, for rebuild")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="the daemon's socket")
+    parser.add_argument(
+        "--timeout", type=float, default=None, help="seconds to wait for the daemon"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    request = {"command": args.command}
+    if args.command == "rebuild":
+        request["changes"] = args.paths
+    try:
+        response = send_request(request, args.socket, args.timeout)
+    except OSError as error:
+        print(
+            f"No build daemon answered on {args.socket} ({error}); "
+            "start one with python3 src/main.py --serve",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+
+    if "error" in response:
+        print(f"Error: {response['error']}", file=sys.stderr)
+        sys.exit(1)
+    if args.command == "status":
+        print(f"{response['builds']} builds served, {response['files']} files tracked")
+        if response["cache"]:
+            print(response["cache"])
+    elif args.command in ("build", "rebuild"):
+        for path in response["touched"]:
+            print(path)
+        for source, error in response["failures"]:
+            print(f"Failed to generate {source}: {error}", file=sys.stderr)
+        print(
+            f"Rebuilt {len(response['touched'])} files in {response['elapsed_ms']:.0f} ms"
+        )
+    if not response["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,359 @@
-import sys
-from utils.helpers import generate_pages_recursive, source_to_destination
+import argparse
+import os
+import shutil
+import threading
+import time
+
+from utils.builder import SiteBuilder
+from utils.cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MEMORY_BYTES,
+    ParseCache,
+)
+from utils.client import DEFAULT_SOCKET
+from utils.compress import (
+    DEFAULT_CODECS,
+    DEFAULT_MIN_BYTES,
+    parse_codecs,
+    update_siblings,
+)
+from utils.daemon import BuildDaemon
+from utils.devserver import DEFAULT_PORT, DevServer, DevSite
+from utils.helpers import generate_pages
+from utils.listing import DEFAULT_PAGE_SIZE, build_listing, remove_stale_listings
+from utils.manifest import BuildManifest
+from utils.output import CHANGES_PATH, OutputChanges, snapshot_outputs
+from utils.parallel import default_jobs, generate_pages_parallel
+from utils.pipeline import generate_pages_pipeline
+from utils.plan import BuildPlan
+from utils.profiler import NULL_PROFILER, Profiler
+from utils.sync import sync_directory
+from utils.watch import create_watcher, watch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the static site into docs/.")
+    parser.add_argument(
+        "basepath", nargs="?", default="/", help="prefix for absolute links"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        nargs="?",
+        const=default_jobs(),
+        default=1,
+        help="generate pages in N worker processes (all cores if N is omitted)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="read, render and write pages in overlapping stages, rendering in -j workers",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=int,
+        default=64,
+        metavar="MB",
+        help="pages in flight in the --pipeline stages before reading is paused",
+    )
+    parser.add_argument(
+        "--listing",
+        nargs="?",
+        const="blog",
+        metavar="SECTION",
+        help="generate a paginated, newest-first listing of content/SECTION (blog if omitted), kept up to date by --watch, --serve and --dev; building without it deletes the listing pages of an earlier build",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        metavar="N",
+        help="number of posts per --listing page",
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="delete docs/ and rebuild every asset and page from scratch",
+    )
+    parser.add_argument(
+        "--compress",
+        type=parse_codecs,
+        nargs="?",
+        const=DEFAULT_CODECS,
+        metavar="CODECS",
+        help="after building, write compressed siblings of text outputs, e.g. gz,xz (gz if omitted); building without it deletes the siblings of changed outputs",
+    )
+    parser.add_argument(
+        "--compress-min-bytes",
+        type=int,
+        default=DEFAULT_MIN_BYTES,
+        metavar="N",
+        help="smallest output size given compressed siblings",
+    )
+    parser.add_argument(
+        "--changes",
+        default=CHANGES_PATH,
+        metavar="PATH",
+        help=f"where to write the JSON list of outputs added, changed and removed (default {CHANGES_PATH})",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static assets by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time each build phase and page and print a summary",
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="PATH",
+        help="write the profile as JSON to PATH (implies --profile)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="number of slowest pages to report",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="after building, rebuild whatever content/, static/ or template.html change",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="watch by polling instead of inotify, in --watch and --dev",
+    )
+    parser.add_argument(
+        "--serve",
+        nargs="?",
+        const=DEFAULT_SOCKET,
+        metavar="SOCKET",
+        help=f"keep building on requests from src/client.py, over a Unix socket ({DEFAULT_SOCKET} if omitted)",
+    )
+    parser.add_argument(
+        "--dev",
+        type=int,
+        nargs="?",
+        const=DEFAULT_PORT,
+        metavar="PORT",
+        help=f"serve pages rendered in memory on localhost:PORT ({DEFAULT_PORT} if omitted), reloading browsers on edits, without writing docs/",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="parse every generated page instead of reusing cached renders",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        metavar="MB",
+        help="size the parse cache is pruned to after each build",
+    )
+    return parser.parse_args()
 
 
 def main():
-    basepath = sys.argv[1] if sys.argv[1] else "/"
+    args = parse_args()
+    basepath = args.basepath if args.basepath else "/"
+    profiling = args.profile or args.profile_json is not None
+    profiler = Profiler() if profiling else NULL_PROFILER
+    if args.dev is not None:
+        serve_dev(basepath, args.dev, args.poll, args.listing, args.page_size)
+        return
+
+    cache = None if args.no_cache else ParseCache(max_bytes=args.cache_size << 20)
+
+    manifest = BuildManifest.load()
+    outputs = snapshot_outputs("docs")
+    if args.clean:
+        manifest = BuildManifest(manifest.path)
+        if os.path.exists("docs"):
+            shutil.rmtree("docs")
+
+    if args.serve:
+        serve_site(site_builder(args, basepath, manifest, cache), args.serve)
+        return
+
+    with profiler.phase("plan"):
+        plan = BuildPlan.scan("content", "static", "docs")
+    print(plan.summary())
+
+    with profiler.phase("copy"):
+        synced = sync_directory(
+            "static", "docs", manifest.assets, args.checksum, plan.assets
+        )
+    manifest.assets = synced.owned
+    print(
+        f"Copied {len(synced.copied)} assets, deleted {len(synced.deleted)}, "
+        f"{len(synced.unchanged)} unchanged"
+    )
+
+    try:
+        with profiler.phase("pages"):
+            pages = plan.page_pairs()
+            if args.pipeline:
+                generate_pages_pipeline(
+                    pages,
+                    "template.html",
+                    basepath,
+                    args.jobs,
+                    manifest,
+                    cache=cache,
+                    static_dir="static",
+                    max_bytes=args.max_memory << 20,
+                    sizes=plan.page_sizes(),
+                    profiler=profiler if profiling else None,
+                )
+            elif args.jobs > 1:
+                generate_pages_parallel(
+                    pages,
+                    "template.html",
+                    basepath,
+                    args.jobs,
+                    manifest,
+                    profiler=profiler if profiling else None,
+                    cache=cache,
+                    static_dir="static",
+                    sizes=plan.page_sizes(),
+                )
+            else:
+                generate_pages(
+                    pages,
+                    "template.html",
+                    basepath,
+                    manifest,
+                    profiler=profiler if profiling else None,
+                    cache=cache,
+                    static_dir="static",
+                )
+        if args.listing:
+            with profiler.phase("listing"):
+                build_listing(
+                    plan.pages,
+                    args.listing,
+                    "content",
+                    "template.html",
+                    "docs",
+                    basepath,
+                    args.page_size,
+                    manifest,
+                )
+        else:
+            remove_stale_listings(manifest, "docs")
+    finally:
+        manifest.save()
+    print(f"Generated {manifest.generated} pages, skipped {manifest.skipped} unchanged")
+    with profiler.phase("compress"):
+        compressed = update_siblings(
+            "docs", args.compress or (), args.compress_min_bytes, args.jobs
+        )
+    if args.compress or compressed.removed:
+        print(compressed.summary())
+    changes = OutputChanges(outputs, snapshot_outputs("docs"))
+    changes.save(args.changes)
+    print(changes.summary())
+    if cache is not None:
+        cache.prune()
+        print(cache.summary())
+
+    if profiling:
+        print(profiler.summary(args.profile_top))
+        if args.profile_json:
+            profiler.write_json(args.profile_json, args.profile_top)
+
+    if args.watch:
+        watch_site(site_builder(args, basepath, manifest, cache), args.poll)
+
+
+def site_builder(
+    args: argparse.Namespace,
+    basepath: str,
+    manifest: BuildManifest,
+    cache: ParseCache | None,
+) -> SiteBuilder:
+    return SiteBuilder(
+        "content",
+        "static",
+        "template.html",
+        "docs",
+        basepath,
+        manifest,
+        cache,
+        DEFAULT_MEMORY_BYTES,
+        args.listing,
+        args.page_size,
+        args.compress or (),
+        args.compress_min_bytes,
+        args.jobs,
+    )
+
+
+def watch_site(builder: SiteBuilder, polling: bool) -> None:
+    watcher = create_watcher(["content", "static", "template.html"], polling)
+
+    def on_change(changes):
+        start = time.perf_counter()
+        touched = builder.rebuild(changes)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Rebuilt {len(touched)} files in {elapsed:.0f} ms")
+
+    print(f"Watching for changes with {type(watcher).__name__}, press Ctrl-C to stop")
+    try:
+        watch(watcher, on_change)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def serve_site(builder: SiteBuilder, socket_path: str) -> None:
+    daemon = BuildDaemon(builder, socket_path)
+    touched = daemon.build()
+    print(f"Built {len(touched)} files")
+    try:
+        daemon.serve(
+            lambda: print(f"Serving builds on {socket_path}, press Ctrl-C to stop")
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+def serve_dev(
+    basepath: str, port: int, polling: bool, listing: str | None, page_size: int
+) -> None:
+    site = DevSite(
+        "content",
+        "static",
+        "template.html",
+        basepath,
+        live_reload=True,
+        listing=listing,
+        page_size=page_size,
+    )
+    server = DevServer(("localhost", port), site)
+    watcher = create_watcher(["content", "static", "template.html"], polling)
+
+    def on_change(changes):
+        reloaded = site.apply_changes(changes)
+        print(f"{len(changes)} files changed, reloading {reloaded} browsers")
 
-    source_to_destination("static", "docs")
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+    threading.Thread(target=watch, args=(watcher, on_change), daemon=True).start()
+    host, port = server.server_address[:2]
+    print(f"Serving the site on http://{host}:{port}{basepath}, press Ctrl-C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        watcher.close()
 
 
 if __name__ == "__main__":
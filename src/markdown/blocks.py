@@ -27,13 +27,102 @@ def block_to_block_type(block: str) -> BlockType:
             return BlockType.PARAGRAPH
 
 
+HEADING_PATTERN = re.compile(r"#{1,6}\s")
+BLANK_LINE_PATTERN = re.compile(r"\s*")
+NON_SPACE_PATTERN = re.compile(r"\S")
+# a line opening a fence: ``` and an optional info string without backticks
+OPENING_FENCE_PATTERN = re.compile(r"```[^`]*")
+
+
+def _span_type(markdown: str, start: int, end: int) -> BlockType:
+    if HEADING_PATTERN.match(markdown, start):
+        return BlockType.HEADING
+    if markdown.startswith("```", start) and markdown.endswith("```", start, end):
+        return BlockType.CODE
+    if markdown.startswith("> ", start):
+        return BlockType.QUOTE
+    if markdown.startswith("- ", start):
+        return BlockType.UNORDERED_LIST
+    if markdown.startswith("1. ", start):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+def lex_blocks(markdown: str):
+    """
+    Lex a markdown string into typed block spans in a single pass over its lines.
+
+    Blocks are separated by blank (or whitespace-only) lines. A block whose first
+    line is a ``` fence, optionally followed by an info string, is a code block that
+    runs until a line ending with ```, blank lines included, or to the end of the
+    document if it is never closed. Any other block starting and ending with ``` is
+    a code block too, as block_to_block_type decides.
+
+    Spans are offsets into the original string and exclude the whitespace around
+    the block, so markdown[start:end] equals the block markdown_to_blocks returns.
+
+    Args:
+        markdown (str): The markdown text to lex
+
+    Yields:
+        tuple: (BlockType, start, end) for each block, in document order
+    """
+    length = len(markdown)
+    block_start = None
+    block_end = 0
+    in_fence = False
+    position = 0
+
+    while position <= length:
+        line_end = markdown.find("\n", position)
+        if line_end == -1:
+            line_end = length
+
+        if in_fence:
+            fence_end = line_end
+            while fence_end > position and markdown[fence_end - 1].isspace():
+                fence_end -= 1
+            if markdown.endswith("```", position, fence_end):
+                yield BlockType.CODE, block_start, fence_end
+                block_start = None
+                in_fence = False
+        elif BLANK_LINE_PATTERN.fullmatch(markdown, position, line_end):
+            if block_start is not None:
+                yield (
+                    _span_type(markdown, block_start, block_end),
+                    block_start,
+                    block_end,
+                )
+                block_start = None
+        else:
+            if block_start is None:
+                block_start = NON_SPACE_PATTERN.search(markdown, position).start()
+                in_fence = bool(
+                    OPENING_FENCE_PATTERN.fullmatch(markdown, block_start, line_end)
+                )
+            block_end = line_end
+            while markdown[block_end - 1].isspace():
+                block_end -= 1
+
+        position = line_end + 1
+
+    if block_start is not None:
+        if in_fence:
+            block_end = length
+            while markdown[block_end - 1].isspace():
+                block_end -= 1
+            yield BlockType.CODE, block_start, block_end
+        else:
+            yield _span_type(markdown, block_start, block_end), block_start, block_end
+
+
 def markdown_to_blocks(markdown: str) -> list[str]:
     """
     Convert a markdown string into a list of blocks.
 
-    Blocks in markdown are separated by blank lines. This function splits
-    the input markdown string by double newlines, strips whitespace from
-    each block, and filters out any empty blocks.
+    Blocks in markdown are separated by blank lines, except inside fenced code
+    blocks. Each block is stripped of surrounding whitespace and empty blocks
+    are dropped.
 
     Args:
         markdown (str): The markdown text to process
@@ -41,8 +130,4 @@ def markdown_to_blocks(markdown: str) -> list[str]:
     Returns:
         list: A list of non-empty markdown blocks
     """
-    blocks = markdown.split("\n\n")
-    stripped_blocks = list(map(str.strip, blocks))
-    non_empty_blocks = list(filter(lambda x: len(x) > 0, stripped_blocks))
-
-    return non_empty_blocks
+    return [markdown[start:end] for _, start, end in lex_blocks(markdown)]
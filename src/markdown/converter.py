@@ -1,7 +1,12 @@
 import re
+from contextlib import nullcontext
 from nodes import LeafNode, TextType, TextNode, HTMLNode, ParentNode
-from markdown.parser import text_to_text_nodes
-from .blocks import BlockType, markdown_to_blocks, block_to_block_type
+from markdown.parser import iter_text_spans, text_to_text_nodes
+from .blocks import BlockType, lex_blocks
+
+# Bump whenever a change to the parser or converter changes the HTML they produce,
+# so cached renders of unchanged documents are not reused.
+PARSER_VERSION = 3
 
 
 def text_node_to_html_node(text_node: TextNode):
@@ -19,44 +24,57 @@ def text_node_to_html_node(text_node: TextNode):
         case TextType.IMAGE:
             return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
         case _:
-            raise Exception("Unknown text type")
+            raise ValueError("Unknown text type")
+
 
+def markdown_to_html_node(markdown: str, profiler=None) -> ParentNode:
+    """
+    Convert a markdown document to a tree of HTML nodes wrapped in a div.
 
-def markdown_to_html_node(markdown: str) -> ParentNode:
-    blocks = markdown_to_blocks(markdown)
+    :param markdown: A string containing the markdown document.
+    :param profiler: An optional utils.profiler.Profiler; when given, block lexing and inline parsing are timed as the "parse/blocks" and "parse/inline" phases.
+    :return: A ParentNode holding one child per block.
+    """
     html_nodes = []
+    spans = lex_blocks(markdown)
+    inline = nullcontext()
+    if profiler is not None:
+        with profiler.phase("parse/blocks"):
+            spans = list(spans)
+        inline = profiler.phase("parse/inline")
 
-    for block in blocks:
-        block_type = block_to_block_type(block)
+    for block_type, start, end in spans:
         match block_type:
             case BlockType.HEADING:
-                content = block.split(" ")
-                heading_level = content[0].count("#")
-                text = " ".join(content[1:])
-                children = text_to_children(text)
+                heading_level, text = heading_block(markdown, start, end)
+                with inline:
+                    children = text_to_children(text)
                 node = ParentNode(f"h{heading_level}", children)
                 html_nodes.append(node)
             case BlockType.PARAGRAPH:
-                children = text_to_children(block)
+                with inline:
+                    children = text_to_children(markdown[start:end])
                 node = ParentNode("p", children)
                 html_nodes.append(node)
             case BlockType.QUOTE:
-                text = block.splitlines(True)
-                text = [line[2:].strip() for line in text if line.strip()]
-                children = text_to_children("\n".join(text))
+                with inline:
+                    children = text_to_children(quote_block_text(markdown[start:end]))
                 node = ParentNode("blockquote", children)
                 html_nodes.append(node)
             case BlockType.UNORDERED_LIST:
-                children = list_block_to_children(block, "ul")
+                with inline:
+                    children = list_block_to_children(markdown[start:end], "ul")
                 node = ParentNode("ul", children)
                 html_nodes.append(node)
             case BlockType.ORDERED_LIST:
-                children = list_block_to_children(block, "ol")
+                with inline:
+                    children = list_block_to_children(markdown[start:end], "ol")
                 node = ParentNode("ol", children)
                 html_nodes.append(node)
             case BlockType.CODE:
-                content = block.splitlines()
-                text_node = TextNode("\n".join(content[1:-1]) + "\n", TextType.CODE)
+                text_node = TextNode(
+                    code_block_text(markdown[start:end]), TextType.CODE
+                )
                 children = [text_node_to_html_node(text_node)]
                 node = ParentNode("pre", children)
                 html_nodes.append(node)
@@ -66,6 +84,132 @@ def markdown_to_html_node(markdown: str) -> ParentNode:
     return ParentNode("div", html_nodes)
 
 
+def iter_markdown_html(markdown: str, profiler=None):
+    """
+    Convert a markdown document to HTML chunks, without building any node tree.
+
+    The blocks and inline elements are formatted as soon as they are scanned, so no
+    TextNode, LeafNode or ParentNode is created. Joined, the chunks are the exact
+    output of markdown_to_html_node(markdown).to_html(); use the tree instead when it
+    has to be inspected or changed before rendering.
+
+    :param markdown: A string containing the markdown document.
+    :param profiler: An optional utils.profiler.Profiler, timing the same "parse/blocks" and "parse/inline" phases as markdown_to_html_node.
+    :return: An iterator over string chunks, one per block plus the enclosing div tags.
+    """
+    spans = lex_blocks(markdown)
+    inline = nullcontext()
+    if profiler is not None:
+        with profiler.phase("parse/blocks"):
+            spans = list(spans)
+        inline = profiler.phase("parse/inline")
+
+    yield "<div>"
+    for block_type, start, end in spans:
+        match block_type:
+            case BlockType.HEADING:
+                heading_level, text = heading_block(markdown, start, end)
+                with inline:
+                    html = text_to_html(text)
+                yield f"<h{heading_level}>{html}</h{heading_level}>"
+            case BlockType.PARAGRAPH:
+                with inline:
+                    html = text_to_html(markdown[start:end])
+                yield f"<p>{html}</p>"
+            case BlockType.QUOTE:
+                with inline:
+                    html = text_to_html(quote_block_text(markdown[start:end]))
+                yield f"<blockquote>{html}</blockquote>"
+            case BlockType.UNORDERED_LIST:
+                with inline:
+                    html = list_block_to_html(markdown[start:end], "ul")
+                yield f"<ul>{html}</ul>"
+            case BlockType.ORDERED_LIST:
+                with inline:
+                    html = list_block_to_html(markdown[start:end], "ol")
+                yield f"<ol>{html}</ol>"
+            case BlockType.CODE:
+                yield f"<pre><code>{code_block_text(markdown[start:end])}</code></pre>"
+            case _:
+                pass
+    yield "</div>"
+
+
+def markdown_to_html(markdown: str, profiler=None) -> str:
+    """
+    Convert a markdown document to an HTML string wrapped in a div.
+
+    :param markdown: A string containing the markdown document.
+    :param profiler: An optional utils.profiler.Profiler, see iter_markdown_html.
+    :return: The same string as markdown_to_html_node(markdown).to_html().
+    """
+    return "".join(iter_markdown_html(markdown, profiler))
+
+
+def heading_block(markdown: str, start: int, end: int) -> tuple[int, str]:
+    """
+    Split a heading block into its level and its text.
+
+    :param markdown: A string containing the markdown document.
+    :param start: The index of the block in the document.
+    :param end: The index after the block.
+    :return: A tuple of the heading level and the heading text.
+    """
+    first_space = markdown.find(" ", start, end)
+    if first_space == -1:
+        return markdown.count("#", start, end), ""
+    return markdown.count("#", start, first_space), markdown[first_space + 1 : end]
+
+
+def quote_block_text(block: str) -> str:
+    """
+    Strip the quote markers off the lines of a quote block, dropping blank lines.
+    """
+    lines = block.splitlines(True)
+    return "\n".join(line[2:].strip() for line in lines if line.strip())
+
+
+def code_block_text(block: str) -> str:
+    """
+    Return the content of a code block without its fences, ending with a newline.
+    """
+    content = block.splitlines()[1:]
+    if content:
+        last = content[-1].rstrip()
+        if last.lstrip().startswith("```"):
+            content.pop()
+        elif last.endswith("```"):
+            # a fence closed at the end of the last line of code
+            content[-1] = last[:-3]
+    return "\n".join(content) + "\n"
+
+
+# the HTML of each inline element type but plain text, formatted with its text and url
+SPAN_FORMATS = {
+    TextType.BOLD: "<b>{0}</b>",
+    TextType.ITALIC: "<i>{0}</i>",
+    TextType.CODE: "<code>{0}</code>",
+    TextType.LINK: '<a href="{1}">{0}</a>',
+    TextType.IMAGE: '<img src="{1}" alt="{0}"></img>',
+}
+
+
+def text_to_html(text: str) -> str:
+    """
+    Convert a string of text to HTML, as text_to_children and to_html would together.
+
+    :param text: A string.
+    :return: The HTML of the text's inline elements.
+    """
+    html = []
+    for text_type, span_text, url in iter_text_spans(text.replace("\n", " ")):
+        if text_type is TextType.TEXT:
+            html.append(span_text)
+        else:
+            html.append(SPAN_FORMATS[text_type].format(span_text, url))
+    return "".join(html)
+
+
 def text_to_children(text: str) -> list[HTMLNode]:
     """
     Convert a string of text to a list of HTML nodes.
@@ -74,13 +218,31 @@ def text_to_children(text: str) -> list[HTMLNode]:
     :return: A list of HTML nodes.
     """
 
-    text_nodes = text_to_text_nodes(" ".join(text.split("\n")))
+    text_nodes = text_to_text_nodes(text.replace("\n", " "))
     children = []
     for text_node in text_nodes:
         children.append(text_node_to_html_node(text_node))
     return children
 
 
+def list_items(block: str, type: str) -> list[str]:
+    """
+    Split a list block into the text of its items, without their markers.
+
+    :param block: A string representing a list block.
+    :param type: The type of list ("ul" or "ol").
+    :return: A list of strings, one per non-blank line.
+    """
+    items = []
+    regex = r"^\-\s" if type == "ul" else r"^\d.\s"
+    trim_amount = 2 if type == "ul" else 3
+    for item in block.split("\n"):
+        item = item.strip()
+        if item:
+            items.append(item[trim_amount:] if re.match(regex, item) else item)
+    return items
+
+
 def list_block_to_children(block: str, type: str) -> list[HTMLNode]:
     """
     Convert a list block to a list of HTML nodes.
@@ -89,16 +251,17 @@ def list_block_to_children(block: str, type: str) -> list[HTMLNode]:
     :param type: The type of list ("ul" or "ol").
     :return: A list of HTML nodes.
     """
-    children = []
-    regex = r"^\-\s" if type == "ul" else r"^\d.\s"
-    trim_amount = 2 if type == "ul" else 3
-    items = block.split("\n")
-    for item in items:
-        if item.strip():
-            item_content = (
-                item.strip()[trim_amount:]
-                if re.match(regex, item.strip())
-                else item.strip()
-            )
-            children.append(ParentNode("li", text_to_children(item_content)))
-    return children
+    return [
+        ParentNode("li", text_to_children(item)) for item in list_items(block, type)
+    ]
+
+
+def list_block_to_html(block: str, type: str) -> str:
+    """
+    Convert a list block to the HTML of its items.
+
+    :param block: A string representing a list block.
+    :param type: The type of list ("ul" or "ol").
+    :return: The li elements of the list.
+    """
+    return "".join(f"<li>{text_to_html(item)}</li>" for item in list_items(block, type))
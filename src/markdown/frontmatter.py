@@ -0,0 +1,52 @@
+FRONT_MATTER_DELIMITER = "---"
+
+
+def parse_front_matter(lines: list[str]) -> dict[str, str]:
+    """
+    Parse the `key: value` lines of a front matter block.
+
+    Keys are lowercased, values are stripped, and lines without a colon or starting
+    with `#` are ignored. Lists such as tags are kept as written, e.g. `a, b`.
+
+    :param lines: A list of strings, the lines between the two delimiters.
+    :return: A dictionary mapping keys to values.
+    """
+    fields = {}
+    for line in lines:
+        key, colon, value = line.partition(":")
+        key = key.strip().lower()
+        if not colon or not key or key.startswith("#"):
+            continue
+        fields[key] = value.strip()
+    return fields
+
+
+def split_front_matter(markdown: str) -> tuple[dict[str, str], str]:
+    """
+    Split an optional front matter block off the start of a markdown document.
+
+    Front matter is a block of `key: value` lines between two `---` lines, the first
+    of which must be the document's first line. A document without one, or whose
+    block is never closed, is returned unchanged with no fields.
+
+    :param markdown: A string containing the markdown document.
+    :return: A tuple of the front matter fields and the markdown body after them.
+    """
+    if not markdown.startswith(FRONT_MATTER_DELIMITER):
+        return {}, markdown
+    first_end = markdown.find("\n")
+    if first_end == -1 or markdown[:first_end].rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, markdown
+
+    lines = []
+    position = first_end + 1
+    while position < len(markdown):
+        end = markdown.find("\n", position)
+        if end == -1:
+            end = len(markdown)
+        line = markdown[position:end]
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            return parse_front_matter(lines), markdown[end + 1 :].lstrip("\n")
+        lines.append(line)
+        position = end + 1
+    return {}, markdown
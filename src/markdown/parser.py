@@ -12,7 +12,7 @@ def extract_markdown_images(text: str) -> list[tuple[str, str]]:
     Returns:
         list: A list of tuples containing (alt_text, image_url) for each image found.
     """
-    return re.findall(r"!\[(.*?)\]\((.*?)\)", text)
+    return [(label, url) for _, label, url, _ in _iter_links(text, IMAGE_START_PATTERN)]
 
 
 def extract_markdown_links(text: str) -> list[tuple[str, str]]:
@@ -25,9 +25,7 @@ def extract_markdown_links(text: str) -> list[tuple[str, str]]:
     Returns:
         list: A list of tuples containing (link_text, url) for each link found.
     """
-    # We need to find [text](url) patterns that aren't preceded by an exclamation mark
-    # Using a negative lookbehind (?<!) to ensure we don't match image syntax
-    return re.findall(r"(?<!!)\[(.*?)\]\((.*?)\)", text)
+    return [(label, url) for _, label, url, _ in _iter_links(text, LINK_START_PATTERN)]
 
 
 def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
@@ -43,24 +41,7 @@ def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
     Returns:
         list: A new list of TextNodes with image markdown converted to image nodes.
     """
-    new_nodes = []
-    for node in old_nodes:
-        if node.text_type == TextType.TEXT:
-            # split the text into parts based on the image syntax so that we get [text, img, text, img, text, etc.]
-            parts = re.split(r"(!\[.*?\]\(.*?\))", node.text)
-            for part in parts:
-                image_parts = extract_markdown_images(part)
-                if len(image_parts) == 1:
-                    image_node = TextNode(
-                        image_parts[0][0], TextType.IMAGE, image_parts[0][1]
-                    )
-                    new_nodes.append(image_node)
-                elif len(part) > 0:
-                    text_node = TextNode(part, TextType.TEXT)
-                    new_nodes.append(text_node)
-        else:
-            new_nodes.append(node)
-    return new_nodes
+    return _split_nodes_links(old_nodes, IMAGE_START_PATTERN, TextType.IMAGE)
 
 
 def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
@@ -76,22 +57,25 @@ def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
     Returns:
         list: A new list of TextNodes with link markdown converted to link nodes.
     """
+    return _split_nodes_links(old_nodes, LINK_START_PATTERN, TextType.LINK)
+
+
+def _split_nodes_links(
+    old_nodes: list[TextNode], start_pattern: re.Pattern, text_type: TextType
+) -> list[TextNode]:
     new_nodes = []
     for node in old_nodes:
-        if node.text_type == TextType.TEXT:
-            parts = re.split(r"((?<!!)\[.*?\]\(.*?\))", node.text)
-            for part in parts:
-                link_parts = extract_markdown_links(part)
-                if len(link_parts) == 1:
-                    link_node = TextNode(
-                        link_parts[0][0], TextType.LINK, link_parts[0][1]
-                    )
-                    new_nodes.append(link_node)
-                elif len(part) > 0:
-                    text_node = TextNode(part, TextType.TEXT)
-                    new_nodes.append(text_node)
-        else:
+        if node.text_type != TextType.TEXT:
             new_nodes.append(node)
+            continue
+        position = 0
+        for start, label, url, end in _iter_links(node.text, start_pattern):
+            if start > position:
+                new_nodes.append(TextNode(node.text[position:start], TextType.TEXT))
+            new_nodes.append(TextNode(label, text_type, url))
+            position = end
+        if position < len(node.text):
+            new_nodes.append(TextNode(node.text[position:], TextType.TEXT))
     return new_nodes
 
 
@@ -114,18 +98,17 @@ def split_nodes_delimiter(
         list: A new list of TextNodes with delimited text converted to appropriate TextNode types.
 
     Raises:
-        Exception: If there is an uneven number of delimiters in the text.
+        ValueError: If there is an uneven number of delimiters in the text.
     """
     new_nodes = []
     for node in old_nodes:
         if node.text_type == TextType.TEXT and delimiter in node.text:
-            matched = re.findall(re.escape(delimiter), node.text)
-            if len(matched) % 2 != 0:
-                raise Exception(
+            parts = node.text.split(delimiter)
+            if len(parts) % 2 == 0:
+                raise ValueError(
                     f"You have an uneven number of {delimiter} in your text: {node.text}"
                 )
 
-            parts = node.text.split(delimiter)
             for i in range(len(parts)):
                 text = parts[i]
                 if text == "":
@@ -140,43 +123,241 @@ def split_nodes_delimiter(
     return new_nodes
 
 
+INLINE_TOKEN_PATTERN = re.compile(r"!\[|\[|\*\*|_|`")
+DELIMITER_PATTERN = re.compile(r"\*\*|_|`")
+DELIMITER_TYPES = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+
+
+class _NextMatch:
+    """
+    Finds the next match of a pattern at or after a position, remembering the last answer.
+
+    Searching again from every candidate position of a long line would rescan the same
+    text over and over. As long as the positions asked for do not go backwards, every
+    answer is either the remembered one or found by a search that starts past it, so
+    each finder reads the text once in total.
+    """
+
+    __slots__ = ("found", "search", "start")
+
+    def __init__(self, search):
+        """
+        Initialize the finder.
+
+        :param search: A callable taking a position and returning the index of the next match, or -1.
+        """
+        self.search = search
+        self.start = 0
+        self.found = None
+
+    def __call__(self, position: int) -> int:
+        found = self.found
+        if found is None or position < self.start or (-1 < found < position):
+            self.start = position
+            self.found = found = self.search(position)
+        return found
+
+
+class _LinkMatcher:
+    """
+    Matches `[text](url)` in linear time overall.
+
+    Mirrors the lazy `\\[(.*?)\\]\\((.*?)\\)` pattern: the text ends at the first `](`
+    on the line and the url at the first `)` after it.
+    """
+
+    __slots__ = ("label_end", "length", "line_end", "url_end")
+
+    def __init__(self, text: str):
+        self.length = len(text)
+        self.line_end = _NextMatch(lambda i: text.find("\n", i))
+        self.label_end = _NextMatch(lambda i: text.find("](", i))
+        self.url_end = _NextMatch(lambda i: text.find(")", i))
+
+    def match(self, start: int) -> tuple[int, int] | None:
+        """
+        Matches a link with its opening bracket at start.
+
+        The finders only stay linear if start never decreases between calls; use one
+        matcher per left-to-right scan.
+
+        Returns:
+            tuple: (index of the `](`, index of the closing parenthesis), or None if there is no match.
+        """
+        line_end = self.line_end(start)
+        if line_end == -1:
+            line_end = self.length
+        label_end = self.label_end(start + 1)
+        if label_end == -1 or label_end >= line_end:
+            return None
+        url_end = self.url_end(label_end + 2)
+        if url_end == -1 or url_end >= line_end:
+            return None
+        return label_end, url_end
+
+
+def _end_of_line(matcher: _LinkMatcher, bracket: int) -> int:
+    """
+    Returns where a link can start again after the one at bracket failed to match.
+
+    A later bracket on the same line finds the same or a later `](`, and no `)` after
+    it, so no link or image can start before the end of the line.
+    """
+    line_end = matcher.line_end(bracket)
+    return matcher.length if line_end == -1 else line_end
+
+
+IMAGE_START_PATTERN = re.compile(r"!\[")
+LINK_START_PATTERN = re.compile(r"(?<!!)\[")
+
+
+def _iter_links(text: str, start_pattern: re.Pattern):
+    """
+    Yields the non-overlapping images or links of a text from left to right.
+
+    Args:
+        text (str): The text to search.
+        start_pattern (re.Pattern): IMAGE_START_PATTERN or LINK_START_PATTERN.
+
+    Yields:
+        tuple: (start, text, url, end) of each match, end being the index after it.
+    """
+    matcher = _LinkMatcher(text)
+    position = 0
+    while True:
+        token = start_pattern.search(text, position)
+        if token is None:
+            return
+        bracket = token.end() - 1
+        match = matcher.match(bracket)
+        if match is None:
+            position = _end_of_line(matcher, bracket)
+            continue
+        label_end, url_end = match
+        yield (
+            token.start(),
+            text[bracket + 1 : label_end],
+            text[label_end + 2 : url_end],
+            url_end + 1,
+        )
+        position = url_end + 1
+
+
 def text_to_text_nodes(text: str) -> list[TextNode]:
     """
     Converts raw markdown text to a list of TextNode objects.
 
     This function processes markdown text and transforms it into a structured list
     of TextNode objects representing different elements (links, images, bold text,
-    italic text, code blocks, and plain text).
+    italic text, code blocks, and plain text), as scanned by iter_text_spans.
 
-    The processing pipeline applies transformations in this order:
-    1. Links
-    2. Images
+    Args:
+        text (str): The markdown text to convert.
+
+    Returns:
+        list: A list of TextNode objects representing the parsed markdown.
+
+    Raises:
+        ValueError: If a delimiter is opened but never closed.
+    """
+    return [
+        TextNode(span_text, text_type, url)
+        for text_type, span_text, url in iter_text_spans(text)
+    ]
+
+
+def iter_text_spans(text: str):
+    """
+    Yields the inline elements of raw markdown text without building TextNode objects.
+
+    The text is scanned once from left to right. At each position where an inline
+    element can start, the scanner matches the whole element and emits it:
+    1. Images (![alt](url))
+    2. Links ([text](url), not preceded by !)
     3. Bold text (wrapped in **)
     4. Italic text (wrapped in _)
     5. Code text (wrapped in `)
 
+    The content of an element is kept as is, so formatting inside links or other
+    formatting is not parsed.
+
     Args:
-        text (str): The markdown text to convert.
+        text (str): The markdown text to scan.
 
-    Returns:
-        list: A list of TextNode objects representing the parsed markdown.
+    Yields:
+        tuple: (text type, text, url) of each element, url being None but for links and images.
+
+    Raises:
+        ValueError: If a delimiter is opened but never closed.
     """
-    links_processed_nodes = split_nodes_link([TextNode(text, TextType.TEXT)])
-    images_processed_nodes = split_nodes_image(links_processed_nodes)
-    bold_text_processed_nodes = split_nodes_delimiter(
-        images_processed_nodes,
-        "**",
-        TextType.BOLD,
-    )
-    italic_text_processed_nodes = split_nodes_delimiter(
-        bold_text_processed_nodes,
-        "_",
-        TextType.ITALIC,
-    )
-    code_text_processed_nodes = split_nodes_delimiter(
-        italic_text_processed_nodes,
-        "`",
-        TextType.CODE,
+    matcher = _LinkMatcher(text)
+    inner_matcher = _LinkMatcher(text)
+    plain_bracket = _NextMatch(
+        lambda i: match.start() if (match := LINK_START_PATTERN.search(text, i)) else -1
     )
-
-    return code_text_processed_nodes
+    plain_start = 0
+    position = 0
+    # brackets before this index cannot start a link or an image
+    links_from = 0
+
+    while True:
+        if position < links_from:
+            token = DELIMITER_PATTERN.search(text, position, links_from)
+            if token is None:
+                position = links_from
+                continue
+        else:
+            token = INLINE_TOKEN_PATTERN.search(text, position)
+        if token is None:
+            break
+        start = token.start()
+        marker = token.group()
+
+        if marker in DELIMITER_TYPES:
+            end = text.find(marker, start + len(marker))
+            if end == -1:
+                raise ValueError(
+                    f"You have an uneven number of {marker} in your text: {text}"
+                )
+            if start > plain_start:
+                yield TextType.TEXT, text[plain_start:start], None
+            if end > start + len(marker):
+                yield DELIMITER_TYPES[marker], text[start + len(marker) : end], None
+            position = plain_start = end + len(marker)
+            continue
+
+        is_image = marker == "!["
+        if not is_image and start > 0 and text[start - 1] == "!":
+            # an image that failed to match; its bracket does not start a link
+            position = start + 1
+            continue
+
+        bracket = start + 1 if is_image else start
+        match = matcher.match(bracket)
+        if match is None:
+            position = start + 1
+            links_from = _end_of_line(matcher, bracket)
+            continue
+
+        label_end, url_end = match
+        if is_image:
+            # links take precedence: a link starting inside the image wins. If the first
+            # bracket that can start one does not match, no later bracket can either.
+            inner_start = plain_bracket(start + 2)
+            if (
+                -1 < inner_start < url_end
+                and inner_matcher.match(inner_start) is not None
+            ):
+                position = start + 1
+                continue
+        if start > plain_start:
+            yield TextType.TEXT, text[plain_start:start], None
+        yield (
+            TextType.IMAGE if is_image else TextType.LINK,
+            text[bracket + 1 : label_end],
+            text[label_end + 2 : url_end],
+        )
+        position = plain_start = url_end + 1
+
+    if plain_start < len(text):
+        yield TextType.TEXT, text[plain_start:], None
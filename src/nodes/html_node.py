@@ -1,8 +1,16 @@
+import sys
+
+
 class HTMLNode:
     """
     A class representing a node in an HTML document.
+
+    Nodes use __slots__ so a parsed tree holds no per-instance __dict__, and tag
+    names are interned.
     """
 
+    __slots__ = ("children", "props", "tag", "value")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         """
         Initialize the HTMLNode with a tag, attributes, and text.
@@ -12,7 +20,7 @@ class HTMLNode:
         :param children: A list of HTMLNode objects representing the children of this node.
         :param text: A dictionary of key-value pairs representing the attributes of the HTML tag. For example, a link (`<a>` tag) might have `{"href": "https://www.google.com"}`
         """
-        self.tag = tag
+        self.tag = sys.intern(tag) if type(tag) is str else tag
         self.value = value
         self.children = children
         self.props = props
@@ -20,6 +28,39 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError("Subclasses should implement this method.")
 
+    def iter_html(self):
+        """
+        Generate the HTML of this node as a stream of string chunks.
+
+        Nodes without children produce their to_html() as a single chunk; ParentNode
+        streams its descendants.
+
+        :return: An iterator over string chunks that join to the output of to_html().
+        """
+        yield self.to_html()
+
+    def write_html(self, stream, buffer_size=65536):
+        """
+        Write the HTML of this node and its descendants to a writable text stream.
+
+        Chunks are gathered into writes of roughly buffer_size characters, so the whole
+        document is never held in memory at once.
+
+        :param stream: An object with a write(str) method, such as an open file.
+        :param buffer_size: The number of characters to gather before each write.
+        """
+        buffer = []
+        buffered = 0
+        for chunk in self.iter_html():
+            buffer.append(chunk)
+            buffered += len(chunk)
+            if buffered >= buffer_size:
+                stream.write("".join(buffer))
+                buffer.clear()
+                buffered = 0
+        if buffer:
+            stream.write("".join(buffer))
+
     def props_to_html(self):
         html_props = ""
         for key, value in self.props.items():
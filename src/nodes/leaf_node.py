@@ -6,6 +6,8 @@ class LeafNode(HTMLNode):
     A class representing a leaf node in an HTML document.
     """
 
+    __slots__ = ()
+
     def __init__(self, tag: str, value: str, props=None):
         """
         Initialize the LeafNode with a tag, attributes, and text.
@@ -8,6 +8,8 @@ class ParentNode(HTMLNode):
     A class representing a parent node in an HTML document.
     """
 
+    __slots__ = ()
+
     def __init__(self, tag: str, children: List[Union[LeafNode, Self]], props=None):
         """
         Initialize the ParentNode with a tag, attributes, and children.
@@ -19,14 +21,85 @@ class ParentNode(HTMLNode):
         """
         super().__init__(tag, None, children, props)
 
+    def iter_html(self):
+        """
+        Generate the HTML of this node and its descendants as a stream of string chunks.
+
+        The tree is walked with an explicit stack rather than recursion, so there is no
+        limit on nesting depth and no chunk is larger than a single tag or leaf. Like
+        to_html, nodes whose class overrides to_html are rendered by their own to_html.
+
+        :return: An iterator over string chunks that join to the output of to_html().
+        """
+        if type(self).to_html is not ParentNode.to_html:
+            yield self.to_html()
+            return
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            elif node.children is None or type(node).to_html is not ParentNode.to_html:
+                yield node.to_html()
+            else:
+                if node.tag is None:
+                    raise ValueError("ParentNode must have a tag.")
+                props_string = node.props_to_html() if node.props is not None else ""
+                yield f"<{node.tag}{props_string}>"
+                stack.append(f"</{node.tag}>")
+                stack.extend(reversed(node.children))
+
     def to_html(self):
-        props_string = self.props_to_html() if self.props is not None else ""
+        """
+        Render this node and its descendants to a single HTML string.
 
+        The tree is walked with a stack of child iterators instead of recursion, so it
+        has no depth limit, and every chunk goes into one output list joined at the end.
+        Plain LeafNode children are formatted inline; other leaves, and subclasses that
+        override to_html, are rendered by their own to_html.
+
+        :return: A string of HTML.
+        """
         if self.tag is None:
             raise ValueError("ParentNode must have a tag.")
         if self.children is None:
             raise ValueError("ParentNode must have children.")
 
-        children = "".join(child.to_html() for child in self.children)
+        out = []
+        append = out.append
+        append(f"<{self.tag}{self.props_to_html()}>" if self.props else f"<{self.tag}>")
+        iterators = [iter(self.children)]
+        closing_tags = [f"</{self.tag}>"]
+        while iterators:
+            for node in iterators[-1]:
+                node_type = type(node)
+                if node_type is LeafNode:
+                    value = node.value
+                    if value is None:
+                        raise ValueError("LeafNode must have a value.")
+                    tag = node.tag
+                    if tag is None:
+                        append(value)
+                    elif node.props:
+                        append(f"<{tag}{node.props_to_html()}>{value}</{tag}>")
+                    else:
+                        append(f"<{tag}>{value}</{tag}>")
+                    continue
+                if node.children is None or (
+                    node_type is not ParentNode
+                    and node_type.to_html is not ParentNode.to_html
+                ):
+                    append(node.to_html())
+                    continue
 
-        return f"<{self.tag}{props_string}>{children}</{self.tag}>"
+                tag = node.tag
+                if tag is None:
+                    raise ValueError("ParentNode must have a tag.")
+                append(f"<{tag}{node.props_to_html()}>" if node.props else f"<{tag}>")
+                iterators.append(iter(node.children))
+                closing_tags.append(f"</{tag}>")
+                break
+            else:
+                iterators.pop()
+                append(closing_tags.pop())
+        return "".join(out)
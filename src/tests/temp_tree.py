@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+
+class TempTreeTestCase(unittest.TestCase):
+    """
+    A test case that works on a tree of files in a temporary directory.
+
+    The directory is self.root, created for each test and removed after it. Subclasses
+    overriding setUp call this one first.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+
+    def write(self, path, text):
+        """Writes a text file, creating its directories; a relative path is under the root."""
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def bump_mtime(self, path):
+        """Moves a file's modification time a second ahead, so a write within the clock's resolution still changes its stamp."""
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def read(self, path):
+        with open(os.path.join(self.root, path)) as f:
+            return f.read()
+
+    def read_tree(self, root):
+        """Reads every file under a directory, keyed by its path relative to it."""
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                with open(path) as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
@@ -0,0 +1,59 @@
+import unittest
+
+from benchmarks.corpus import ADVERSARIAL_CASES, adversarial_corpus, generate_corpus
+from benchmarks.runner import BENCHMARKS, compare, run_benchmarks
+from markdown.converter import markdown_to_html_node
+
+
+class TestGenerateCorpus(unittest.TestCase):
+    def test_reproducible(self):
+        self.assertEqual(
+            generate_corpus(3, 2000, seed=7), generate_corpus(3, 2000, seed=7)
+        )
+        self.assertNotEqual(
+            generate_corpus(3, 2000, seed=7), generate_corpus(3, 2000, seed=8)
+        )
+
+    def test_size(self):
+        for document in generate_corpus(5, 5000):
+            self.assertGreaterEqual(len(document), 5000)
+            self.assertLess(len(document), 8000)
+
+    def test_documents_convert(self):
+        for document in generate_corpus(5, 5000, inline_density=0.5):
+            self.assertTrue(markdown_to_html_node(document).to_html())
+
+    def test_mix(self):
+        (document,) = generate_corpus(1, 3000, mix={"code": 1})
+        self.assertEqual(document.count("```") % 2, 0)
+        self.assertNotIn("\n- ", document)
+
+
+class TestAdversarialCorpus(unittest.TestCase):
+    def test_cases(self):
+        corpus = adversarial_corpus(1000)
+        self.assertEqual(list(ADVERSARIAL_CASES), list(corpus))
+        for name, text in corpus.items():
+            self.assertGreaterEqual(len(text), 1000, name)
+            self.assertNotIn("\n", text, name)
+
+    def test_cases_convert(self):
+        for size in (5, 6, 1000):
+            for name, text in adversarial_corpus(size).items():
+                with self.subTest(name, size=size):
+                    self.assertTrue(markdown_to_html_node(text).to_html())
+
+
+class TestRunBenchmarks(unittest.TestCase):
+    def test_results(self):
+        results = run_benchmarks(generate_corpus(2, 1000), repeat=2)
+        self.assertEqual(list(results["results"]), list(BENCHMARKS))
+        for result in results["results"].values():
+            self.assertEqual(len(result["timings"]), 2)
+            self.assertEqual(result["min"], min(result["timings"]))
+
+    def test_compare(self):
+        results = {"results": {"inline": {"min": 1.5}, "render": {"min": 1.0}}}
+        baseline = {"results": {"inline": {"min": 1.0}, "render": {"min": 1.0}}}
+        self.assertEqual(compare(results, baseline, 0.1), ["inline"])
+        self.assertEqual(results["results"]["inline"]["baseline_ratio"], 1.5)
@@ -1,5 +1,10 @@
 import unittest
-from markdown.blocks import markdown_to_blocks, block_to_block_type, BlockType
+from markdown.blocks import (
+    markdown_to_blocks,
+    block_to_block_type,
+    lex_blocks,
+    BlockType,
+)
 
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -140,6 +145,105 @@ html = convert_markdown_to_html(md)
             ],
         )
 
+    def test_code_block_with_blank_line(self):
+        # Test that a blank line inside a fenced code block does not split it
+        md = """Before
+
+```
+first
+
+second
+```
+
+After"""
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(blocks, ["Before", "```\nfirst\n\nsecond\n```", "After"])
+
+    def test_whitespace_only_separator(self):
+        # Test that a line of spaces separates blocks like an empty line
+        md = "First paragraph\n   \nSecond paragraph"
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(blocks, ["First paragraph", "Second paragraph"])
+
+
+class TestLexBlocks(unittest.TestCase):
+    def test_spans(self):
+        md = "# Title\n\n  Some text\nmore  \n\n- a\n- b\n"
+        spans = list(lex_blocks(md))
+        self.assertEqual(
+            [(block_type, md[start:end]) for block_type, start, end in spans],
+            [
+                (BlockType.HEADING, "# Title"),
+                (BlockType.PARAGRAPH, "Some text\nmore"),
+                (BlockType.UNORDERED_LIST, "- a\n- b"),
+            ],
+        )
+
+    def test_block_types(self):
+        md = "> quote\n\n1. one\n2. two\n\n```\ncode\n```\n\n#NoSpace"
+        self.assertEqual(
+            [block_type for block_type, _, _ in lex_blocks(md)],
+            [
+                BlockType.QUOTE,
+                BlockType.ORDERED_LIST,
+                BlockType.CODE,
+                BlockType.PARAGRAPH,
+            ],
+        )
+
+    def test_closing_fence_ends_block(self):
+        md = "```\ncode\n```\nText right after"
+        self.assertEqual(
+            [(block_type, md[start:end]) for block_type, start, end in lex_blocks(md)],
+            [
+                (BlockType.CODE, "```\ncode\n```"),
+                (BlockType.PARAGRAPH, "Text right after"),
+            ],
+        )
+
+    def test_unclosed_fence_runs_to_end(self):
+        md = "```\ncode\n\nmore code\n"
+        self.assertEqual(
+            [(block_type, md[start:end]) for block_type, start, end in lex_blocks(md)],
+            [(BlockType.CODE, "```\ncode\n\nmore code")],
+        )
+
+    def test_inline_code_does_not_open_fence(self):
+        md = "```x``` is neat\n\n# Heading\n\nPara"
+        self.assertEqual(
+            [(block_type, md[start:end]) for block_type, start, end in lex_blocks(md)],
+            [
+                (BlockType.PARAGRAPH, "```x``` is neat"),
+                (BlockType.HEADING, "# Heading"),
+                (BlockType.PARAGRAPH, "Para"),
+            ],
+        )
+
+    def test_one_line_fence(self):
+        md = "```code```\n\npara"
+        self.assertEqual(
+            [(block_type, md[start:end]) for block_type, start, end in lex_blocks(md)],
+            [(BlockType.CODE, "```code```"), (BlockType.PARAGRAPH, "para")],
+        )
+
+    def test_fence_closed_at_end_of_line(self):
+        md = "```\ncode```\n\npara"
+        self.assertEqual(
+            [(block_type, md[start:end]) for block_type, start, end in lex_blocks(md)],
+            [(BlockType.CODE, "```\ncode```"), (BlockType.PARAGRAPH, "para")],
+        )
+
+    def test_fence_with_info_string(self):
+        md = "```python\na\n\nb\n```\n\npara"
+        self.assertEqual(
+            [block_type for block_type, _, _ in lex_blocks(md)],
+            [BlockType.CODE, BlockType.PARAGRAPH],
+        )
+
+    def test_empty(self):
+        self.assertEqual(list(lex_blocks("")), [])
+        self.assertEqual(list(lex_blocks("\n  \n")), [])
+
 
 class TestBlockToBlockType(unittest.TestCase):
     def test_paragraph_type(self):
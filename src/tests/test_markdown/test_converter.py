@@ -1,10 +1,17 @@
+import random
 import unittest
+
+from benchmarks.corpus import adversarial_corpus, generate_corpus
 from nodes.text_node import TextNode, TextType
 from markdown.converter import (
+    iter_markdown_html,
     list_block_to_children,
+    list_block_to_html,
+    markdown_to_html,
     text_node_to_html_node,
     markdown_to_html_node,
     text_to_children,
+    text_to_html,
 )
 
 
@@ -54,7 +61,7 @@ class TestTextNodeToHtmlNode(unittest.TestCase):
 
     def test_unknown_type(self):
         node = TextNode("Unknown type", "unknown_type")
-        with self.assertRaises(Exception) as context:
+        with self.assertRaises(ValueError) as context:
             text_node_to_html_node(node)
         self.assertTrue("Unknown text type" in str(context.exception))
 
@@ -92,6 +99,22 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_codeblock_with_blank_line(self):
+        md = """
+```
+first line
+
+after a blank line
+```
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><pre><code>first line\n\nafter a blank line\n</code></pre></div>",
+        )
+
     def test_leafs(self):
         self.maxDiff = None
         md = """
@@ -318,3 +341,98 @@ class TestMarkdownToHtmlNodeAdditional(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+class TestMarkdownToHtml(unittest.TestCase):
+    def assertSameHtml(self, markdown):
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(), markdown_to_html(markdown)
+        )
+
+    def test_every_block(self):
+        markdown = """# Heading with **bold**
+
+Paragraph with _italic_, `code`, a [link](https://example.com) and
+an ![image](/images/a.png) over two lines.
+
+> a quote
+>
+> with a [link](/a)
+
+- first
+- _second_
+
+1. one
+2. **two**
+
+```
+code **not** parsed
+```
+
+###### Small"""
+        self.assertSameHtml(markdown)
+        self.assertEqual(
+            "<div><h1>Heading with <b>bold</b></h1>",
+            markdown_to_html(markdown)[: len("<div><h1>Heading with <b>bold</b></h1>")],
+        )
+
+    def test_inline_code_paragraph(self):
+        markdown = "```x``` is neat\n\n# Heading\n\nPara"
+        self.assertSameHtml(markdown)
+        self.assertEqual(
+            markdown_to_html(markdown),
+            "<div><p><code>x</code> is neat</p><h1>Heading</h1><p>Para</p></div>",
+        )
+
+    def test_fence_closed_at_end_of_line(self):
+        markdown = "```\ncode```\n\npara"
+        self.assertSameHtml(markdown)
+        self.assertEqual(
+            markdown_to_html(markdown),
+            "<div><pre><code>code\n</code></pre><p>para</p></div>",
+        )
+
+    def test_empty(self):
+        self.assertEqual("<div></div>", markdown_to_html(""))
+        self.assertSameHtml("#")
+
+    def test_corpus(self):
+        for document in generate_corpus(10, 3000, inline_density=0.5):
+            self.assertSameHtml(document)
+        for document in adversarial_corpus(500).values():
+            self.assertSameHtml(document)
+
+    def test_random_documents(self):
+        pieces = ["# ", "## ", "- ", "1. ", "> ", "```", "\n", "\n\n", "a", " "]
+        pieces += ["**", "_", "`", "[", "](", "![", ")", "("]
+        generator = random.Random(0)
+        for _ in range(2000):
+            markdown = "".join(
+                generator.choice(pieces) for _ in range(generator.randint(0, 20))
+            )
+            try:
+                expected = markdown_to_html_node(markdown).to_html()
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    markdown_to_html(markdown)
+                continue
+            self.assertEqual(expected, markdown_to_html(markdown), markdown)
+
+    def test_chunks(self):
+        markdown = "# Title\n\nSome text"
+        self.assertEqual(
+            ["<div>", "<h1>Title</h1>", "<p>Some text</p>", "</div>"],
+            list(iter_markdown_html(markdown)),
+        )
+
+    def test_text_to_html(self):
+        self.assertEqual(
+            'a <b>b</b> <a href="/c">c</a> <img src="/d.png" alt="d"></img>',
+            text_to_html("a **b** [c](/c) ![d](/d.png)"),
+        )
+
+    def test_list_block_to_html(self):
+        self.assertEqual(
+            "<li>one</li><li><i>two</i></li>",
+            list_block_to_html("1. one\n2. _two_", "ol"),
+        )
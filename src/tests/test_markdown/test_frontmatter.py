@@ -0,0 +1,38 @@
+import unittest
+
+from markdown.frontmatter import parse_front_matter, split_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split(self):
+        markdown = "---\ntitle: Hello\nDate: 2024-01-02\n---\n\n# Hello\n\nBody"
+        fields, body = split_front_matter(markdown)
+        self.assertEqual(fields, {"title": "Hello", "date": "2024-01-02"})
+        self.assertEqual(body, "# Hello\n\nBody")
+
+    def test_no_front_matter(self):
+        markdown = "# Hello\n\n---\n\nBody"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_unclosed_front_matter(self):
+        markdown = "---\ntitle: Hello\n\n# Hello"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_delimiter_must_be_alone_on_its_line(self):
+        markdown = "----\ntitle: Hello\n----\n# Hello"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_empty_body(self):
+        self.assertEqual(split_front_matter("---\ntitle: A\n---"), ({"title": "A"}, ""))
+
+    def test_parse_front_matter(self):
+        self.assertEqual(
+            parse_front_matter(
+                ["tags: a, b", "# comment: no", "no colon", "url: http://x.y/z"]
+            ),
+            {"tags": "a, b", "url": "http://x.y/z"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
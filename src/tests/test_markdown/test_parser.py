@@ -1,4 +1,9 @@
+import random
+import re
+import time
 import unittest
+
+from benchmarks.corpus import adversarial_corpus
 from nodes.text_node import TextNode, TextType
 from markdown.parser import (
     split_nodes_delimiter,
@@ -112,7 +117,7 @@ class TestSplitNodesDelimiter(unittest.TestCase):
     def test_uneven_delimiters(self):
         # Test exception with uneven number of delimiters
         nodes = [TextNode("This text has **uneven delimiters", TextType.TEXT)]
-        with self.assertRaises(Exception) as context:
+        with self.assertRaises(ValueError) as context:
             split_nodes_delimiter(nodes, "**", TextType.BOLD)
         self.assertTrue("uneven number of **" in str(context.exception))
 
@@ -746,7 +751,7 @@ class TestTextToTextNodes(unittest.TestCase):
     def test_only_delimiters(self):
         # Test with text that is only delimiters (invalid markdown)
         text = "**"
-        with self.assertRaises(Exception):
+        with self.assertRaises(ValueError):
             text_to_text_nodes(text)
 
     def test_all_formats_at_edges(self):
@@ -762,3 +767,115 @@ class TestTextToTextNodes(unittest.TestCase):
         for i in range(len(result)):
             self.assertEqual(result[i].text, expected[i].text)
             self.assertEqual(result[i].text_type, expected[i].text_type)
+
+    def test_code_with_other_delimiters(self):
+        # Test that code spans keep underscores and asterisks literally
+        text = "Call `snake_case(**kwargs)` here"
+        self.assertListEqual(
+            [
+                TextNode("Call ", TextType.TEXT),
+                TextNode("snake_case(**kwargs)", TextType.CODE),
+                TextNode(" here", TextType.TEXT),
+            ],
+            text_to_text_nodes(text),
+        )
+
+    def test_link_text_is_not_parsed(self):
+        # Test that formatting inside a link is kept as link text
+        text = "A [**bold** link](https://example.com/a_b)"
+        self.assertListEqual(
+            [
+                TextNode("A ", TextType.TEXT),
+                TextNode("**bold** link", TextType.LINK, "https://example.com/a_b"),
+            ],
+            text_to_text_nodes(text),
+        )
+
+    def test_unclosed_image_is_text(self):
+        # Test that image syntax that never closes is left as text
+        text = "Not an ![image and a [link](https://example.com)"
+        self.assertListEqual(
+            [
+                TextNode("Not an ![image and a ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://example.com"),
+            ],
+            text_to_text_nodes(text),
+        )
+
+    def test_adjacent_image_and_link(self):
+        text = "![img](https://example.com/i.png)[link](https://example.com)"
+        self.assertListEqual(
+            [
+                TextNode("img", TextType.IMAGE, "https://example.com/i.png"),
+                TextNode("link", TextType.LINK, "https://example.com"),
+            ],
+            text_to_text_nodes(text),
+        )
+
+    def test_unclosed_code(self):
+        with self.assertRaises(ValueError):
+            text_to_text_nodes("This `code never closes")
+
+
+class TestLinearTime(unittest.TestCase):
+    # a quadratic parser takes several seconds on each of these inputs
+    SIZE = 100000
+    BUDGET = 2.0
+
+    def assertFast(self, function, text):
+        start = time.perf_counter()
+        function(text)
+        self.assertLess(time.perf_counter() - start, self.BUDGET)
+
+    def test_adversarial_inputs(self):
+        for name, text in adversarial_corpus(self.SIZE).items():
+            with self.subTest(name):
+                self.assertFast(text_to_text_nodes, text)
+                self.assertFast(extract_markdown_links, text)
+                self.assertFast(extract_markdown_images, text)
+                self.assertFast(
+                    lambda t: split_nodes_link([TextNode(t, TextType.TEXT)]), text
+                )
+                self.assertFast(
+                    lambda t: split_nodes_image([TextNode(t, TextType.TEXT)]), text
+                )
+
+    def test_unbalanced_delimiter_fails_fast(self):
+        text = "**a " * (self.SIZE // 4) + "**a"
+        start = time.perf_counter()
+        with self.assertRaises(ValueError):
+            text_to_text_nodes(text)
+        self.assertLess(time.perf_counter() - start, self.BUDGET)
+
+    def test_unclosed_brackets_stay_text(self):
+        text = "[a](" * 1000
+        self.assertListEqual([TextNode(text, TextType.TEXT)], text_to_text_nodes(text))
+
+    def test_link_inside_image_label(self):
+        # the link is found first, so the image around it is left as text
+        self.assertListEqual(
+            [
+                TextNode("![a ", TextType.TEXT),
+                TextNode("b", TextType.LINK, "c"),
+                TextNode(" d](e)", TextType.TEXT),
+            ],
+            text_to_text_nodes("![a [b](c) d](e)"),
+        )
+        self.assertListEqual(
+            [
+                TextNode("![](", TextType.TEXT),
+                TextNode("[ ()!", TextType.BOLD),
+                TextNode("]()", TextType.TEXT),
+            ],
+            text_to_text_nodes("![](**[ ()!**]()"),
+        )
+
+    def test_extract_matches_regex(self):
+        # the scanner finds the same matches as the patterns it replaced
+        image_pattern = re.compile(r"!\[(.*?)\]\((.*?)\)")
+        link_pattern = re.compile(r"(?<!!)\[(.*?)\]\((.*?)\)")
+        generator = random.Random(0)
+        for _ in range(2000):
+            text = "".join(generator.choice("![]()a\n") for _ in range(20))
+            self.assertEqual(image_pattern.findall(text), extract_markdown_images(text))
+            self.assertEqual(link_pattern.findall(text), extract_markdown_links(text))
@@ -1,5 +1,6 @@
 import unittest
 from nodes.html_node import HTMLNode
+from nodes import LeafNode, ParentNode
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -53,3 +54,26 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode()
         with self.assertRaises(NotImplementedError):
             node.to_html()
+
+    def test_no_instance_dict(self):
+        for node in (
+            HTMLNode("p"),
+            LeafNode("b", "bold"),
+            ParentNode("div", [LeafNode(None, "text")]),
+        ):
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.extra = True
+
+    def test_tag_is_interned(self):
+        level = 2
+        node = HTMLNode(f"h{level}")
+        self.assertIs(node.tag, HTMLNode("h2").tag)
+
+    def test_empty_props_stay_mutable(self):
+        props = {}
+        node = LeafNode("a", "link", props)
+        self.assertIs(node.props, props)
+        node.props["href"] = "/a"
+        self.assertEqual(node.to_html(), '<a href="/a">link</a>')
+        self.assertEqual(repr(HTMLNode("p", "a", None, {})), "HTMLNode(p, a, None, {})")
@@ -1,3 +1,4 @@
+import io
 import unittest
 from nodes import ParentNode, LeafNode
 
@@ -82,3 +83,73 @@ class TestParentNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             parent = ParentNode(None, [LeafNode("p", "text")])
             parent.to_html()
+
+    def test_iter_html_matches_to_html(self):
+        leaf1 = LeafNode("b", "bold")
+        leaf2 = LeafNode(None, "plain")
+        inner_parent = ParentNode("span", [leaf1, leaf2], {"class": "x"})
+        parent = ParentNode("div", [inner_parent, LeafNode("i", "italic")])
+        self.assertEqual("".join(parent.iter_html()), parent.to_html())
+
+    def test_iter_html_deep_nesting(self):
+        node = LeafNode("span", "deep")
+        for _ in range(10000):
+            node = ParentNode("div", [node])
+        html = "".join(node.iter_html())
+        self.assertTrue(html.startswith("<div>" * 10000 + "<span>deep</span>"))
+        self.assertTrue(html.endswith("</div>" * 10000))
+
+    def test_iter_html_none_tag_error(self):
+        with self.assertRaises(ValueError):
+            parent = ParentNode("div", [ParentNode(None, [LeafNode("p", "text")])])
+            "".join(parent.iter_html())
+
+    def test_write_html(self):
+        stream = io.StringIO()
+        parent = ParentNode("div", [LeafNode("p", str(i)) for i in range(100)])
+        parent.write_html(stream, buffer_size=16)
+        self.assertEqual(stream.getvalue(), parent.to_html())
+
+    def test_to_html_deep_nesting(self):
+        node = LeafNode("span", "deep")
+        for _ in range(100000):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<div>" * 100000 + "<span>deep</span>"))
+        self.assertTrue(html.endswith("</div>" * 100000))
+
+    def test_to_html_nested_errors(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("p", [ParentNode(None, [])])]).to_html()
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("p", None)]).to_html()
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("p", [LeafNode("b", None)])]).to_html()
+
+    def test_to_html_subclasses(self):
+        class Comment(LeafNode):
+            def to_html(self):
+                return f"<!-- {self.value} -->"
+
+        class Upper(ParentNode):
+            def to_html(self):
+                return super().to_html().upper()
+
+        class Section(ParentNode):
+            pass
+
+        parent = ParentNode(
+            "div",
+            [
+                Comment(None, "note"),
+                Upper("p", [LeafNode("b", "loud")]),
+                Section("section", [LeafNode("i", "quiet")], {"id": "s"}),
+            ],
+        )
+        self.assertEqual(
+            '<div><!-- note --><P><B>LOUD</B></P><section id="s"><i>quiet</i></section></div>',
+            parent.to_html(),
+        )
+        self.assertEqual("".join(parent.iter_html()), parent.to_html())
+        upper = Upper("p", [LeafNode("b", "loud")])
+        self.assertEqual("".join(upper.iter_html()), "<P><B>LOUD</B></P>")
@@ -56,6 +56,12 @@ class TestTextNode(unittest.TestCase):
             repr(link_node), "TextNode(Link text, link, https://example.com)"
         )
 
+    def test_no_instance_dict(self):
+        text_node = TextNode("Plain text", TextType.TEXT)
+        self.assertFalse(hasattr(text_node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            text_node.extra = True
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,241 @@
+import gzip
+import os
+from unittest import mock
+
+from tests.temp_tree import TempTreeTestCase
+from utils.builder import SiteBuilder
+from utils.compress import CompressionIndex
+from utils.listing import listing_dest
+from utils.manifest import BuildManifest
+from utils.metadata import MetadataIndex
+
+
+class TestSiteBuilder(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.builder = SiteBuilder(
+            self.content,
+            self.static,
+            self.template,
+            self.dest,
+            "/",
+            BuildManifest(os.path.join(self.root, "manifest.json")),
+        )
+        self.builder.compression = self.compression_index()
+        self.builder.build()
+
+    def compression_index(self):
+        return CompressionIndex.load(os.path.join(self.root, "compress.json"))
+
+    def test_build(self):
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertEqual(self.builder.build(), [])
+
+    def test_content_change_regenerates_only_that_page(self):
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "# Home\n\nChanged")
+        touched = self.builder.rebuild({source})
+        self.assertEqual(touched, [os.path.join(self.dest, "index.html")])
+        self.assertIn("Changed", self.read(touched[0]))
+
+    def test_new_page(self):
+        source = os.path.join(self.content, "blog", "post", "index.md")
+        self.write(source, "# Post\n\nNew")
+        touched = self.builder.rebuild({source})
+        self.assertEqual(
+            touched, [os.path.join(self.dest, "blog", "post", "index.html")]
+        )
+
+    def test_removed_page(self):
+        source = os.path.join(self.content, "blog", "index.md")
+        os.remove(source)
+        self.builder.rebuild({source})
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "index.html")))
+        self.assertNotIn(source, self.builder.manifest.entries)
+
+    def test_template_change_regenerates_all(self):
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        touched = self.builder.rebuild({self.template})
+        self.assertEqual(len(touched), 2)
+        self.assertTrue(self.read(touched[0]).startswith("<h1>"))
+
+    def test_kept_bodies_retemplate_without_reading(self):
+        builder = SiteBuilder(
+            self.content,
+            self.static,
+            self.template,
+            self.dest,
+            "/",
+            BuildManifest(os.path.join(self.root, "kept.json")),
+            memory_bytes=1 << 20,
+        )
+        builder.build()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        with mock.patch(
+            "utils.builder.open", create=True, side_effect=AssertionError("read")
+        ):
+            touched = builder.rebuild({self.template})
+        self.assertEqual(len(touched), 2)
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "index.html")),
+            "<h1>Home</h1><div><h1>Home</h1><p>Welcome</p></div>",
+        )
+
+        page = os.path.join(self.content, "index.md")
+        self.write(page, "# Home\n\nEdited")
+        builder.rebuild({page})
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "index.html")),
+            "<h1>Home</h1><div><h1>Home</h1><p>Edited</p></div>",
+        )
+
+    def test_listing_follows_posts(self):
+        posts = os.path.join(self.content, "posts")
+        for index in (1, 2, 3):
+            self.write(
+                os.path.join(posts, f"post{index}.md"),
+                f"---\ndate: 2024-01-0{index}\n---\n# Post {index}",
+            )
+        builder = SiteBuilder(
+            self.content,
+            self.static,
+            self.template,
+            self.dest,
+            "/",
+            BuildManifest(os.path.join(self.root, "listed.json")),
+            listing="posts",
+            page_size=2,
+        )
+        builder.metadata = MetadataIndex(os.path.join(self.root, "metadata.json"))
+        builder.build()
+        first = listing_dest(self.dest, "posts", 1)
+        second = listing_dest(self.dest, "posts", 2)
+        self.assertIn("Post 3", self.read(first))
+        self.assertIn("Post 1", self.read(second))
+
+        post = os.path.join(posts, "post3.md")
+        self.write(post, "---\ndate: 2024-01-03\n---\n# Renamed")
+        touched = builder.rebuild({post})
+        self.assertIn(first, touched)
+        self.assertNotIn(second, touched)
+        self.assertIn("Renamed", self.read(first))
+
+        os.remove(os.path.join(posts, "post1.md"))
+        touched = builder.rebuild({os.path.join(posts, "post1.md")})
+        self.assertIn(second, touched)
+        self.assertFalse(os.path.exists(second))
+
+        builder.listing = None
+        builder.build()
+        self.assertFalse(os.path.exists(first))
+
+    def test_asset_change(self):
+        asset = os.path.join(self.static, "index.css")
+        self.write(asset, "body { margin: 0 }")
+        touched = self.builder.rebuild({asset})
+        self.assertEqual(touched, [os.path.join(self.dest, "index.css")])
+        self.assertEqual(self.read(touched[0]), "body { margin: 0 }")
+
+        os.remove(asset)
+        self.builder.rebuild({asset})
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertEqual(self.builder.manifest.assets, [])
+
+    def test_asset_change_regenerates_referencing_pages(self):
+        asset = os.path.join(self.static, "images", "a.png")
+        self.write(asset, "png")
+        source = os.path.join(self.content, "blog", "index.md")
+        self.write(source, "# Blog\n\n![a](/images/a.png)")
+        self.builder.rebuild({source, asset})
+
+        self.write(asset, "new png")
+        touched = self.builder.rebuild({asset})
+        self.assertEqual(
+            touched,
+            [
+                os.path.join(self.dest, "blog", "index.html"),
+                os.path.join(self.dest, "images", "a.png"),
+            ],
+        )
+
+    def test_unrelated_asset_change_regenerates_no_page(self):
+        asset = os.path.join(self.static, "index.css")
+        self.write(asset, "body { margin: 0 }")
+        self.assertEqual(self.builder.manifest.generated, 2)
+        self.builder.rebuild({asset})
+        self.assertEqual(self.builder.manifest.generated, 2)
+
+    def test_failure_is_collected(self):
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "No title")
+        self.assertEqual(self.builder.rebuild({source}), [])
+        self.assertEqual([path for path, _ in self.builder.failures], [source])
+
+    def test_missing_template_is_collected(self):
+        page = os.path.join(self.content, "index.md")
+        before = self.read(os.path.join(self.dest, "index.html"))
+        os.rename(self.template, self.template + ".swp")
+        self.assertEqual(self.builder.rebuild({self.template}), [])
+        self.assertEqual([path for path, _ in self.builder.failures], [self.template])
+        self.assertEqual(self.read(os.path.join(self.dest, "index.html")), before)
+
+        os.rename(self.template + ".swp", self.template)
+        self.write(page, "# Home\n\nBack")
+        self.assertEqual(len(self.builder.rebuild({self.template, page})), 2)
+        self.assertEqual(self.builder.failures, [])
+
+    def test_vanished_asset_is_collected(self):
+        asset = os.path.join(self.static, "index.css")
+        with mock.patch(
+            "utils.builder.copy_output", side_effect=FileNotFoundError(asset)
+        ):
+            self.assertEqual(self.builder.rebuild({asset}), [])
+        self.assertEqual([path for path, _ in self.builder.failures], [asset])
+
+    def test_markdown_error_is_collected(self):
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "# Home\n\n**unclosed")
+        self.assertEqual(self.builder.rebuild({source}), [])
+        ((path, error),) = self.builder.failures
+        self.assertEqual(path, source)
+        self.assertIsInstance(error, ValueError)
+
+    def test_siblings_follow_pages(self):
+        page = os.path.join(self.content, "index.md")
+        sibling = os.path.join(self.dest, "index.html.gz")
+        builder = SiteBuilder(
+            self.content,
+            self.static,
+            self.template,
+            self.dest,
+            "/",
+            BuildManifest(os.path.join(self.root, "compressed.json")),
+            compress=("gz",),
+            compress_min_bytes=1,
+        )
+        builder.compression = self.compression_index()
+        builder.build()
+        self.write(page, "# Home\n\nEdited")
+        self.assertIn(sibling, builder.rebuild({page}))
+        with gzip.open(sibling, "rt") as f:
+            self.assertEqual(f.read(), self.read(os.path.join(self.dest, "index.html")))
+
+        # a build without compression drops the siblings of the pages it changes
+        self.builder.compression = self.compression_index()
+        self.write(page, "# Home\n\nEdited again")
+        self.assertIn(sibling, self.builder.rebuild({page}))
+        self.assertFalse(os.path.exists(sibling))
+        self.assertTrue(
+            os.path.exists(os.path.join(self.dest, "blog", "index.html.gz"))
+        )
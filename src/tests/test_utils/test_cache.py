@@ -0,0 +1,105 @@
+import os
+import unittest
+from unittest import mock
+
+from tests.temp_tree import TempTreeTestCase
+from utils.cache import ParseCache
+from utils.helpers import generate_page
+
+
+class TestParseCache(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = os.path.join(self.root, "cache")
+
+    def test_miss_then_hit(self):
+        cache = ParseCache(self.directory)
+        self.assertIsNone(cache.get("# Home"))
+        cache.put("# Home", "<div><h1>Home</h1></div>")
+        self.assertEqual(cache.get("# Home"), "<div><h1>Home</h1></div>")
+        self.assertEqual(cache.stats["misses"], 1)
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["writes"], 1)
+
+    def test_shared_between_instances(self):
+        ParseCache(self.directory).put("# Home", "<h1>Home</h1>")
+        self.assertEqual(ParseCache(self.directory).get("# Home"), "<h1>Home</h1>")
+
+    def test_changed_content_misses(self):
+        cache = ParseCache(self.directory)
+        cache.put("# Home", "<h1>Home</h1>")
+        self.assertIsNone(cache.get("# Home!"))
+
+    def test_parser_version_change_misses(self):
+        cache = ParseCache(self.directory)
+        cache.put("# Home", "<h1>Home</h1>")
+        with mock.patch("utils.cache.PARSER_VERSION", -1):
+            self.assertIsNone(cache.get("# Home"))
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = ParseCache(self.directory, max_bytes=25)
+        for index, markdown in enumerate(["a", "b", "c"]):
+            cache.put(markdown, "x" * 10)
+            path = cache._path(cache.key(markdown))
+            os.utime(path, ns=(index * 10**9, index * 10**9))
+        # reading "a" makes it the most recently used entry
+        cache.get("a")
+
+        self.assertEqual(cache.prune(), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats["evictions"], 1)
+
+    def test_prune_within_budget_keeps_everything(self):
+        cache = ParseCache(self.directory)
+        cache.put("a", "<p>a</p>")
+        self.assertEqual(cache.prune(), 0)
+
+    def test_prune_missing_directory(self):
+        self.assertEqual(ParseCache(self.directory).prune(), 0)
+
+    def test_merge_stats(self):
+        cache = ParseCache(self.directory)
+        cache.merge_stats({"hits": 2, "misses": 1, "writes": 1, "evictions": 0})
+        self.assertEqual(cache.stats["hits"], 2)
+        self.assertIn("2 hits, 1 misses", cache.summary())
+
+    def test_generate_page_output_identical_with_cache(self):
+        source = os.path.join(self.root, "index.md")
+        template = os.path.join(self.root, "template.html")
+        self.write(source, "# Home\n\n[link](/blog) and **bold**")
+        self.write(template, "<title>{{ Title }}</title>{{ Content }}")
+        plain = os.path.join(self.root, "plain.html")
+        cold = os.path.join(self.root, "cold.html")
+        warm = os.path.join(self.root, "warm.html")
+        cache = ParseCache(self.directory)
+
+        generate_page(source, template, plain, "/site/")
+        generate_page(source, template, cold, "/site/", cache=cache)
+        generate_page(source, template, warm, "/site/", cache=cache)
+
+        self.assertEqual(self.read(cold), self.read(plain))
+        self.assertEqual(self.read(warm), self.read(plain))
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["misses"], 1)
+
+    def test_generate_page_streams_cached_bodies(self):
+        source = os.path.join(self.root, "index.md")
+        template = os.path.join(self.root, "template.html")
+        dest = os.path.join(self.root, "index.html")
+        self.write(source, "# Home\n\nWelcome")
+        self.write(template, "<title>{{ Title }}</title>{{ Content }}")
+        cache = ParseCache(self.directory)
+        with mock.patch(
+            "utils.helpers.write_output", side_effect=AssertionError("buffered")
+        ):
+            generate_page(source, template, dest, "/", cache=cache)
+            generate_page(source, template, dest, "/", cache=cache)
+        self.assertEqual(
+            self.read(dest), "<title>Home</title><div><h1>Home</h1><p>Welcome</p></div>"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import gzip
+import lzma
+import os
+import unittest
+
+from tests.temp_tree import TempTreeTestCase
+from utils.compress import (
+    CompressionIndex,
+    parse_codecs,
+    precompress,
+    remove_stale_siblings,
+    update_siblings,
+)
+
+PAGE = "<p>" + "lorem ipsum dolor sit amet " * 100 + "</p>"
+
+
+class TestParseCodecs(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_codecs("gz"), ("gz",))
+        self.assertEqual(parse_codecs("xz, gz,xz"), ("xz", "gz"))
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            parse_codecs("gz,br")
+
+
+class TestPrecompress(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.docs = os.path.join(self.root, "docs")
+        self.index = CompressionIndex(os.path.join(self.root, "compress.json"))
+        self.write("index.html", PAGE)
+        self.write("blog/post/index.html", PAGE + "<p>post</p>")
+        self.write("index.css", "body { color: red; }\n" * 100)
+        self.write("small.html", "<p>small</p>")
+        self.write("images/logo.png", "x" * 4096)
+
+    def path(self, name):
+        return os.path.join(self.docs, name)
+
+    def write(self, name, text):
+        super().write(self.path(name), text)
+
+    def compress(self, codecs=("gz",), jobs=2):
+        index = CompressionIndex.load(self.index.path)
+        return precompress(self.docs, codecs, 1024, jobs, index)
+
+    def test_writes_siblings_of_large_text_files(self):
+        result = self.compress()
+        self.assertEqual(
+            result.compressed, ["blog/post/index.html", "index.css", "index.html"]
+        )
+        with gzip.open(self.path("index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), PAGE)
+        self.assertFalse(os.path.exists(self.path("small.html.gz")))
+        self.assertFalse(os.path.exists(self.path("images/logo.png.gz")))
+
+    def test_output_is_deterministic(self):
+        self.compress()
+        with open(self.path("index.html.gz"), "rb") as f:
+            first = f.read()
+        os.remove(self.path("index.html.gz"))
+        self.compress()
+        with open(self.path("index.html.gz"), "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_unchanged_files_are_skipped(self):
+        self.compress()
+        stamp = os.stat(self.path("index.html.gz")).st_mtime_ns
+        result = self.compress()
+        self.assertEqual(result.compressed, [])
+        self.assertEqual(len(result.unchanged), 3)
+        self.assertEqual(os.stat(self.path("index.html.gz")).st_mtime_ns, stamp)
+
+    def test_rewritten_file_with_same_content_is_not_compressed(self):
+        self.compress()
+        os.remove(self.path("index.html"))
+        self.write("index.html", PAGE)
+        result = self.compress()
+        self.assertEqual(result.compressed, [])
+        self.assertIn("index.html", result.unchanged)
+
+    def test_changed_file_is_compressed_again(self):
+        self.compress()
+        self.write("index.html", PAGE + "<p>more</p>")
+        result = self.compress()
+        self.assertEqual(result.compressed, ["index.html"])
+        with gzip.open(self.path("index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), PAGE + "<p>more</p>")
+
+    def test_missing_sibling_is_written_again(self):
+        self.compress()
+        os.remove(self.path("index.css.gz"))
+        result = self.compress()
+        self.assertEqual(result.compressed, ["index.css"])
+        self.assertTrue(os.path.exists(self.path("index.css.gz")))
+
+    def test_stale_siblings_are_removed(self):
+        self.compress()
+        os.remove(self.path("blog/post/index.html"))
+        self.write("index.css", "body {}")
+        result = self.compress()
+        self.assertEqual(result.removed, ["blog/post/index.html.gz", "index.css.gz"])
+        self.assertFalse(os.path.exists(self.path("blog")))
+        self.assertFalse(os.path.exists(self.path("index.css.gz")))
+
+    def test_unrecorded_compressed_files_are_kept(self):
+        self.write("archive.txt.gz", "not ours")
+        self.compress()
+        self.assertTrue(os.path.exists(self.path("archive.txt.gz")))
+
+    def test_codec_changes(self):
+        self.compress(("gz", "xz"))
+        with lzma.open(self.path("index.html.xz"), "rt") as f:
+            self.assertEqual(f.read(), PAGE)
+        result = self.compress(("gz",))
+        self.assertEqual(result.compressed, [])
+        self.assertEqual(
+            result.removed,
+            ["blog/post/index.html.xz", "index.css.xz", "index.html.xz"],
+        )
+        self.assertTrue(os.path.exists(self.path("index.html.gz")))
+        self.assertFalse(os.path.exists(self.path("index.html.xz")))
+
+    def test_added_codec_keeps_existing_siblings(self):
+        self.compress()
+        stamp = os.stat(self.path("index.html.gz")).st_mtime_ns
+        result = self.compress(("gz", "xz"))
+        self.assertEqual(len(result.compressed), 3)
+        self.assertTrue(os.path.exists(self.path("index.html.xz")))
+        self.assertEqual(os.stat(self.path("index.html.gz")).st_mtime_ns, stamp)
+
+    def test_index_is_saved(self):
+        self.compress(jobs=1)
+        index = CompressionIndex.load(self.index.path)
+        self.assertEqual(
+            sorted(index.entries),
+            ["blog/post/index.html", "index.css", "index.html"],
+        )
+        self.assertEqual(index.entries["index.html"][2], ("gz",))
+
+    def test_build_without_compression_removes_changed_siblings(self):
+        self.compress()
+        self.write("index.html", PAGE + "<p>more</p>")
+        os.remove(self.path("index.css"))
+        self.write("index.css", "body { color: red; }\n" * 100)
+        result = remove_stale_siblings(
+            self.docs, CompressionIndex.load(self.index.path)
+        )
+        self.assertEqual(result.removed, ["index.html.gz"])
+        self.assertEqual(result.unchanged, ["blog/post/index.html", "index.css"])
+        self.assertTrue(os.path.exists(self.path("index.css.gz")))
+        self.assertEqual(
+            sorted(CompressionIndex.load(self.index.path).entries),
+            ["blog/post/index.html", "index.css"],
+        )
+
+    def test_update_siblings_compresses_only_with_codecs(self):
+        index = CompressionIndex.load(self.index.path)
+        self.assertEqual(
+            len(update_siblings(self.docs, ("gz",), 1024, 1, index).compressed), 3
+        )
+        self.write("index.html", PAGE + "<p>more</p>")
+        result = update_siblings(self.docs, (), 1024, 1, index)
+        self.assertEqual(result.compressed, [])
+        self.assertEqual(result.removed, ["index.html.gz"])
+
+    def test_without_index_nothing_is_saved(self):
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.root)
+        precompress("docs")
+        self.assertTrue(os.path.exists(self.path("index.html.gz")))
+        self.assertFalse(os.path.exists(".cache"))
+
+
+if __name__ == "__main__":
+    unittest.main()
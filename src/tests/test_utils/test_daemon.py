@@ -0,0 +1,155 @@
+import os
+import socket
+import threading
+
+from tests.temp_tree import TempTreeTestCase
+from utils.builder import SiteBuilder
+from utils.cache import DEFAULT_MEMORY_BYTES, ParseCache
+from utils.client import send_request
+from utils.compress import CompressionIndex
+from utils.daemon import BuildDaemon
+from utils.manifest import BuildManifest
+
+
+class TestBuildDaemon(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(self.static)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.cache = ParseCache(os.path.join(self.root, "cache"))
+        builder = SiteBuilder(
+            self.content,
+            self.static,
+            self.template,
+            self.dest,
+            "/",
+            BuildManifest(os.path.join(self.root, "manifest.json")),
+            self.cache,
+            DEFAULT_MEMORY_BYTES,
+        )
+        builder.compression = CompressionIndex(os.path.join(self.root, "compress.json"))
+        self.socket_path = os.path.join(self.root, "build.sock")
+        self.daemon = BuildDaemon(builder, self.socket_path)
+
+    def write(self, path, text):
+        super().write(path, text)
+        self.bump_mtime(path)
+
+    def test_build_only_changed_files(self):
+        first = self.daemon.handle({"command": "build"})
+        self.assertTrue(first["ok"])
+        self.assertEqual(len(first["touched"]), 3)
+        self.assertEqual(self.daemon.handle({"command": "build"})["touched"], [])
+
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "# Home\n\nChanged")
+        touched = self.daemon.handle({"command": "build"})["touched"]
+        self.assertEqual(touched, [os.path.join(self.dest, "index.html")])
+        self.assertIn("Changed", self.read(touched[0]))
+
+    def test_new_and_removed_files(self):
+        self.daemon.build()
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "# Post")
+        os.remove(os.path.join(self.static, "index.css"))
+        touched = self.daemon.build()
+        self.assertIn(os.path.join(self.dest, "blog", "post.html"), touched)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+
+    def test_template_change_reuses_bodies_in_memory(self):
+        self.daemon.build()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        stats = dict(self.cache.stats)
+        touched = self.daemon.build()
+        self.assertEqual(len(touched), 2)
+        self.assertEqual(self.cache.stats, stats)
+        self.assertTrue(self.read(touched[0]).startswith("<h1>"))
+
+    def test_rebuild_given_changes(self):
+        self.daemon.build()
+        source = os.path.join(self.content, "blog", "index.md")
+        self.write(source, "# Blog\n\nNew posts")
+        response = self.daemon.handle({"command": "rebuild", "changes": [source]})
+        self.assertEqual(
+            response["touched"], [os.path.join(self.dest, "blog", "index.html")]
+        )
+        # the reported change is not rebuilt again by the next build
+        self.assertEqual(self.daemon.build(), [])
+
+    def test_failures(self):
+        self.daemon.build()
+        source = os.path.join(self.content, "index.md")
+        self.write(source, "# Home\n\nUnclosed `code")
+        response = self.daemon.handle({"command": "build"})
+        self.assertFalse(response["ok"])
+        self.assertEqual(response["failures"][0][0], source)
+
+    def test_bad_requests(self):
+        self.assertFalse(self.daemon.handle({"command": "explode"})["ok"])
+        self.assertFalse(self.daemon.handle({"command": "rebuild"})["ok"])
+        self.assertFalse(
+            self.daemon.handle({"command": "rebuild", "changes": [1]})["ok"]
+        )
+        self.assertFalse(self.daemon.handle(["build"])["ok"])
+
+    def test_status(self):
+        self.daemon.build()
+        self.daemon.handle({"command": "build"})
+        status = self.daemon.handle({"command": "status"})
+        self.assertEqual(status["builds"], 1)
+        self.assertEqual(status["files"], 4)
+        self.assertIn("misses", status["cache"])
+
+    def serve(self):
+        ready = threading.Event()
+        thread = threading.Thread(target=self.daemon.serve, args=(ready.set,))
+        thread.start()
+        self.assertTrue(ready.wait(5))
+        return thread
+
+    def test_serve(self):
+        thread = self.serve()
+        try:
+            response = send_request({"command": "build"}, self.socket_path, 5)
+            self.assertEqual(len(response["touched"]), 3)
+            response = send_request({"command": "build"}, self.socket_path, 5)
+            self.assertEqual(response["touched"], [])
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(self.socket_path)
+                sock.sendall(b"not json\n")
+                self.assertIn(b'"ok": false', sock.recv(1024))
+        finally:
+            self.assertTrue(
+                send_request({"command": "stop"}, self.socket_path, 5)["ok"]
+            )
+            thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_stale_socket_is_replaced(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(self.socket_path)
+        thread = self.serve()
+        send_request({"command": "stop"}, self.socket_path, 5)
+        thread.join(5)
+
+    def test_running_daemon_is_not_replaced(self):
+        thread = self.serve()
+        try:
+            other = BuildDaemon(self.daemon.builder, self.socket_path)
+            with self.assertRaises(OSError):
+                other.serve()
+        finally:
+            send_request({"command": "stop"}, self.socket_path, 5)
+            thread.join(5)
+
+    def test_no_daemon(self):
+        with self.assertRaises(OSError):
+            send_request({"command": "build"}, self.socket_path, 1)
@@ -0,0 +1,350 @@
+import gzip
+import http.client
+import os
+import threading
+import unittest
+
+from tests.temp_tree import TempTreeTestCase
+from utils.devserver import (
+    LIVE_RELOAD_SCRIPT,
+    DevServer,
+    DevSite,
+    LiveReload,
+    accepts_gzip,
+    etag_matches,
+)
+from utils.helpers import generate_page
+from utils.listing import build_listing, listing_dest
+from utils.metadata import MetadataIndex
+from utils.plan import page_name, scan_tree
+
+
+class TestHeaders(unittest.TestCase):
+    def test_accepts_gzip(self):
+        self.assertTrue(accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(accepts_gzip("br;q=1.0, GZIP;q=0.5"))
+        self.assertTrue(accepts_gzip("*"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("identity"))
+        self.assertFalse(accepts_gzip(None))
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(etag_matches('W/"b"', '"b"'))
+        self.assertTrue(etag_matches("*", '"b"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches(None, '"b"'))
+
+
+class DevSiteTestCase(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(
+            self.template, '<title>{{ Title }}</title><a href="/">home</a>{{ Content }}'
+        )
+        self.write(
+            os.path.join(self.content, "index.md"), "# Home\n\n" + "Welcome " * 100
+        )
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+        self.write(os.path.join(self.content, "about.md"), "# About")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.site = DevSite(self.content, self.static, self.template)
+
+    def write(self, path, text):
+        super().write(path, text)
+        self.bump_mtime(path)
+
+
+class TestDevSite(DevSiteTestCase):
+    def test_resolve(self):
+        self.assertEqual(
+            self.site.resolve("/"), ("page", os.path.join(self.content, "index.md"))
+        )
+        self.assertEqual(
+            self.site.resolve("/blog/index.html"),
+            ("page", os.path.join(self.content, "blog", "index.md")),
+        )
+        self.assertEqual(
+            self.site.resolve("/about.html"),
+            ("page", os.path.join(self.content, "about.md")),
+        )
+        self.assertEqual(
+            self.site.resolve("/index.css"),
+            ("asset", os.path.join(self.static, "index.css")),
+        )
+        self.assertEqual(self.site.resolve("/blog"), ("redirect", "/blog/"))
+        self.assertEqual(self.site.resolve("/nothing"), ("missing", None))
+        self.assertEqual(self.site.resolve("/../template.html"), ("missing", None))
+
+    def test_page_matches_build(self):
+        dest = os.path.join(self.root, "docs", "index.html")
+        generate_page(os.path.join(self.content, "index.md"), self.template, dest, "/")
+        status, headers, body = self.site.respond("/")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "text/html; charset=utf-8")
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), body)
+
+    def test_cached_until_inputs_change(self):
+        _, headers, _ = self.site.respond("/")
+        _, cached, _ = self.site.respond("/")
+        self.assertEqual(headers["ETag"], cached["ETag"])
+        self.assertEqual(self.site.stats, {"hits": 1, "misses": 1, "not_modified": 0})
+
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        _, changed, body = self.site.respond("/")
+        self.assertNotEqual(headers["ETag"], changed["ETag"])
+        self.assertIn(b"Changed", body)
+
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        _, retemplated, body = self.site.respond("/")
+        self.assertNotEqual(changed["ETag"], retemplated["ETag"])
+        self.assertTrue(body.startswith(b"<h1>Home</h1>"))
+
+    def test_not_modified(self):
+        _, headers, _ = self.site.respond("/")
+        status, _, body = self.site.respond("/", headers["ETag"])
+        self.assertEqual((status, body), (304, b""))
+        status, _, _ = self.site.respond("/", '"stale"')
+        self.assertEqual(status, 200)
+        _, headers, _ = self.site.respond("/index.css")
+        self.assertEqual(self.site.respond("/index.css", headers["ETag"])[0], 304)
+
+    def test_not_modified_after_restart_renders_nothing(self):
+        _, plain, _ = self.site.respond("/")
+        _, gzipped, _ = self.site.respond("/", None, "gzip")
+        site = DevSite(self.content, self.static, self.template)
+        self.assertEqual(site.respond("/", plain["ETag"])[0], 304)
+        self.assertEqual(site.respond("/", gzipped["ETag"], "gzip")[0], 304)
+        self.assertEqual(site.stats, {"hits": 0, "misses": 0, "not_modified": 2})
+        # a small page's plain tag is only known to match once it is rendered
+        _, small, _ = site.respond("/about.html")
+        self.assertEqual(site.respond("/about.html", small["ETag"], "gzip")[0], 304)
+
+    def test_gzip(self):
+        _, plain_headers, plain = self.site.respond("/")
+        status, headers, body = self.site.respond("/", None, "gzip")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(body), plain)
+        self.assertNotEqual(headers["ETag"], plain_headers["ETag"])
+        self.assertEqual(self.site.respond("/", headers["ETag"], "gzip")[0], 304)
+        # too small to be worth compressing
+        _, headers, _ = self.site.respond("/index.css", None, "gzip")
+        self.assertNotIn("Content-Encoding", headers)
+
+    def test_basepath(self):
+        site = DevSite(self.content, self.static, self.template, "/site/")
+        status, _, body = site.respond("/site/")
+        self.assertEqual(status, 200)
+        self.assertIn(b'href="/site/"', body)
+        self.assertEqual(site.respond("/site/index.css")[0], 200)
+
+    def test_errors(self):
+        self.assertEqual(self.site.respond("/missing.html")[0], 404)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n`unclosed")
+        status, _, body = self.site.respond("/")
+        self.assertEqual(status, 500)
+        self.assertIn(b"uneven number", body)
+
+    def test_never_writes_output(self):
+        self.site.respond("/")
+        self.site.respond("/index.css")
+        self.assertFalse(os.path.exists(os.path.join(self.root, "docs")))
+
+    def test_http(self):
+        server = DevServer(("localhost", 0), self.site, verbose=False)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            connection = http.client.HTTPConnection(*server.server_address[:2])
+            connection.request("GET", "/?reload=1", headers={"Accept-Encoding": "gzip"})
+            response = connection.getresponse()
+            body = response.read()
+            self.assertEqual(response.status, 200)
+            self.assertIn(b"<h1>Home</h1>", gzip.decompress(body))
+            etag = response.getheader("ETag")
+
+            connection.request(
+                "GET", "/", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"}
+            )
+            response = connection.getresponse()
+            self.assertEqual((response.status, response.read()), (304, b""))
+
+            connection.request("HEAD", "/index.css")
+            response = connection.getresponse()
+            self.assertEqual(response.read(), b"")
+            self.assertEqual(response.getheader("Content-Length"), "7")
+
+            connection.request("GET", "/blog")
+            response = connection.getresponse()
+            response.read()
+            self.assertEqual(response.status, 301)
+            self.assertEqual(response.getheader("Location"), "/blog/")
+            connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+
+class TestDevSiteListing(DevSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.posts = os.path.join(self.content, "posts")
+        for index in (1, 2, 3):
+            self.write(
+                os.path.join(self.posts, f"post{index}.md"),
+                f"---\ndate: 2024-01-0{index}\n---\n# Post {index}",
+            )
+        self.site = DevSite(
+            self.content, self.static, self.template, listing="posts", page_size=2
+        )
+
+    def test_resolve(self):
+        self.assertEqual(self.site.resolve("/posts/"), ("listing", 1))
+        self.assertEqual(self.site.resolve("/posts/page/2/"), ("listing", 2))
+        self.assertEqual(self.site.resolve("/posts"), ("redirect", "/posts/"))
+        self.assertEqual(self.site.resolve("/posts/page/1/"), ("missing", None))
+        self.assertEqual(self.site.resolve("/posts/page/02/"), ("missing", None))
+        self.assertEqual(self.site.respond("/posts/page/3/")[0], 404)
+
+    def test_listing_matches_build(self):
+        dest = os.path.join(self.root, "docs")
+        build_listing(
+            scan_tree(self.content, dest, page_name),
+            "posts",
+            self.content,
+            self.template,
+            dest,
+            "/",
+            2,
+            metadata=MetadataIndex(os.path.join(self.root, "metadata.json")),
+        )
+        for number in (1, 2):
+            status, _, body = self.site.respond(
+                "/posts/" if number == 1 else f"/posts/page/{number}/"
+            )
+            self.assertEqual(status, 200)
+            with open(listing_dest(dest, "posts", number), "rb") as f:
+                self.assertEqual(f.read(), body)
+
+    def test_listing_follows_posts(self):
+        self.site.respond("/posts/")
+        self.assertEqual(
+            self.site.respond("/posts/")[1], self.site.respond("/posts/")[1]
+        )
+        self.assertEqual(self.site.stats["misses"], 1)
+        self.write(
+            os.path.join(self.posts, "post3.md"),
+            "---\ndate: 2024-01-03\n---\n# Renamed",
+        )
+        self.assertIn(b"Renamed", self.site.respond("/posts/")[2])
+        self.assertEqual(self.site.stats["misses"], 2)
+
+    def test_live_reload(self):
+        site = DevSite(
+            self.content,
+            self.static,
+            self.template,
+            live_reload=True,
+            listing="posts",
+        )
+        listing = site.live.subscribe(site.listing_source)
+        post = os.path.normpath(os.path.join(self.posts, "post1.md"))
+        self.assertEqual(site.apply_changes({post}), 1)
+        self.assertEqual(listing.get_nowait(), "reload")
+        self.assertEqual(
+            site.apply_changes({os.path.join(self.content, "about.md")}), 0
+        )
+
+
+class TestLiveReload(unittest.TestCase):
+    def test_notify(self):
+        live = LiveReload()
+        home = live.subscribe("content/index.md")
+        blog = live.subscribe("content/blog/index.md")
+        other = live.subscribe(None)
+        self.assertEqual(live.notify({"content/index.md"}), 1)
+        self.assertEqual(home.get_nowait(), "reload")
+        self.assertTrue(blog.empty())
+        self.assertEqual(live.notify(), 3)
+        self.assertEqual(other.get_nowait(), "reload")
+
+        live.unsubscribe(blog)
+        live.close()
+        self.assertEqual(home.get_nowait(), "reload")
+        self.assertIsNone(home.get_nowait())
+        self.assertEqual(blog.get_nowait(), "reload")
+        self.assertTrue(blog.empty())
+
+
+class TestDevSiteLiveReload(DevSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.template, "<html><body>{{ Content }}</body></html>")
+        self.site = DevSite(self.content, self.static, self.template, live_reload=True)
+        self.index = os.path.normpath(os.path.join(self.content, "index.md"))
+        self.blog = os.path.normpath(os.path.join(self.content, "blog", "index.md"))
+
+    def test_script_injected(self):
+        _, _, body = self.site.respond("/")
+        self.assertTrue(body.endswith((LIVE_RELOAD_SCRIPT + "</body></html>").encode()))
+        plain = DevSite(self.content, self.static, self.template)
+        self.assertNotEqual(
+            plain.respond("/")[1]["ETag"], self.site.respond("/")[1]["ETag"]
+        )
+
+    def test_only_edited_page(self):
+        home = self.site.live.subscribe(self.index)
+        blog = self.site.live.subscribe(self.blog)
+        self.site.respond("/")
+        self.site.respond("/blog/")
+
+        self.write(self.index, "# Home\n\nEdited")
+        self.assertEqual(self.site.apply_changes({self.index}), 1)
+        self.assertEqual(home.get_nowait(), "reload")
+        self.assertTrue(blog.empty())
+        # re-rendered once, ahead of the reload
+        self.assertEqual(self.site.stats["misses"], 3)
+        self.assertIn(b"Edited", self.site.respond("/")[2])
+        self.assertEqual(self.site.stats["misses"], 3)
+
+    def test_template_and_static_reload_all(self):
+        home = self.site.live.subscribe(self.index)
+        blog = self.site.live.subscribe(None)
+        self.assertEqual(self.site.apply_changes({self.template}), 2)
+        self.assertEqual(
+            self.site.apply_changes({os.path.join(self.static, "index.css")}), 2
+        )
+        self.assertEqual(home.qsize(), 2)
+        self.assertEqual(blog.qsize(), 2)
+        self.assertEqual(self.site.apply_changes({os.path.join(self.root, "x.md")}), 0)
+
+    def test_event_stream(self):
+        server = DevServer(("localhost", 0), self.site, verbose=False)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            connection = http.client.HTTPConnection(
+                *server.server_address[:2], timeout=5
+            )
+            connection.request("GET", "/__livereload?path=/blog/index.html")
+            response = connection.getresponse()
+            self.assertEqual(response.getheader("Content-Type"), "text/event-stream")
+            self.assertEqual(response.readline(), b"retry: 1000\n")
+            response.readline()
+
+            self.write(self.index, "# Home\n\nEdited")
+            self.assertEqual(self.site.apply_changes({self.index}), 0)
+            self.assertEqual(self.site.apply_changes({self.blog}), 1)
+            self.assertEqual(response.readline(), b"event: reload\n")
+            self.assertEqual(response.readline(), b"data: /blog/index.html\n")
+            connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
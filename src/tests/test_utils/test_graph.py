@@ -0,0 +1,90 @@
+import os
+import unittest
+
+from tests.temp_tree import TempTreeTestCase
+from utils.graph import DependencyGraph, referenced_assets
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.set_dependencies(
+            "docs/index.html", ["content/index.md", "template.html", "static/a.png"]
+        )
+        self.graph.set_dependencies(
+            "docs/blog/index.html", ["content/blog/index.md", "template.html"]
+        )
+
+    def test_content_change_affects_its_page(self):
+        self.assertEqual(
+            self.graph.affected({"content/blog/index.md"}), {"docs/blog/index.html"}
+        )
+
+    def test_template_change_affects_every_page(self):
+        self.assertEqual(
+            self.graph.affected({"template.html"}),
+            {"docs/index.html", "docs/blog/index.html"},
+        )
+
+    def test_asset_change_affects_referencing_pages(self):
+        self.assertEqual(self.graph.affected({"static/a.png"}), {"docs/index.html"})
+
+    def test_unrelated_change_affects_nothing(self):
+        self.assertEqual(self.graph.affected({"static/index.css"}), set())
+
+    def test_paths_are_normalized(self):
+        self.assertEqual(
+            self.graph.affected({"./content/index.md"}), {"docs/index.html"}
+        )
+
+    def test_set_dependencies_replaces_inputs(self):
+        self.graph.set_dependencies(
+            "docs/index.html", ["content/index.md", "template.html"]
+        )
+        self.assertEqual(self.graph.affected({"static/a.png"}), set())
+        self.assertNotIn("static/a.png", self.graph.dependents)
+
+    def test_remove(self):
+        self.graph.remove("docs/index.html")
+        self.assertEqual(
+            self.graph.affected({"template.html"}), {"docs/blog/index.html"}
+        )
+        self.assertEqual(self.graph.dependencies_of("docs/index.html"), set())
+
+    def test_prune(self):
+        self.graph.prune(["docs/blog/index.html"])
+        self.assertEqual(list(self.graph.dependencies), ["docs/blog/index.html"])
+
+    def test_round_trip(self):
+        graph = DependencyGraph(self.graph.to_dict())
+        self.assertEqual(graph.to_dict(), self.graph.to_dict())
+        self.assertEqual(
+            graph.affected({"template.html"}),
+            {"docs/index.html", "docs/blog/index.html"},
+        )
+
+
+class TestReferencedAssets(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        for name in ("images/a.png", "notes.pdf"):
+            self.write(os.path.join(self.static, name), "")
+
+    def test_images_and_links_to_static_files(self):
+        markdown = (
+            "# Page\n\n![a](/images/a.png) [notes](/notes.pdf?v=2) "
+            "[home](/) [post](/blog/post) [ext](https://example.com/a.png) "
+            "![missing](/images/b.png) ![relative](images/a.png)"
+        )
+        self.assertEqual(
+            referenced_assets(markdown, self.static),
+            [
+                os.path.join(self.static, "images", "a.png"),
+                os.path.join(self.static, "notes.pdf"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 
-from src.utils.helpers import extract_title
+from src.utils.helpers import extract_title, generate_page, split_page
 
 
 class TestExtractTitle(unittest.TestCase):
@@ -18,3 +21,79 @@ class TestExtractTitle(unittest.TestCase):
         markdown = ""
         with self.assertRaises(ValueError):
             extract_title(markdown)
+
+
+class TestSplitPage(unittest.TestCase):
+    def test_title_from_heading(self):
+        self.assertEqual(split_page("# Title\n\nBody"), ("Title", "# Title\n\nBody"))
+
+    def test_title_from_front_matter(self):
+        self.assertEqual(
+            split_page("---\ntitle: Front\n---\n# Title\n\nBody"),
+            ("Front", "# Title\n\nBody"),
+        )
+
+    def test_front_matter_without_title(self):
+        self.assertEqual(
+            split_page("---\ndate: 2024-01-02\n---\n\n# Title"), ("Title", "# Title")
+        )
+
+    def test_no_title(self):
+        with self.assertRaises(ValueError):
+            split_page("---\ndate: 2024-01-02\n---\nBody")
+
+
+class TestGeneratePage(unittest.TestCase):
+    def test_identical_page_is_not_rewritten(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "index.md")
+            template = os.path.join(root, "template.html")
+            dest = os.path.join(root, "docs", "index.html")
+            with open(source, "w") as f:
+                f.write("# Home\n\nWelcome")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+
+            generate_page(source, template, dest, "/")
+            inode = os.stat(dest).st_ino
+            generate_page(source, template, dest, "/")
+            self.assertEqual(os.stat(dest).st_ino, inode)
+
+            with open(source, "w") as f:
+                f.write("# Home\n\nChanged")
+            generate_page(source, template, dest, "/")
+            self.assertNotEqual(os.stat(dest).st_ino, inode)
+            with open(dest) as f:
+                self.assertEqual(
+                    f.read(),
+                    "<title>Home</title><div><h1>Home</h1><p>Changed</p></div>",
+                )
+
+    def test_failed_render_leaves_page_intact(self):
+        def failing_html(body):
+            yield "<div><h1>Home</h1>"
+            raise ValueError("invalid markdown")
+
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "index.md")
+            template = os.path.join(root, "template.html")
+            dest = os.path.join(root, "docs", "index.html")
+            with open(source, "w") as f:
+                f.write("# Home\n\nWelcome")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            generate_page(source, template, dest, "/")
+            with open(source, "w") as f:
+                f.write("# Home\n\nChanged")
+
+            with (
+                mock.patch("src.utils.helpers.iter_markdown_html", failing_html),
+                self.assertRaises(ValueError),
+            ):
+                generate_page(source, template, dest, "/")
+            with open(dest) as f:
+                self.assertEqual(
+                    f.read(),
+                    "<title>Home</title><div><h1>Home</h1><p>Welcome</p></div>",
+                )
+            self.assertEqual(os.listdir(os.path.dirname(dest)), ["index.html"])
@@ -0,0 +1,148 @@
+import os
+import unittest
+
+from tests.temp_tree import TempTreeTestCase
+from utils.listing import (
+    generate_listing,
+    listing_dest,
+    page_url,
+    paginate,
+    remove_stale_listings,
+)
+from utils.manifest import BuildManifest
+from utils.metadata import PageMetadata
+
+
+class TestListingHelpers(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs"), "/")
+        self.assertEqual(
+            page_url(os.path.join("docs", "blog", "tom", "index.html"), "docs"),
+            "/blog/tom",
+        )
+        self.assertEqual(
+            page_url(os.path.join("docs", "blog", "tom.html"), "docs"), "/blog/tom.html"
+        )
+
+    def test_listing_dest(self):
+        self.assertEqual(
+            listing_dest("docs", "blog", 1), os.path.join("docs", "blog", "index.html")
+        )
+        self.assertEqual(
+            listing_dest("docs", "blog", 3),
+            os.path.join("docs", "blog", "page", "3", "index.html"),
+        )
+
+    def test_paginate(self):
+        self.assertEqual(paginate([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+        self.assertEqual(paginate([], 2), [[]])
+        with self.assertRaises(ValueError):
+            paginate([1], 0)
+
+
+class TestGenerateListing(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        self.posts = [self.post(index) for index in range(5, 0, -1)]
+
+    def post(self, index, title=None):
+        return PageMetadata(
+            os.path.join("content", "blog", f"post{index}.md"),
+            os.path.join(self.dest, "blog", f"post{index}", "index.html"),
+            title or f"Post {index}",
+            {"date": f"2024-01-0{index}"},
+        )
+
+    def generate(self, posts, page_size=2, basepath="/"):
+        return generate_listing(
+            posts, "blog", self.template, self.dest, basepath, page_size, self.manifest
+        )
+
+    def read_page(self, number):
+        with open(listing_dest(self.dest, "blog", number)) as f:
+            return f.read()
+
+    def test_pages(self):
+        touched = self.generate(self.posts)
+        self.assertEqual(
+            touched, [listing_dest(self.dest, "blog", number) for number in (1, 2, 3)]
+        )
+        first = self.read_page(1)
+        self.assertTrue(first.startswith("<title>Blog</title><div><h1>Blog</h1>"))
+        self.assertIn(
+            '<li><a href="/blog/post5">Post 5</a> '
+            '<time datetime="2024-01-05">2024-01-05</time></li>',
+            first,
+        )
+        self.assertIn('<a href="/blog/page/2" rel="next">', first)
+        self.assertNotIn('rel="prev"', first)
+        last = self.read_page(3)
+        self.assertIn("<title>Blog - Page 3</title>", last)
+        self.assertIn('<a href="/blog/page/2" rel="prev">', last)
+        self.assertNotIn('rel="next"', last)
+
+    def test_basepath(self):
+        self.generate(self.posts, basepath="/site/")
+        self.assertIn('<a href="/site/blog/post5">', self.read_page(1))
+
+    def test_unchanged_listing_is_skipped(self):
+        self.generate(self.posts)
+        self.assertEqual(self.generate(self.posts), [])
+        self.assertEqual(self.manifest.skipped, 3)
+
+    def test_only_changed_slice_is_regenerated(self):
+        self.generate(self.posts)
+        posts = list(self.posts)
+        posts[2] = self.post(3, "Renamed")
+        self.assertEqual(self.generate(posts), [listing_dest(self.dest, "blog", 2)])
+        self.assertIn("Renamed", self.read_page(2))
+
+    def test_new_last_page_regenerates_only_its_neighbour(self):
+        self.generate(self.posts[:4])
+        touched = self.generate(self.posts)
+        self.assertEqual(
+            touched,
+            [listing_dest(self.dest, "blog", 2), listing_dest(self.dest, "blog", 3)],
+        )
+
+    def test_stale_pages_are_deleted(self):
+        self.generate(self.posts)
+        touched = self.generate(self.posts, page_size=5)
+        self.assertEqual(
+            touched,
+            [
+                listing_dest(self.dest, "blog", 1),
+                listing_dest(self.dest, "blog", 2),
+                listing_dest(self.dest, "blog", 3),
+            ],
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "page")))
+
+    def test_dropped_listing_is_deleted(self):
+        self.generate(self.posts)
+        touched = remove_stale_listings(self.manifest, self.dest)
+        self.assertEqual(len(touched), 3)
+        self.assertEqual(self.manifest.listings, {})
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_listing_replaced_by_page_is_kept(self):
+        self.generate(self.posts)
+        index = listing_dest(self.dest, "blog", 1)
+        self.manifest.entries[os.path.join("content", "blog", "index.md")] = {
+            "dest": index
+        }
+        remove_stale_listings(self.manifest, self.dest)
+        self.assertTrue(os.path.exists(index))
+        self.assertFalse(os.path.exists(listing_dest(self.dest, "blog", 2)))
+
+    def test_empty_section(self):
+        self.generate([])
+        self.assertIn("<h1>Blog</h1></div>", self.read_page(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+from unittest import mock
+
+from tests.temp_tree import TempTreeTestCase
+from utils.helpers import generate_pages_recursive
+from utils.manifest import BuildManifest
+
+
+class TestBuildManifest(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nPosts")
+
+    def build(self, basepath="/"):
+        manifest = BuildManifest.load(self.manifest_path)
+        generate_pages_recursive(
+            self.content, self.template, self.dest, basepath, manifest
+        )
+        manifest.save()
+        return manifest
+
+    def test_first_build_generates_everything(self):
+        manifest = self.build()
+        self.assertEqual(manifest.generated, 2)
+        self.assertEqual(manifest.skipped, 0)
+
+    def test_unchanged_rebuild_skips_everything(self):
+        self.build()
+        manifest = self.build()
+        self.assertEqual(manifest.generated, 0)
+        self.assertEqual(manifest.skipped, 2)
+
+    def test_content_change_regenerates_page(self):
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        manifest = self.build()
+        self.assertEqual(manifest.generated, 1)
+        self.assertEqual(manifest.skipped, 1)
+
+    def test_template_change_regenerates_all(self):
+        self.build()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        manifest = self.build()
+        self.assertEqual(manifest.generated, 2)
+
+    def test_basepath_change_regenerates_all(self):
+        self.build()
+        manifest = self.build("/site/")
+        self.assertEqual(manifest.generated, 2)
+
+    def test_parser_version_change_regenerates_all(self):
+        self.build()
+        with mock.patch("utils.manifest.PARSER_VERSION", -1):
+            manifest = self.build()
+        self.assertEqual(manifest.generated, 2)
+        self.assertEqual(manifest.skipped, 0)
+
+    def test_missing_output_regenerates_page(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        manifest = self.build()
+        self.assertEqual(manifest.generated, 1)
+
+    def test_deleted_source_is_dropped(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        manifest = self.build()
+        self.assertEqual(
+            list(manifest.entries), [os.path.join(self.content, "index.md")]
+        )
+
+    def test_dependency_graph_is_persisted(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(
+            manifest.graph.affected({os.path.join(self.content, "index.md")}),
+            {os.path.join(self.dest, "index.html")},
+        )
+        self.assertEqual(len(manifest.graph.affected({self.template})), 2)
+
+    def test_deleted_source_is_dropped_from_graph(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        manifest = self.build()
+        self.assertEqual(
+            manifest.graph.affected({self.template}),
+            {os.path.join(self.dest, "index.html")},
+        )
+
+    def test_corrupt_manifest_is_ignored(self):
+        self.write(self.manifest_path, "not json")
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.entries, {})
@@ -0,0 +1,96 @@
+import os
+import unittest
+
+from tests.temp_tree import TempTreeTestCase
+from utils.metadata import MetadataIndex, read_header
+from utils.plan import page_name, scan_tree
+
+
+class TestMetadataIndex(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.index_path = os.path.join(self.root, "metadata.json")
+        self.write("index.md", "# Home\n\nWelcome")
+        self.write(
+            os.path.join("blog", "old.md"),
+            "---\ntitle: Old post\ndate: 2023-05-01\ntags: tolkien, elves\n"
+            "summary: An old post\n---\n\n# Old\n\nBody",
+        )
+        self.write(
+            os.path.join("blog", "new.md"),
+            "---\ndate: 2024-02-03\ntags: tolkien\n---\n# New post\n\nBody",
+        )
+
+    def write(self, name, text):
+        super().write(os.path.join(self.content, name), text)
+
+    def refreshed(self):
+        index = MetadataIndex.load(self.index_path)
+        index.refresh(scan_tree(self.content, self.dest, page_name))
+        index.save()
+        return index
+
+    def test_read_header(self):
+        page = read_header(os.path.join(self.content, "blog", "old.md"), "old.html")
+        self.assertEqual(page.title, "Old post")
+        self.assertEqual(page.date, "2023-05-01")
+        self.assertEqual(page.tags, ["tolkien", "elves"])
+        self.assertEqual(page.summary, "An old post")
+
+    def test_read_header_title_after_front_matter(self):
+        page = read_header(os.path.join(self.content, "blog", "new.md"), "new.html")
+        self.assertEqual(page.title, "New post")
+
+    def test_read_header_reads_only_the_header(self):
+        path = os.path.join(self.content, "long.md")
+        with open(path, "wb") as f:
+            # the body is not even valid UTF-8, so reading it would fail
+            f.write(b"---\ndate: 2024-01-01\n---\n# Long\n\n" + b"a" * 100000 + b"\xff")
+        page = read_header(path, "long.html")
+        self.assertEqual(page.title, "Long")
+        self.assertEqual(page.date, "2024-01-01")
+
+    def test_read_header_unclosed_front_matter(self):
+        self.write("broken.md", "---\ntitle: Broken\n")
+        page = read_header(os.path.join(self.content, "broken.md"), "broken.html")
+        self.assertIsNone(page.title)
+        self.assertEqual(page.fields, {})
+
+    def test_pages_newest_first(self):
+        index = self.refreshed()
+        self.assertEqual(
+            [page.title for page in index.pages()], ["New post", "Old post", "Home"]
+        )
+        self.assertEqual(
+            [page.title for page in index.pages(os.path.join(self.content, "blog"))],
+            ["New post", "Old post"],
+        )
+        self.assertEqual([page.title for page in index.tagged("elves")], ["Old post"])
+
+    def test_unchanged_files_are_not_read_again(self):
+        self.assertEqual(self.refreshed().read, 3)
+        self.assertEqual(self.refreshed().read, 0)
+
+        self.write("index.md", "# Home again\n\nWelcome back")
+        index = self.refreshed()
+        self.assertEqual(index.read, 1)
+        self.assertEqual(
+            index.get(os.path.join(self.content, "index.md")).title, "Home again"
+        )
+
+    def test_removed_files_are_dropped(self):
+        self.refreshed()
+        os.remove(os.path.join(self.content, "blog", "old.md"))
+        index = self.refreshed()
+        self.assertIsNone(index.get(os.path.join(self.content, "blog", "old.md")))
+
+    def test_corrupt_index_is_ignored(self):
+        with open(self.index_path, "w") as f:
+            f.write("not json")
+        self.assertEqual(MetadataIndex.load(self.index_path).entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import json
+import os
+import warnings
+
+from tests.temp_tree import TempTreeTestCase
+from utils.output import (
+    OutputChanges,
+    OutputFile,
+    copy_output,
+    snapshot_outputs,
+    write_output,
+)
+
+
+class OutputTestCase(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "docs", "index.html")
+
+    def stamp(self, path):
+        stat = os.stat(path)
+        return stat.st_ino, stat.st_mtime_ns
+
+    def assertNoTempFiles(self):
+        for _, _, names in os.walk(self.root):
+            self.assertFalse([name for name in names if name.endswith(".tmp")])
+
+
+class TestWriteOutput(OutputTestCase):
+    def test_write_new_file(self):
+        self.assertTrue(write_output(self.path, "<p>é</p>"))
+        self.assertEqual(self.read(self.path), "<p>é</p>")
+
+    def test_write_bytes(self):
+        self.assertTrue(write_output(self.path, b"\x1f\x8b"))
+        self.assertFalse(write_output(self.path, b"\x1f\x8b"))
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"\x1f\x8b")
+
+    def test_identical_text_is_not_written(self):
+        write_output(self.path, "<p>a</p>")
+        stamp = self.stamp(self.path)
+        self.assertFalse(write_output(self.path, "<p>a</p>"))
+        self.assertEqual(self.stamp(self.path), stamp)
+
+    def test_changed_text_replaces_file(self):
+        write_output(self.path, "<p>a</p>")
+        stamp = self.stamp(self.path)
+        self.assertTrue(write_output(self.path, "<p>b</p>"))
+        self.assertEqual(self.read(self.path), "<p>b</p>")
+        self.assertNotEqual(self.stamp(self.path), stamp)
+        self.assertNoTempFiles()
+
+    def test_failed_write_removes_temp_file(self):
+        # a file cannot replace a directory that is not empty
+        self.write(os.path.join(self.path, "a.html"), "<p>a</p>")
+        with self.assertRaises(OSError):
+            write_output(self.path, "<p>b</p>")
+        with self.assertRaises(OSError):
+            copy_output(os.path.join(self.path, "a.html"), self.path)
+        self.assertNoTempFiles()
+
+
+class TestOutputFile(OutputTestCase):
+    def write_chunks(self, chunks):
+        with OutputFile(self.path) as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return f.changed
+
+    def test_new_file(self):
+        self.assertTrue(self.write_chunks(["<p>", "a", "</p>"]))
+        self.assertEqual(self.read(self.path), "<p>a</p>")
+        self.assertNoTempFiles()
+
+    def test_identical_chunks(self):
+        self.write_chunks(["<p>", "a", "</p>"])
+        stamp = self.stamp(self.path)
+        self.assertFalse(self.write_chunks(["<p>a", "</p>"]))
+        self.assertEqual(self.stamp(self.path), stamp)
+
+    def test_differences(self):
+        for old, new in [
+            ("<p>a</p>", ["<p>", "b", "</p>"]),
+            ("<p>a</p>", ["<p>", "a", "</p>", "more"]),
+            ("<p>a</p>more", ["<p>", "a", "</p>"]),
+            ("<p>a</p>", []),
+            ("", ["x"]),
+            ("x" * 200000, ["x" * 100000, "y"]),
+        ]:
+            with self.subTest(old=old[:10], new=new):
+                write_output(self.path, old)
+                self.assertTrue(self.write_chunks(new))
+                self.assertEqual(self.read(self.path), "".join(new))
+                self.assertNoTempFiles()
+
+    def test_error_keeps_old_file(self):
+        write_output(self.path, "<p>a</p>")
+        with self.assertRaises(ValueError), OutputFile(self.path) as f:
+            f.write("<p>b")
+            raise ValueError("failed")
+        self.assertEqual(self.read(self.path), "<p>a</p>")
+        self.assertNoTempFiles()
+
+    def test_every_path_closes_the_files(self):
+        write_output(self.path, "<p>a</p>")
+        # the temporary file cannot be created where a directory stands
+        os.mkdir(f"{self.path}.{os.getpid()}.tmp")
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            with OutputFile(self.path) as f:
+                f.write("<p>a</p>")
+            with self.assertRaises(IsADirectoryError), OutputFile(self.path) as f:
+                f.write("<p>b</p>")
+            f = None
+        self.assertEqual(caught, [])
+        self.assertEqual(self.read(self.path), "<p>a</p>")
+
+
+class TestOutputChanges(OutputTestCase):
+    def test_changes(self):
+        docs = os.path.join(self.root, "docs")
+        write_output(os.path.join(docs, "index.html"), "a")
+        write_output(os.path.join(docs, "blog", "index.html"), "b")
+        write_output(os.path.join(docs, "old.html"), "c")
+        before = snapshot_outputs(docs)
+        self.assertEqual(sorted(before), ["blog/index.html", "index.html", "old.html"])
+
+        # same size, possibly the same mtime: the rename still shows
+        write_output(os.path.join(docs, "blog", "index.html"), "B")
+        write_output(os.path.join(docs, "index.html"), "a")
+        write_output(os.path.join(docs, "new", "index.html"), "d")
+        os.remove(os.path.join(docs, "old.html"))
+        changes = OutputChanges(before, snapshot_outputs(docs))
+        self.assertEqual(
+            changes.to_dict(),
+            {
+                "added": ["new/index.html"],
+                "changed": ["blog/index.html"],
+                "removed": ["old.html"],
+            },
+        )
+        self.assertEqual(changes.summary(), "Output: 1 added, 1 changed, 1 removed")
+
+        path = os.path.join(self.root, "cache", "changes.json")
+        changes.save(path)
+        with open(path) as f:
+            self.assertEqual(json.load(f), changes.to_dict())
+
+    def test_missing_directory(self):
+        self.assertEqual(snapshot_outputs(os.path.join(self.root, "missing")), {})
+
+    def test_copy_output(self):
+        source = os.path.join(self.root, "a.css")
+        write_output(source, "body {}")
+        dest = os.path.join(self.root, "b.css")
+        write_output(dest, "old")
+        copy_output(source, dest)
+        self.assertEqual(self.read(dest), "body {}")
+        self.assertEqual(os.stat(dest).st_mtime_ns, os.stat(source).st_mtime_ns)
+        self.assertNoTempFiles()
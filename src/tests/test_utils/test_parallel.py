@@ -0,0 +1,69 @@
+import os
+
+from tests.temp_tree import TempTreeTestCase
+from utils.helpers import generate_pages_recursive, plan_pages
+from utils.parallel import BuildError, generate_pages_parallel
+
+
+class TestGeneratePagesParallel(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog", "post"))
+        self.write(self.template, '<title>{{ Title }}</title><a href="/">{{ Content }}')
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n**Welcome**")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\n- one")
+        self.write(
+            os.path.join(self.content, "blog", "post", "index.md"),
+            "# Post\n\n[home](/)",
+        )
+
+    def test_plan_pages(self):
+        dest = os.path.join(self.root, "docs")
+        pages = plan_pages(self.content, dest)
+        self.assertEqual(
+            pages,
+            [
+                (
+                    os.path.join(self.content, "blog", "index.md"),
+                    os.path.join(dest, "blog", "index.html"),
+                ),
+                (
+                    os.path.join(self.content, "blog", "post", "index.md"),
+                    os.path.join(dest, "blog", "post", "index.html"),
+                ),
+                (
+                    os.path.join(self.content, "index.md"),
+                    os.path.join(dest, "index.html"),
+                ),
+            ],
+        )
+
+    def test_matches_sequential_output(self):
+        sequential = os.path.join(self.root, "sequential")
+        parallel = os.path.join(self.root, "parallel")
+        generate_pages_recursive(self.content, self.template, sequential, "/base/")
+        generate_pages_parallel(
+            plan_pages(self.content, parallel), self.template, "/base/", 2
+        )
+        self.assertEqual(self.read_tree(sequential), self.read_tree(parallel))
+
+    def test_failures_are_aggregated(self):
+        self.write(os.path.join(self.content, "blog", "index.md"), "No title")
+        self.write(os.path.join(self.content, "index.md"), "Also no title")
+        dest = os.path.join(self.root, "docs")
+        with self.assertRaises(BuildError) as context:
+            generate_pages_parallel(
+                plan_pages(self.content, dest), self.template, "/", 2
+            )
+        self.assertEqual(
+            [source for source, _ in context.exception.failures],
+            [
+                os.path.join(self.content, "blog", "index.md"),
+                os.path.join(self.content, "index.md"),
+            ],
+        )
+        self.assertTrue(
+            os.path.exists(os.path.join(dest, "blog", "post", "index.html"))
+        )
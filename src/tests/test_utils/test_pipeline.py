@@ -0,0 +1,127 @@
+import os
+import threading
+import unittest
+
+from tests.temp_tree import TempTreeTestCase
+from utils.helpers import generate_pages_recursive, plan_pages
+from utils.manifest import BuildManifest
+from utils.parallel import BuildError
+from utils.pipeline import PAGE_EXPANSION, ByteBudget, generate_pages_pipeline
+from utils.profiler import Profiler
+
+
+class TestByteBudget(unittest.TestCase):
+    def test_acquire_blocks_until_release(self):
+        budget = ByteBudget(10)
+        budget.acquire(8)
+        acquired = threading.Event()
+
+        def acquire():
+            budget.acquire(5)
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+        budget.release(8)
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+        self.assertEqual(budget.used, 5)
+        self.assertEqual(budget.peak, 8)
+
+    def test_oversized_item_is_admitted_alone(self):
+        budget = ByteBudget(10)
+        budget.acquire(100)
+        self.assertEqual(budget.used, 100)
+
+
+class TestGeneratePagesPipeline(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write(self.template, '<title>{{ Title }}</title><a href="/">{{ Content }}')
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n**Welcome**")
+        for index in range(8):
+            self.write(
+                os.path.join(self.content, "blog", f"post{index}.md"),
+                f"# Post {index}\n\n[home](/) and `code`",
+            )
+
+    def test_matches_sequential_output(self):
+        sequential = os.path.join(self.root, "sequential")
+        generate_pages_recursive(self.content, self.template, sequential, "/base/")
+        generate_pages_pipeline(
+            plan_pages(self.content, self.dest), self.template, "/base/", 2
+        )
+        self.assertEqual(self.read_tree(sequential), self.read_tree(self.dest))
+
+    def test_memory_ceiling_bounds_pages_in_flight(self):
+        largest = max(
+            os.path.getsize(source) for source, _ in plan_pages(self.content, self.dest)
+        )
+        budget = generate_pages_pipeline(
+            plan_pages(self.content, self.dest),
+            self.template,
+            "/",
+            2,
+            max_bytes=largest * PAGE_EXPANSION * 2,
+        )
+        self.assertLessEqual(budget.peak, largest * PAGE_EXPANSION * 2)
+        self.assertEqual(budget.used, 0)
+        self.assertEqual(len(self.read_tree(self.dest)), 9)
+
+    def test_manifest_is_updated(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        pages = plan_pages(self.content, self.dest)
+        generate_pages_pipeline(pages, self.template, "/", 2, manifest)
+        self.assertEqual(manifest.generated, 9)
+
+        generate_pages_pipeline(pages, self.template, "/", 2, manifest)
+        self.assertEqual(manifest.skipped, 9)
+
+    def test_failures_are_aggregated_in_plan_order(self):
+        self.write(os.path.join(self.content, "index.md"), "No title")
+        self.write(os.path.join(self.content, "blog", "post3.md"), "No title")
+        with self.assertRaises(BuildError) as context:
+            generate_pages_pipeline(
+                plan_pages(self.content, self.dest), self.template, "/", 2
+            )
+        self.assertEqual(
+            [source for source, _ in context.exception.failures],
+            [
+                os.path.join(self.content, "blog", "post3.md"),
+                os.path.join(self.content, "index.md"),
+            ],
+        )
+        self.assertEqual(len(self.read_tree(self.dest)), 7)
+
+    def test_undecodable_source_is_a_failure(self):
+        with open(os.path.join(self.content, "blog", "post2.md"), "wb") as f:
+            f.write(b"# Post\n\n\xff\xfe")
+        with self.assertRaises(BuildError) as context:
+            generate_pages_pipeline(
+                plan_pages(self.content, self.dest), self.template, "/", 2
+            )
+        ((source, error),) = context.exception.failures
+        self.assertEqual(source, os.path.join(self.content, "blog", "post2.md"))
+        self.assertIsInstance(error, UnicodeDecodeError)
+        self.assertEqual(len(self.read_tree(self.dest)), 8)
+
+    def test_profiler_records_every_stage(self):
+        profiler = Profiler()
+        pages = plan_pages(self.content, self.dest)
+        generate_pages_pipeline(pages, self.template, "/", 2, profiler=profiler)
+        for phase in ("read", "parse", "template", "write"):
+            self.assertEqual(profiler.phases[phase].count, 9, phase)
+        self.assertEqual(sorted(profiler.pages), sorted(source for source, _ in pages))
+
+    def test_no_pages(self):
+        budget = generate_pages_pipeline([], self.template, "/", 2)
+        self.assertEqual(budget.peak, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
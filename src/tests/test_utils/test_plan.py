@@ -0,0 +1,81 @@
+import os
+import unittest
+
+from tests.temp_tree import TempTreeTestCase
+from utils.helpers import plan_pages
+from utils.plan import BuildPlan, PlannedFile, scan_tree
+from utils.sync import sync_directory
+
+
+class TestBuildPlan(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post!")
+        self.write(os.path.join(self.content, "blog", "notes.txt"), "not a page")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def test_scan(self):
+        plan = BuildPlan.scan(self.content, self.static, self.dest)
+        self.assertEqual(
+            [(page.source, page.dest, page.size) for page in plan.pages],
+            [
+                (
+                    os.path.join(self.content, "blog", "post", "index.md"),
+                    os.path.join(self.dest, "blog", "post", "index.html"),
+                    7,
+                ),
+                (
+                    os.path.join(self.content, "index.md"),
+                    os.path.join(self.dest, "index.html"),
+                    6,
+                ),
+            ],
+        )
+        self.assertEqual(
+            [(asset.source, asset.dest) for asset in plan.assets],
+            [
+                (
+                    os.path.join(self.static, "images", "a.png"),
+                    os.path.join(self.dest, "images", "a.png"),
+                ),
+                (
+                    os.path.join(self.static, "index.css"),
+                    os.path.join(self.dest, "index.css"),
+                ),
+            ],
+        )
+
+    def test_stat_info_matches_os_stat(self):
+        planned = scan_tree(self.static, self.dest)[1]
+        stat = os.stat(planned.source)
+        self.assertEqual(
+            planned,
+            PlannedFile(planned.source, planned.dest, stat.st_size, stat.st_mtime_ns),
+        )
+
+    def test_page_pairs_match_plan_pages(self):
+        plan = BuildPlan.scan(self.content, self.static, self.dest)
+        self.assertEqual(plan.page_pairs(), plan_pages(self.content, self.dest))
+
+    def test_missing_static_directory(self):
+        plan = BuildPlan.scan(self.content, os.path.join(self.root, "none"), self.dest)
+        self.assertEqual(plan.assets, [])
+        self.assertEqual(
+            plan.summary(), "Planned 2 pages (0.0 KiB), 0 assets (0.0 KiB)"
+        )
+
+    def test_sync_reuses_planned_assets(self):
+        plan = BuildPlan.scan(self.content, self.static, self.dest)
+        result = sync_directory(self.static, self.dest, files=plan.assets)
+        self.assertEqual(result.copied, ["index.css", os.path.join("images", "a.png")])
+        result = sync_directory(self.static, self.dest, files=plan.assets)
+        self.assertEqual(len(result.unchanged), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+
+from markdown.converter import markdown_to_html_node
+from utils.helpers import generate_page
+from utils.profiler import NULL_PHASE, NULL_PROFILER, Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_phase_accumulates(self):
+        profiler = Profiler()
+        for _ in range(3):
+            with profiler.phase("read"):
+                pass
+        self.assertEqual(profiler.phases["read"].count, 3)
+        self.assertGreaterEqual(profiler.phases["read"].wall, 0)
+
+    def test_merge(self):
+        first, second = Profiler(), Profiler()
+        with first.phase("read"), first.page("a.md"):
+            pass
+        with second.phase("read"), second.page("b.md"):
+            pass
+        first.merge(second)
+        self.assertEqual(first.phases["read"].count, 2)
+        self.assertEqual(sorted(first.pages), ["a.md", "b.md"])
+
+    def test_to_dict_top_pages(self):
+        profiler = Profiler()
+        for index, path in enumerate(["fast.md", "slow.md", "medium.md"]):
+            profiler.page(path).wall = index if path != "slow.md" else 10
+        data = profiler.to_dict(top=2)
+        self.assertEqual(
+            [page["path"] for page in data["pages"]], ["slow.md", "medium.md"]
+        )
+
+    def test_null_profiler(self):
+        self.assertFalse(NULL_PROFILER.enabled)
+        self.assertIs(NULL_PROFILER.phase("read"), NULL_PHASE)
+        with NULL_PROFILER.page("a.md"):
+            pass
+
+    def test_converter_phases(self):
+        profiler = Profiler()
+        markdown_to_html_node("# Title\n\n- a **b**\n- c\n\ntext", profiler)
+        self.assertEqual(profiler.phases["parse/blocks"].count, 1)
+        self.assertEqual(profiler.phases["parse/inline"].count, 3)
+
+    def test_generate_page_phases(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "index.md")
+            template = os.path.join(root, "template.html")
+            dest = os.path.join(root, "docs", "index.html")
+            with open(source, "w") as f:
+                f.write("# Title\n\nSome **text**")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+
+            profiler = Profiler()
+            generate_page(source, template, dest, "/", profiler=profiler)
+            with open(dest) as f:
+                profiled = f.read()
+            generate_page(source, template, dest, "/")
+            with open(dest) as f:
+                self.assertEqual(f.read(), profiled)
+
+            self.assertEqual(
+                sorted(profiler.phases),
+                [
+                    "parse",
+                    "parse/blocks",
+                    "parse/inline",
+                    "read",
+                    "template",
+                    "write",
+                ],
+            )
+            self.assertEqual(list(profiler.pages), [source])
+
+            report = os.path.join(root, "profile.json")
+            profiler.write_json(report)
+            with open(report) as f:
+                self.assertEqual(json.load(f)["pages"][0]["path"], source)
+            self.assertIn("parse/inline", profiler.summary())
@@ -0,0 +1,59 @@
+import os
+
+from tests.temp_tree import TempTreeTestCase
+from utils.sync import sync_directory
+
+
+class TestSyncDirectory(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.src, "images"))
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png")
+
+    def test_initial_sync_copies_everything(self):
+        result = sync_directory(self.src, self.dest)
+        self.assertEqual(result.copied, ["index.css", os.path.join("images", "a.png")])
+        self.assertEqual(self.read(os.path.join(self.dest, "images", "a.png")), "png")
+
+    def test_second_sync_copies_nothing(self):
+        sync_directory(self.src, self.dest)
+        result = sync_directory(self.src, self.dest)
+        self.assertEqual(result.copied, [])
+        self.assertEqual(len(result.unchanged), 2)
+
+    def test_changed_file_is_copied(self):
+        sync_directory(self.src, self.dest)
+        self.write(os.path.join(self.src, "index.css"), "body { margin: 0 }")
+        result = sync_directory(self.src, self.dest)
+        self.assertEqual(result.copied, ["index.css"])
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "index.css")), "body { margin: 0 }"
+        )
+
+    def test_checksum_ignores_mtime_only_changes(self):
+        sync_directory(self.src, self.dest)
+        os.utime(os.path.join(self.src, "index.css"), (0, 0))
+        self.assertEqual(sync_directory(self.src, self.dest, checksum=True).copied, [])
+        self.assertEqual(sync_directory(self.src, self.dest).copied, ["index.css"])
+
+    def test_stale_owned_file_is_deleted(self):
+        owned = sync_directory(self.src, self.dest).owned
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        result = sync_directory(self.src, self.dest, owned)
+        self.assertEqual(result.deleted, [os.path.join("images", "a.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_files_not_owned_are_kept(self):
+        owned = sync_directory(self.src, self.dest).owned
+        page = os.path.join(self.dest, "index.html")
+        self.write(page, "<html></html>")
+        result = sync_directory(self.src, self.dest, owned)
+        self.assertEqual(result.deleted, [])
+        self.assertTrue(os.path.exists(page))
+
+    def test_missing_source(self):
+        with self.assertRaises(FileNotFoundError):
+            sync_directory(os.path.join(self.root, "missing"), self.dest)
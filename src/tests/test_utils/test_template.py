@@ -0,0 +1,78 @@
+import io
+import unittest
+
+from utils.template import Template, rewrite_root_links
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.segments, ["<title>", "</title><main>", "</main>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>Hi</p>"}),
+            "<title>Home</title><main><p>Hi</p></main>",
+        )
+
+    def test_render_additional_placeholders(self):
+        template = Template("{{ Title }} by {{Author}}")
+        self.assertEqual(
+            template.render({"Title": "Post", "Author": "Bilbo"}), "Post by Bilbo"
+        )
+
+    def test_missing_value_is_left_untouched(self):
+        template = Template("{{ Title }}: {{ Missing }}")
+        self.assertEqual(template.render({"Title": "Home"}), "Home: {{ Missing }}")
+
+    def test_repeated_placeholder(self):
+        template = Template("{{ Title }} - {{ Title }}")
+        self.assertEqual(template.render({"Title": "Home"}), "Home - Home")
+
+    def test_basepath_rewrites_template_and_values(self):
+        template = Template('<link href="/index.css" />{{ Content }}')
+        self.assertEqual(
+            template.render(
+                {"Content": '<a href="/blog">b</a><img src="/a.png"></img>'}, "/site/"
+            ),
+            '<link href="/site/index.css" /><a href="/site/blog">b</a>'
+            '<img src="/site/a.png"></img>',
+        )
+
+    def test_basepath_attribute_split_across_value(self):
+        template = Template('<a href="{{ Link }}">home</a>')
+        self.assertEqual(
+            template.render({"Link": "/home"}, "/site/"),
+            '<a href="/site/home">home</a>',
+        )
+
+    def test_matches_sequential_replace(self):
+        source = '<title>{{ Title }}</title><link href="/i.css" /><p>{{ Content }}</p>'
+        content = '<a href="/x">x</a><a href="https://example.com">e</a>'
+        expected = (
+            source.replace("{{ Title }}", "T")
+            .replace("{{ Content }}", content)
+            .replace('href="/', 'href="/base/')
+            .replace('src="/', 'src="/base/')
+        )
+        self.assertEqual(
+            Template(source).render({"Title": "T", "Content": content}, "/base/"),
+            expected,
+        )
+
+    def test_rewrite_root_links_default_basepath(self):
+        html = '<a href="/x">x</a>'
+        self.assertIs(rewrite_root_links(html, "/"), html)
+
+    def test_write_chunked_value(self):
+        template = Template('<link href="/i.css" /><main>{{ Content }}</main>')
+        stream = io.StringIO()
+        template.write(
+            stream, {"Content": iter(['<a href="/x">', "x", "</a>"])}, "/base/"
+        )
+        self.assertEqual(
+            stream.getvalue(),
+            '<link href="/base/i.css" /><main><a href="/base/x">x</a></main>',
+        )
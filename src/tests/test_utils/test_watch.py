@@ -0,0 +1,74 @@
+import os
+
+from tests.temp_tree import TempTreeTestCase
+from utils.watch import InotifyWatcher, PollingWatcher, snapshot, watch
+
+
+class FakeWatcher:
+    def __init__(self, bursts):
+        self.bursts = list(bursts)
+
+    def poll(self, timeout=None):
+        if not self.bursts:
+            raise KeyboardInterrupt
+        return self.bursts.pop(0)
+
+
+class TestWatch(TempTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(self.content)
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(self.template, "{{ Content }}")
+
+    def test_snapshot(self):
+        files = snapshot([self.content, self.template])
+        self.assertEqual(
+            sorted(files), [os.path.join(self.content, "index.md"), self.template]
+        )
+
+    def check_watcher(self, watcher):
+        try:
+            self.assertEqual(watcher.poll(0.05), set())
+            page = os.path.join(self.content, "page.md")
+            self.write(page, "# Page")
+            self.assertIn(page, watcher.poll(2))
+            self.write(self.template, "<main>{{ Content }}</main>")
+            self.assertIn(self.template, watcher.poll(2))
+            os.remove(page)
+            self.assertIn(page, watcher.poll(2))
+        finally:
+            watcher.close()
+
+    def test_polling_watcher(self):
+        self.check_watcher(PollingWatcher([self.content, self.template], 0.01))
+
+    def test_inotify_watcher(self):
+        try:
+            watcher = InotifyWatcher([self.content, self.template])
+        except OSError:
+            self.skipTest("inotify is not available")
+        self.check_watcher(watcher)
+
+    def test_inotify_new_directory(self):
+        try:
+            watcher = InotifyWatcher([self.content])
+        except OSError:
+            self.skipTest("inotify is not available")
+        try:
+            os.makedirs(os.path.join(self.content, "blog"))
+            self.assertEqual(watcher.poll(2), set())
+            post = os.path.join(self.content, "blog", "post.md")
+            self.write(post, "# Post")
+            self.assertIn(post, watcher.poll(2))
+        finally:
+            watcher.close()
+
+    def test_watch_debounces_bursts(self):
+        calls = []
+        watcher = FakeWatcher([{"a"}, {"b"}, set(), {"c"}, set()])
+        with self.assertRaises(KeyboardInterrupt):
+            watch(watcher, calls.append)
+        self.assertEqual(calls, [{"a", "b"}, {"c"}])
@@ -0,0 +1,310 @@
+import os
+
+from markdown.converter import markdown_to_html
+from utils.cache import ByteLRU, ParseCache
+from utils.compress import CODECS, DEFAULT_MIN_BYTES, CompressionIndex, update_siblings
+from utils.graph import referenced_assets
+from utils.helpers import generate_page, split_page
+from utils.listing import DEFAULT_PAGE_SIZE, build_listing, remove_stale_listings
+from utils.manifest import BuildManifest
+from utils.metadata import MetadataIndex
+from utils.output import copy_output, write_output
+from utils.plan import BuildPlan, PlannedFile, page_name, scan_tree
+from utils.sync import sync_directory
+from utils.template import Template
+
+
+class SiteBuilder:
+    """
+    Keeps the state of a build in memory so later changes can be rebuilt in isolation.
+
+    The compiled template and the build manifest survive between rebuilds. Which pages
+    a change regenerates is answered by the manifest's dependency graph: a changed
+    markdown file regenerates its own page, a changed asset is copied and regenerates
+    the pages referencing it, and a template change regenerates every page built from
+    it. Pages that fail to generate are collected in failures instead of aborting the
+    build.
+
+    With a listing section, the paginated listing is brought up to date whenever a
+    markdown file or the template changes; without one, listing pages left by an
+    earlier build are deleted.
+
+    Every build and rebuild also brings the compressed siblings of the output up to
+    date: with codecs to compress with they are written, and without, the siblings an
+    earlier compressed build left are deleted where their file changed.
+
+    A long-running builder can also keep the title and rendered body of its pages in
+    memory, keyed by the size and modification time of their markdown. A template
+    change then re-templates those pages without reading or parsing their markdown.
+    """
+
+    def __init__(
+        self,
+        content_dir: str,
+        static_dir: str,
+        template_path: str,
+        dest_dir: str,
+        basepath: str,
+        manifest: BuildManifest,
+        cache: ParseCache | None = None,
+        memory_bytes: int = 0,
+        listing: str | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        compress: tuple[str, ...] = (),
+        compress_min_bytes: int = DEFAULT_MIN_BYTES,
+        jobs: int = 1,
+    ):
+        """
+        Initialize the SiteBuilder with the site layout.
+
+        :param content_dir: A string, the directory of markdown files.
+        :param static_dir: A string, the directory of static assets.
+        :param template_path: A string, the path to the template file.
+        :param dest_dir: A string, the output directory.
+        :param basepath: A string, the basepath to prefix absolute links with.
+        :param manifest: The BuildManifest the builder keeps up to date.
+        :param cache: An optional ParseCache of rendered page bodies.
+        :param memory_bytes: An integer, the characters of page bodies kept in memory; none are kept if 0.
+        :param listing: A string, the section whose posts are listed, or None for no listing.
+        :param page_size: An integer, the number of posts per listing page.
+        :param compress: A tuple of the CODECS to write compressed siblings with, empty for none.
+        :param compress_min_bytes: An integer, the size below which outputs are not compressed.
+        :param jobs: An integer, the number of outputs compressed at once.
+        """
+        self.content_dir = os.path.normpath(content_dir)
+        self.static_dir = os.path.normpath(static_dir)
+        self.template_path = os.path.normpath(template_path)
+        self.dest_dir = os.path.normpath(dest_dir)
+        self.basepath = basepath
+        self.manifest = manifest
+        self.cache = cache
+        self.template = Template.from_file(template_path)
+        self.bodies = ByteLRU(memory_bytes) if memory_bytes > 0 else None
+        self.listing = listing
+        self.page_size = page_size
+        self.metadata = None
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+        self.jobs = jobs
+        self.compression = None
+        self.failures = []
+
+    def dest_for(self, source: str) -> str:
+        """Returns the output path of a markdown file, as plan_pages would."""
+        relative_directory, name = os.path.split(
+            os.path.relpath(source, self.content_dir)
+        )
+        return os.path.normpath(
+            os.path.join(
+                self.dest_dir, relative_directory, name.replace(".md", ".html")
+            )
+        )
+
+    def _is_under(self, path: str, directory: str) -> bool:
+        return path.startswith(directory + os.sep)
+
+    def build(self, plan: BuildPlan | None = None) -> list[str]:
+        """Syncs the assets and generates every page that is not up to date.
+
+        Args:
+            plan (BuildPlan | None): the plan to build, scanned here if not given
+
+        Returns:
+            list: paths of the files written or deleted
+        """
+        if plan is None:
+            plan = BuildPlan.scan(self.content_dir, self.static_dir, self.dest_dir)
+        synced = sync_directory(
+            self.static_dir, self.dest_dir, self.manifest.assets, files=plan.assets
+        )
+        self.manifest.assets = synced.owned
+        touched = [
+            os.path.join(self.dest_dir, path) for path in synced.copied + synced.deleted
+        ]
+        self.failures = []
+        for source, dest in plan.page_pairs():
+            if self.manifest.is_fresh(source, self.template_path, dest, self.basepath):
+                self.manifest.skipped += 1
+                continue
+            self._generate(source, dest, touched)
+        touched.extend(self._update_listing(plan.pages))
+        self.manifest.save()
+        touched.extend(self._update_siblings())
+        if self.cache is not None:
+            self.cache.prune()
+        return touched
+
+    def _update_listing(self, pages: list[PlannedFile] | None = None) -> list[str]:
+        if self.listing is None:
+            return remove_stale_listings(self.manifest, self.dest_dir)
+        if pages is None:
+            pages = scan_tree(self.content_dir, self.dest_dir, page_name)
+        if self.metadata is None:
+            self.metadata = MetadataIndex.load()
+        return build_listing(
+            pages,
+            self.listing,
+            self.content_dir,
+            self.template_path,
+            self.dest_dir,
+            self.basepath,
+            self.page_size,
+            self.manifest,
+            self.metadata,
+            self.template,
+        )
+
+    def _update_siblings(self) -> list[str]:
+        if self.compression is None:
+            self.compression = CompressionIndex.load()
+        result = update_siblings(
+            self.dest_dir,
+            self.compress,
+            self.compress_min_bytes,
+            self.jobs,
+            self.compression,
+        )
+        written = [
+            output + CODECS[name][0]
+            for output in result.compressed
+            for name in self.compress
+        ]
+        return [os.path.join(self.dest_dir, path) for path in written + result.removed]
+
+    def _render_kept(self, source: str, dest: str) -> list[str]:
+        """Generates a page from its body in memory, rendering the body first if its markdown changed."""
+        stat = os.stat(source)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        kept = self.bodies.get(source)
+        if kept is None or kept[0] != stamp:
+            with open(source, "r") as f:
+                markdown = f.read()
+            html = self.cache.get(markdown) if self.cache is not None else None
+            title, body = split_page(markdown)
+            if html is None:
+                html = markdown_to_html(body)
+                if self.cache is not None:
+                    self.cache.put(markdown, html)
+            kept = (stamp, title, html, referenced_assets(markdown, self.static_dir))
+            self.bodies.put(source, kept, len(html))
+        _, title, html, assets = kept
+        print(f"Generating page from {source} to {dest} using {self.template_path}")
+        write_output(
+            dest, self.template.render({"Title": title, "Content": html}, self.basepath)
+        )
+        return assets
+
+    def _generate(self, source: str, dest: str, touched: list[str]) -> None:
+        try:
+            if self.bodies is not None:
+                assets = self._render_kept(source, dest)
+            else:
+                assets = generate_page(
+                    source,
+                    self.template_path,
+                    dest,
+                    self.basepath,
+                    self.template,
+                    cache=self.cache,
+                    static_dir=self.static_dir,
+                )
+        except (OSError, ValueError) as error:
+            print(f"Failed to generate {source}: {error}")
+            self.failures.append((source, error))
+            return
+        self.manifest.record(source, self.template_path, dest, self.basepath, assets)
+        self.manifest.generated += 1
+        touched.append(dest)
+
+    def _sync_asset(self, path: str) -> str:
+        relative_path = os.path.relpath(path, self.static_dir)
+        dest = os.path.join(self.dest_dir, relative_path)
+        assets = set(self.manifest.assets)
+        if os.path.isfile(path):
+            print(f"Copying file {path} to {dest}")
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            copy_output(path, dest)
+            assets.add(relative_path)
+        else:
+            if relative_path in assets and os.path.isfile(dest):
+                print(f"Deleting stale file {dest}")
+                os.remove(dest)
+            assets.discard(relative_path)
+        self.manifest.assets = sorted(assets)
+        return dest
+
+    def _remove_page(self, source: str) -> str:
+        dest = self.dest_for(source)
+        if os.path.isfile(dest):
+            print(f"Deleting page {dest}")
+            os.remove(dest)
+        self.manifest.entries.pop(source, None)
+        self.manifest.graph.remove(dest)
+        return dest
+
+    def rebuild(self, changes: set[str]) -> list[str]:
+        """Brings the output up to date after the given files changed.
+
+        Args:
+            changes (set): paths of the files that were added, modified or removed
+
+        Returns:
+            list: paths of the files written or deleted
+        """
+        changed = {os.path.normpath(path) for path in changes}
+        self.manifest.invalidate(changed)
+        self.failures = []
+        touched = []
+
+        if self.template_path in changed:
+            try:
+                self.template = Template.from_file(self.template_path)
+            except (OSError, ValueError) as error:
+                # e.g. renamed mid-save: the pages keep the old template until it is back
+                print(f"Failed to load {self.template_path}: {error}")
+                self.failures.append((self.template_path, error))
+                changed.discard(self.template_path)
+
+        sources = {
+            entry["dest"]: source for source, entry in self.manifest.entries.items()
+        }
+        pages = {
+            sources[dest]
+            for dest in self.manifest.graph.affected(changed)
+            if dest in sources
+        }
+        # new pages are not in the graph yet
+        pages.update(
+            path
+            for path in changed
+            if path.endswith(".md") and self._is_under(path, self.content_dir)
+        )
+
+        for source in sorted(pages):
+            if os.path.isfile(source):
+                self._generate(source, self.dest_for(source), touched)
+            else:
+                touched.append(self._remove_page(source))
+
+        for path in sorted(changed):
+            if self._is_under(path, self.static_dir):
+                try:
+                    touched.append(self._sync_asset(path))
+                except OSError as error:
+                    # the asset vanished after the change; its removal comes next
+                    print(f"Failed to copy {path}: {error}")
+                    self.failures.append((path, error))
+
+        if self.listing is not None and (
+            self.template_path in changed
+            or any(
+                path.endswith(".md") and self._is_under(path, self.content_dir)
+                for path in changed
+            )
+        ):
+            touched.extend(self._update_listing())
+
+        self.manifest.save()
+        if touched:
+            touched.extend(self._update_siblings())
+        return touched
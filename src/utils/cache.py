@@ -0,0 +1,168 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from markdown.converter import PARSER_VERSION
+
+CACHE_DIR = ".cache/parse"
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+
+
+class ParseCache:
+    """
+    An on-disk cache of rendered page bodies, keyed by markdown content.
+
+    Each entry holds the HTML that markdown_to_html(markdown) returns,
+    stored under the hash of the parser version and the markdown. A template or
+    basepath change therefore still hits the cache; a parser change misses it.
+
+    A file's modification time records when the entry was last used, so prune()
+    can evict the least recently used entries once the cache exceeds max_bytes.
+    Entries are written atomically, so worker processes can share one directory.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the ParseCache.
+
+        :param directory: A string, the directory holding the cache entries.
+        :param max_bytes: An integer, the size prune() shrinks the cache to.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def key(self, markdown: str) -> str:
+        digest = hashlib.sha256(f"{PARSER_VERSION}\0".encode())
+        digest.update(markdown.encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.html")
+
+    def get(self, markdown: str) -> str | None:
+        """Looks up the rendered body of a markdown document.
+
+        Args:
+            markdown (str): content of the markdown document
+
+        Returns:
+            str | None: the cached HTML, or None on a miss
+        """
+        path = self._path(self.key(markdown))
+        try:
+            with open(path, "r") as f:
+                html = f.read()
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        return html
+
+    def put(self, markdown: str, html: str) -> None:
+        """Stores the rendered body of a markdown document.
+
+        Args:
+            markdown (str): content of the markdown document
+            html (str): the HTML rendered from it
+        """
+        path = self._path(self.key(markdown))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+        self.stats["writes"] += 1
+
+    def merge_stats(self, stats: dict) -> None:
+        """Adds counters recorded by another copy of the cache, e.g. in a worker process."""
+        for name, count in stats.items():
+            self.stats[name] += count
+
+    def prune(self) -> int:
+        """Evicts the least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            int: number of entries evicted
+        """
+        entries = []
+        total = 0
+        for directory, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(".html"):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        self.stats["evictions"] += evicted
+        return evicted
+
+    def summary(self) -> str:
+        return (
+            f"Parse cache: {self.stats['hits']} hits, {self.stats['misses']} misses, "
+            f"{self.stats['evictions']} evicted"
+        )
+
+
+class ByteLRU:
+    """
+    An in-memory mapping that evicts its least recently used entries past a byte budget.
+
+    Every entry is charged the size it was put with. The most recent entry is always
+    kept, even when it is larger than the whole budget. Access is locked, so threads
+    may share one instance.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the ByteLRU.
+
+        :param max_bytes: An integer, the total size of the entries kept.
+        """
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size: int) -> None:
+        with self._lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.used -= previous[1]
+            self.entries[key] = (value, size)
+            self.used += size
+            while self.used > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.used -= evicted
@@ -0,0 +1,39 @@
+import json
+import socket
+
+# relative to the site root, like the parse cache; Unix socket paths are kept short
+DEFAULT_SOCKET = ".cache/build.sock"
+
+
+def send_request(
+    request: dict, socket_path: str = DEFAULT_SOCKET, timeout: float | None = None
+) -> dict:
+    """Sends one request to a build daemon and waits for its response.
+
+    Requests and responses are single lines of JSON, one exchange per connection. This
+    module only imports the standard library, so a client starts without loading the
+    parser or the builder.
+
+    Args:
+        request (dict): the request, e.g. {"command": "build"}
+        socket_path (str): path to the daemon's Unix socket
+        timeout (float | None): seconds to wait for the response, forever if None
+
+    Returns:
+        dict: the response, with "ok" set to False and an "error" if the request failed
+
+    Raises:
+        OSError: if no daemon is listening on the socket
+        ConnectionError: if the daemon closed the connection without answering
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise ConnectionError(
+            "The build daemon closed the connection without answering."
+        )
+    return json.loads(line)
@@ -0,0 +1,340 @@
+import gzip
+import hashlib
+import json
+import lzma
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.manifest import file_hash
+from utils.output import snapshot_outputs, write_output
+from utils.sync import remove_empty_parents
+
+COMPRESS_INDEX_PATH = ".cache/compress.json"
+# smaller files gain little from compression and cost a request header either way
+DEFAULT_MIN_BYTES = 1024
+TEXT_EXTENSIONS = frozenset(
+    {".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt"}
+)
+# the suffix of the sibling and the function producing its content; gzip is written
+# without a timestamp so the same input always compresses to the same bytes
+CODECS = {
+    "gz": (".gz", lambda data: gzip.compress(data, 9, mtime=0)),
+    "xz": (".xz", lambda data: lzma.compress(data, preset=9)),
+}
+DEFAULT_CODECS = ("gz",)
+
+
+def parse_codecs(names: str) -> tuple[str, ...]:
+    """Parses a comma separated list of codec names, e.g. "gz,xz".
+
+    Args:
+        names (str): the codec names
+
+    Returns:
+        tuple: the codec names, without duplicates, in the order given
+
+    Raises:
+        ValueError: if a name is not one of CODECS
+    """
+    codecs = []
+    for name in names.split(","):
+        name = name.strip()
+        if name not in CODECS:
+            raise ValueError(
+                f"Unknown codec {name!r}, expected one of: {', '.join(CODECS)}"
+            )
+        if name not in codecs:
+            codecs.append(name)
+    return tuple(codecs)
+
+
+class CompressResult:
+    """
+    The outcome of precompressing an output directory, as paths relative to it.
+    """
+
+    def __init__(self):
+        self.compressed = []
+        self.removed = []
+        self.unchanged = []
+
+    def summary(self) -> str:
+        return (
+            f"Compressed {len(self.compressed)} files, removed {len(self.removed)} "
+            f"stale siblings, {len(self.unchanged)} unchanged"
+        )
+
+    def __repr__(self):
+        return f"CompressResult(compressed={len(self.compressed)}, removed={len(self.removed)}, unchanged={len(self.unchanged)})"
+
+
+class CompressionIndex:
+    """
+    A persisted record of the files the last precompression covered.
+
+    Each entry maps an output path, relative to the output directory, to the stamp and
+    content hash the file had when its siblings were written and the codecs they were
+    written with. A file whose stamp is unchanged is skipped without being read; one
+    that was rewritten with the same content is hashed but not compressed again.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, entries: dict | None = None):
+        """
+        Initialize the CompressionIndex.
+
+        :param path: A string representing the path of the index JSON file.
+        :param entries: A dictionary mapping output paths to their (stamp, hash, codecs) tuples.
+        """
+        self.path = path
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, path: str = COMPRESS_INDEX_PATH) -> "CompressionIndex":
+        """Loads an index from disk. A missing, unreadable or outdated index yields an empty one.
+
+        Args:
+            path (str): path to the index JSON file
+
+        Returns:
+            CompressionIndex: the loaded index
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != cls.VERSION:
+            return cls(path)
+        return cls(
+            path,
+            {
+                output: (tuple(entry["stamp"]), entry["hash"], tuple(entry["codecs"]))
+                for output, entry in data.get("files", {}).items()
+            },
+        )
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": self.VERSION,
+                    "files": {
+                        output: {
+                            "stamp": list(stamp),
+                            "hash": digest,
+                            "codecs": list(codecs),
+                        }
+                        for output, (stamp, digest, codecs) in sorted(
+                            self.entries.items()
+                        )
+                    },
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
+
+
+def _compress_file(
+    path: str,
+    codecs: tuple[str, ...],
+    known_hash: str | None,
+    missing: tuple[str, ...],
+) -> tuple[str, bool] | None:
+    """Writes the compressed siblings of one file that are missing or out of date.
+
+    A file whose content hash is known only needs its missing siblings; any other
+    gets one for every codec. Returns the content hash and whether siblings were
+    written, or None if the file disappeared since the directory was scanned.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    digest = hashlib.sha256(data).hexdigest()
+    names = missing if digest == known_hash else codecs
+    for name in names:
+        suffix, compress = CODECS[name]
+        write_output(path + suffix, compress(data))
+    return digest, bool(names)
+
+
+def precompress(
+    root: str,
+    codecs: tuple[str, ...] = DEFAULT_CODECS,
+    min_bytes: int = DEFAULT_MIN_BYTES,
+    jobs: int = 1,
+    index: CompressionIndex | None = None,
+) -> CompressResult:
+    """Writes compressed siblings, such as index.html.gz, next to the text files of a directory.
+
+    Web servers that look for precompressed files (nginx's gzip_static, for one) can
+    then send them as they are instead of compressing on every request. Text files of
+    at least min_bytes get a sibling per codec; siblings the index recorded for files
+    that were removed, shrank below the threshold or lost a codec are deleted.
+
+    Files are compressed in a pool of threads: zlib and lzma release the GIL while they
+    work, so this scales across cores without sending file contents to other processes.
+    The index is updated in place and saved, when one is given.
+
+    Args:
+        root (str): path to the output directory
+        codecs (tuple): names of the CODECS to write
+        min_bytes (int): size below which files are not compressed
+        jobs (int): number of files to compress at once
+        index (CompressionIndex | None): the record of the last run, in memory only if None
+
+    Returns:
+        CompressResult: the files compressed, left unchanged, and the siblings removed
+    """
+    persist = index is not None
+    if index is None:
+        index = CompressionIndex(COMPRESS_INDEX_PATH)
+    files = snapshot_outputs(root)
+    candidates = {
+        output: stamp
+        for output, stamp in files.items()
+        if stamp[0] >= min_bytes and os.path.splitext(output)[1] in TEXT_EXTENSIONS
+    }
+
+    result = CompressResult()
+    for output, (_, _, old_codecs) in list(index.entries.items()):
+        kept = codecs if output in candidates else ()
+        for name in old_codecs:
+            sibling = output + CODECS[name][0]
+            if name not in kept and sibling in files:
+                path = os.path.join(root, sibling)
+                os.remove(path)
+                remove_empty_parents(path, root)
+                result.removed.append(sibling)
+        if not kept:
+            del index.entries[output]
+
+    pending = []
+    for output, stamp in sorted(candidates.items()):
+        entry = index.entries.get(output)
+        if entry is None:
+            pending.append((output, stamp, None, codecs))
+            continue
+        missing = tuple(
+            name
+            for name in codecs
+            if name not in entry[2] or output + CODECS[name][0] not in files
+        )
+        if missing or entry[0] != stamp:
+            pending.append((output, stamp, entry[1], missing))
+        else:
+            result.unchanged.append(output)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = [
+            (
+                output,
+                stamp,
+                executor.submit(
+                    _compress_file,
+                    os.path.join(root, output),
+                    codecs,
+                    known_hash,
+                    missing,
+                ),
+            )
+            for output, stamp, known_hash, missing in pending
+        ]
+        for output, stamp, future in futures:
+            outcome = future.result()
+            if outcome is None:
+                index.entries.pop(output, None)
+                continue
+            digest, written = outcome
+            index.entries[output] = (stamp, digest, codecs)
+            if written:
+                result.compressed.append(output)
+            else:
+                result.unchanged.append(output)
+
+    result.removed.sort()
+    result.unchanged.sort()
+    if persist:
+        index.save()
+    return result
+
+
+def remove_stale_siblings(root: str, index: CompressionIndex) -> CompressResult:
+    """Deletes the compressed siblings of files that changed since they were compressed.
+
+    Builds without compression run this, so a server preferring precompressed files
+    never sends a sibling older than its file. Siblings of unchanged files are kept
+    for the next compressed build; a file whose stamp changed is hashed, and its
+    siblings kept if the content is the same. The index is updated and saved, unless
+    it is empty.
+
+    Args:
+        root (str): path to the output directory
+        index (CompressionIndex): the record of the last compressed build
+
+    Returns:
+        CompressResult: the files whose siblings were kept, and the siblings removed
+    """
+    result = CompressResult()
+    if not index.entries:
+        return result
+    files = snapshot_outputs(root)
+    for output, (stamp, digest, codecs) in list(index.entries.items()):
+        present = tuple(name for name in codecs if output + CODECS[name][0] in files)
+        current = files.get(output)
+        if (
+            current is not None
+            and present
+            and (current == stamp or file_hash(os.path.join(root, output)) == digest)
+        ):
+            index.entries[output] = (current, digest, present)
+            result.unchanged.append(output)
+            continue
+        for name in present:
+            sibling = output + CODECS[name][0]
+            path = os.path.join(root, sibling)
+            os.remove(path)
+            remove_empty_parents(path, root)
+            result.removed.append(sibling)
+        del index.entries[output]
+    result.removed.sort()
+    result.unchanged.sort()
+    index.save()
+    return result
+
+
+def update_siblings(
+    root: str,
+    codecs: tuple[str, ...],
+    min_bytes: int = DEFAULT_MIN_BYTES,
+    jobs: int = 1,
+    index: CompressionIndex | None = None,
+) -> CompressResult:
+    """Brings the compressed siblings of an output directory up to date after a build.
+
+    With codecs, siblings are written as precompress does; without, the siblings of an
+    earlier compressed build are removed where their file changed.
+
+    Args:
+        root (str): path to the output directory
+        codecs (tuple): names of the CODECS to write, empty if the build does not compress
+        min_bytes (int): size below which files are not compressed
+        jobs (int): number of files to compress at once
+        index (CompressionIndex | None): the record of the last run, loaded from disk if None
+
+    Returns:
+        CompressResult: the files compressed, left unchanged, and the siblings removed
+    """
+    if index is None:
+        index = CompressionIndex.load()
+    if codecs:
+        return precompress(root, codecs, min_bytes, jobs, index)
+    return remove_stale_siblings(root, index)
@@ -0,0 +1,208 @@
+import json
+import os
+import socket
+import time
+
+from utils.builder import SiteBuilder
+from utils.client import DEFAULT_SOCKET
+from utils.plan import BuildPlan
+
+# seconds a connected client has to send its request
+REQUEST_TIMEOUT = 10.0
+
+
+class BuildDaemon:
+    """
+    Serves build requests over a Unix socket, keeping the state of the build warm.
+
+    The SiteBuilder keeps the compiled template, the manifest and its cache between
+    requests, and the daemon keeps the size and modification time of every planned
+    file. A build request rescans the tree with stat calls only and rebuilds just the
+    files whose stamp changed, so an unchanged site costs one directory walk.
+
+    Requests are lines of JSON with a "command": "build", "rebuild" with the list of
+    "changes" a client already knows about, "status" or "stop". They are served one at
+    a time, so concurrent clients never build over each other.
+    """
+
+    def __init__(self, builder: SiteBuilder, socket_path: str = DEFAULT_SOCKET):
+        """
+        Initialize the BuildDaemon.
+
+        :param builder: The SiteBuilder that builds the site.
+        :param socket_path: A string, the path of the Unix socket to listen on.
+        """
+        self.builder = builder
+        self.socket_path = socket_path
+        self.stamps = None
+        self.builds = 0
+        self.running = False
+
+    def _stamp(self, path: str) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _scan(self) -> tuple[BuildPlan, dict]:
+        builder = self.builder
+        plan = BuildPlan.scan(builder.content_dir, builder.static_dir, builder.dest_dir)
+        stamps = {
+            os.path.normpath(planned.source): (planned.size, planned.mtime_ns)
+            for planned in plan.pages + plan.assets
+        }
+        stamps[builder.template_path] = self._stamp(builder.template_path)
+        return plan, stamps
+
+    def build(self) -> list[str]:
+        """Brings the output up to date with the files on disk.
+
+        The first build checks every page against the manifest; later ones rebuild the
+        files whose size or modification time changed since the previous request.
+
+        Returns:
+            list: paths of the files written or deleted
+        """
+        plan, stamps = self._scan()
+        previous = self.stamps
+        self.stamps = stamps
+        if previous is None:
+            return self.builder.build(plan)
+        changed = {
+            path
+            for path in stamps.keys() | previous.keys()
+            if stamps.get(path) != previous.get(path)
+        }
+        if not changed:
+            self.builder.failures = []
+            return []
+        return self.builder.rebuild(changed)
+
+    def rebuild(self, changes: list[str]) -> list[str]:
+        """Rebuilds the given files, as reported by a client that watches them itself.
+
+        Args:
+            changes (list): paths of the files that were added, modified or removed
+
+        Returns:
+            list: paths of the files written or deleted
+        """
+        if self.stamps is None:
+            return self.build()
+        changed = {os.path.normpath(path) for path in changes}
+        for path in changed:
+            stamp = self._stamp(path)
+            if stamp is None:
+                self.stamps.pop(path, None)
+            else:
+                self.stamps[path] = stamp
+        return self.builder.rebuild(changed)
+
+    def handle(self, request: dict) -> dict:
+        """Answers one request.
+
+        Args:
+            request (dict): the decoded request
+
+        Returns:
+            dict: the response, with the files written or deleted for builds
+        """
+        command = request.get("command") if isinstance(request, dict) else None
+        start = time.perf_counter()
+        match command:
+            case "build":
+                touched = self.build()
+            case "rebuild":
+                changes = request.get("changes")
+                if not isinstance(changes, list) or not all(
+                    isinstance(path, str) for path in changes
+                ):
+                    return {"ok": False, "error": "rebuild needs a list of changes"}
+                touched = self.rebuild(changes)
+            case "status":
+                cache = self.builder.cache
+                return {
+                    "ok": True,
+                    "builds": self.builds,
+                    "files": len(self.stamps or ()),
+                    "cache": cache.summary() if cache is not None else None,
+                }
+            case "stop":
+                self.running = False
+                return {"ok": True}
+            case _:
+                return {"ok": False, "error": f"unknown command: {command!r}"}
+
+        self.builds += 1
+        return {
+            "ok": not self.builder.failures,
+            "touched": touched,
+            "failures": [
+                [source, str(error)] for source, error in self.builder.failures
+            ],
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        }
+
+    def _bind(self) -> socket.socket:
+        if os.path.exists(self.socket_path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(self.socket_path)
+                except OSError:
+                    # left behind by a daemon that did not shut down cleanly
+                    os.remove(self.socket_path)
+                else:
+                    raise OSError(
+                        f"A build daemon is already listening on {self.socket_path}"
+                    )
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen()
+        return server
+
+    def _serve_connection(self, connection: socket.socket) -> None:
+        connection.settimeout(REQUEST_TIMEOUT)
+        try:
+            with connection.makefile("rb") as stream:
+                line = stream.readline()
+            if not line:
+                return
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {"ok": False, "error": "the request is not valid JSON"}
+            else:
+                try:
+                    response = self.handle(request)
+                except (OSError, ValueError) as error:
+                    response = {
+                        "ok": False,
+                        "error": f"{type(error).__name__}: {error}",
+                    }
+            connection.sendall(json.dumps(response).encode() + b"\n")
+        except OSError as error:
+            print(f"Dropped a client: {error}")
+        finally:
+            connection.close()
+
+    def serve(self, ready=None) -> None:
+        """Listens on the socket and answers requests until a stop request.
+
+        Args:
+            ready (callable | None): called once the socket accepts connections
+        """
+        server = self._bind()
+        self.running = True
+        try:
+            if ready is not None:
+                ready()
+            while self.running:
+                connection, _ = server.accept()
+                self._serve_connection(connection)
+        finally:
+            server.close()
+            os.remove(self.socket_path)
@@ -0,0 +1,626 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from markdown.converter import PARSER_VERSION, markdown_to_html
+from utils.cache import ByteLRU
+from utils.helpers import split_page
+from utils.listing import (
+    DEFAULT_PAGE_SIZE,
+    listing_fingerprint,
+    listing_values,
+    paginate,
+)
+from utils.metadata import MetadataIndex
+from utils.plan import page_name, scan_tree
+from utils.template import Template
+
+DEFAULT_PORT = 8888
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+# responses smaller than this are not worth compressing
+MIN_GZIP_BYTES = 256
+LIVE_RELOAD_PATH = "/__livereload"
+# seconds between keep-alive comments on an idle event stream
+LIVE_RELOAD_PING = 15.0
+LIVE_RELOAD_SCRIPT = (
+    "<script>new EventSource("
+    f'"{LIVE_RELOAD_PATH}?path="+encodeURIComponent(location.pathname))'
+    '.addEventListener("reload",function(){location.reload()})</script>'
+)
+
+
+class CachedResponse:
+    """
+    A rendered page or static file held in memory, with its strong ETag.
+    """
+
+    __slots__ = ("_gzipped", "body", "content_type", "etag", "key")
+
+    def __init__(self, key, etag: str, content_type: str, body: bytes):
+        """
+        Initialize the CachedResponse.
+
+        :param key: The key of the response in the DevSite's LRU.
+        :param etag: A string, the quoted entity tag of the body.
+        :param content_type: A string, the value of the Content-Type header.
+        :param body: The bytes of the response.
+        """
+        self.key = key
+        self.etag = etag
+        self.content_type = content_type
+        self.body = body
+        self._gzipped = None
+
+    def gzipped(self) -> bytes:
+        """Returns the body compressed with gzip, compressing it on first use only."""
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + (len(self._gzipped) if self._gzipped else 0)
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Tells whether an Accept-Encoding header allows a gzip response."""
+    if not accept_encoding:
+        return False
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().lower()
+        return not (
+            quality.startswith("q=") and quality[2:].strip() in ("0", "0.0", "0.00")
+        )
+    return False
+
+
+def page_etag(key: str) -> str:
+    """Returns the strong ETag of a page from the key of its response."""
+    return f'"{key[:32]}"'
+
+
+def gzip_etag(etag: str) -> str:
+    """Returns the ETag of the gzip variant; a different representation needs its own tag."""
+    return etag[:-1] + '-gzip"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Tells whether an If-None-Match header lists the ETag, comparing weakly as RFC 9110 asks."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag.removeprefix("W/") for tag in tags)
+
+
+class LiveReload:
+    """
+    The browsers listening for reloads, each subscribed to the page it is viewing.
+
+    Every subscriber gets a queue its event stream blocks on. notify() puts a reload
+    into the queues of the given pages' viewers only, or of every viewer when no pages
+    are given; close() puts None to end every stream.
+    """
+
+    def __init__(self):
+        self.subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, source: str | None) -> queue.Queue:
+        """Registers a browser viewing the page built from source, or a page that has none."""
+        subscription = queue.Queue()
+        with self._lock:
+            self.subscribers[subscription] = source
+        return subscription
+
+    def unsubscribe(self, subscription: queue.Queue) -> None:
+        with self._lock:
+            self.subscribers.pop(subscription, None)
+
+    def notify(self, sources: set[str] | None = None) -> int:
+        """Tells the viewers of some pages, or of all pages if sources is None, to reload.
+
+        Args:
+            sources (set | None): markdown paths of the pages that changed
+
+        Returns:
+            int: number of browsers notified
+        """
+        with self._lock:
+            subscribers = list(self.subscribers.items())
+        notified = 0
+        for subscription, source in subscribers:
+            if sources is None or source in sources:
+                subscription.put("reload")
+                notified += 1
+        return notified
+
+    def close(self) -> None:
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.put(None)
+
+
+class DevSite:
+    """
+    Renders the pages of a site on request, without writing the output directory.
+
+    A page is looked up by the URL the build would write it to, e.g. /blog/tom/ for
+    content/blog/tom/index.md, and anything else is served from the static directory.
+    Responses are cached in an LRU keyed by the hash of everything the page is made
+    of: the markdown, the template, the basepath and the parser version. A request
+    therefore reads and hashes the markdown but only renders it when it changed, and
+    that hash doubles as the strong ETag, so a revalidation is answered with a 304
+    without rendering anything.
+
+    With live reload, pages get a small script that listens for reloads on an event
+    stream. apply_changes() re-renders only the pages whose markdown changed and
+    reloads only the browsers viewing them; a template or static file change reloads
+    every browser.
+
+    With a listing section, its paginated listing is served at the URLs the build
+    writes it to, from the headers of the section's markdown files, and reloads
+    whenever one of them changes.
+    """
+
+    def __init__(
+        self,
+        content_dir: str,
+        static_dir: str,
+        template_path: str,
+        basepath: str = "/",
+        max_bytes: int = DEFAULT_MEMORY_BYTES,
+        live_reload: bool = False,
+        listing: str | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ):
+        """
+        Initialize the DevSite with the site layout.
+
+        :param content_dir: A string, the directory of markdown files.
+        :param static_dir: A string, the directory of static assets.
+        :param template_path: A string, the path to the template file.
+        :param basepath: A string, the basepath to prefix absolute links with.
+        :param max_bytes: An integer, the bytes of responses kept in memory.
+        :param live_reload: A boolean, whether pages reload themselves when they change.
+        :param listing: A string, the section whose posts are listed, or None for no listing.
+        :param page_size: An integer, the number of posts per listing page.
+        """
+        self.content_dir = os.path.normpath(content_dir)
+        self.static_dir = os.path.normpath(static_dir)
+        self.template_path = os.path.normpath(template_path)
+        self.basepath = basepath
+        self.responses = ByteLRU(max_bytes)
+        self.live = LiveReload() if live_reload else None
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0}
+        self._template = None
+        self._template_stamp = None
+        self._template_lock = threading.Lock()
+        self.listing = listing
+        self.page_size = page_size
+        # the markdown directory of the listing, which its viewers subscribe to
+        self.listing_source = (
+            os.path.join(self.content_dir, listing) if listing is not None else None
+        )
+        # refreshed on each listing request and never saved
+        self.metadata = MetadataIndex()
+        self._listing_lock = threading.Lock()
+
+    def template(self) -> tuple[Template, str]:
+        """Returns the compiled template and its hash, compiling it again when the file changed."""
+        stat = os.stat(self.template_path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        with self._template_lock:
+            if stamp != self._template_stamp:
+                with open(self.template_path, "r") as f:
+                    source = f.read()
+                self._template = (
+                    Template(source),
+                    hashlib.sha256(source.encode()).hexdigest(),
+                )
+                self._template_stamp = stamp
+            return self._template
+
+    def _safe_join(self, root: str, path: str) -> str | None:
+        # url paths are posix; refuse anything that climbs out of the root
+        path = posixpath.normpath("/" + path).lstrip("/")
+        if path.startswith("..") or "\0" in path:
+            return None
+        return os.path.join(root, *path.split("/")) if path and path != "." else root
+
+    def strip_basepath(self, url_path: str) -> str:
+        """Returns the path of a request relative to the site, without the basepath links carry."""
+        if self.basepath != "/" and url_path.startswith(self.basepath):
+            return "/" + url_path[len(self.basepath) :]
+        return url_path
+
+    def listing_number(self, url_path: str) -> int | None:
+        """Returns the number of the listing page a URL path is, or None if it is none."""
+        if self.listing is None:
+            return None
+        prefix = f"/{self.listing}/"
+        if url_path == prefix:
+            return 1
+        number = url_path.removeprefix(prefix + "page/").removesuffix("/")
+        if (
+            url_path.startswith(prefix + "page/")
+            and url_path.endswith("/")
+            and number.isdigit()
+            and number == str(int(number))
+            and int(number) > 1
+        ):
+            return int(number)
+        return None
+
+    def resolve(self, url_path: str) -> tuple[str, str | int | None]:
+        """Finds what a URL path serves.
+
+        Args:
+            url_path (str): the decoded path of the request
+
+        Returns:
+            tuple: ("page", markdown path), ("listing", page number), ("asset", file path), ("redirect", location) or ("missing", None)
+        """
+        if url_path.endswith("/"):
+            source = self._safe_join(self.content_dir, url_path + "index.md")
+        elif url_path.endswith(".html"):
+            source = self._safe_join(
+                self.content_dir, url_path[: -len(".html")] + ".md"
+            )
+        else:
+            source = None
+        if source is not None and os.path.isfile(source):
+            return "page", source
+        number = self.listing_number(url_path)
+        if number is not None:
+            return "listing", number
+
+        asset = self._safe_join(self.static_dir, url_path)
+        if asset is not None and os.path.isfile(asset):
+            return "asset", asset
+        directory = self._safe_join(self.content_dir, url_path)
+        if url_path.endswith("/"):
+            return "missing", None
+        if (
+            directory is not None
+            and os.path.isfile(os.path.join(directory, "index.md"))
+        ) or self.listing_number(url_path + "/") is not None:
+            return "redirect", url_path + "/"
+        return "missing", None
+
+    def page_key(self, source: str) -> tuple[str, Template, str]:
+        """Reads a page and hashes everything its response is made of, without rendering it.
+
+        Args:
+            source (str): path to the markdown file
+
+        Returns:
+            tuple: the key of the page's response, the compiled template and the markdown
+        """
+        template, template_hash = self.template()
+        with open(source, "r") as f:
+            markdown = f.read()
+        live = self.live is not None
+        digest = hashlib.sha256(
+            f"{PARSER_VERSION}\0{template_hash}\0{self.basepath}\0{live}\0".encode()
+        )
+        digest.update(markdown.encode())
+        return digest.hexdigest(), template, markdown
+
+    def page(self, source: str) -> CachedResponse:
+        """Returns the response of a page, rendering it only when its inputs changed.
+
+        Args:
+            source (str): path to the markdown file
+
+        Returns:
+            CachedResponse: the full page as the build would write it, with the live reload script if enabled
+        """
+        return self._render_page(*self.page_key(source))
+
+    def _render_page(
+        self, key: str, template: Template, markdown: str
+    ) -> CachedResponse:
+        response = self.responses.get(key)
+        if response is not None:
+            self.stats["hits"] += 1
+            return response
+        self.stats["misses"] += 1
+        title, body = split_page(markdown)
+        page = template.render(
+            {"Title": title, "Content": markdown_to_html(body)}, self.basepath
+        )
+        return self._page_response(key, page)
+
+    def _page_response(self, key: str, page: str) -> CachedResponse:
+        if self.live is not None:
+            end = page.rfind("</body>")
+            if end == -1:
+                page += LIVE_RELOAD_SCRIPT
+            else:
+                page = page[:end] + LIVE_RELOAD_SCRIPT + page[end:]
+        response = CachedResponse(
+            key, page_etag(key), "text/html; charset=utf-8", page.encode()
+        )
+        self.responses.put(key, response, response.size)
+        return response
+
+    def listing_page(self, number: int) -> CachedResponse | None:
+        """Returns the response of a listing page, rendering it only when what it shows changed.
+
+        The headers of the markdown files are read again only when their stamp changed.
+
+        Args:
+            number (int): the number of the listing page, from 1
+
+        Returns:
+            CachedResponse | None: the listing page as the build would write it, or None past the last page
+        """
+        template, template_hash = self.template()
+        with self._listing_lock:
+            self.metadata.refresh(scan_tree(self.content_dir, os.curdir, page_name))
+            posts = self.metadata.pages(self.listing_source)
+        slices = paginate(posts, self.page_size)
+        if number > len(slices):
+            return None
+        page_posts = slices[number - 1]
+        fingerprint = listing_fingerprint(
+            page_posts, number, number < len(slices), template_hash, self.basepath
+        )
+        key = hashlib.sha256(
+            f"listing\0{self.live is not None}\0{fingerprint}".encode()
+        ).hexdigest()
+
+        response = self.responses.get(key)
+        if response is not None:
+            self.stats["hits"] += 1
+            return response
+        self.stats["misses"] += 1
+        values = listing_values(
+            self.listing, page_posts, number, len(slices), os.curdir
+        )
+        return self._page_response(key, template.render(values, self.basepath))
+
+    def asset(self, path: str) -> CachedResponse:
+        """Returns the response of a static file, reading it only when its stat changed.
+
+        Args:
+            path (str): path to the static file
+
+        Returns:
+            CachedResponse: the file's content
+        """
+        stat = os.stat(path)
+        key = ("asset", path, stat.st_size, stat.st_mtime_ns)
+        response = self.responses.get(key)
+        if response is not None:
+            self.stats["hits"] += 1
+            return response
+        self.stats["misses"] += 1
+        with open(path, "rb") as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        response = CachedResponse(key, etag, content_type, body)
+        self.responses.put(key, response, response.size)
+        return response
+
+    def apply_changes(self, changes: set[str]) -> int:
+        """Re-renders the pages whose files changed and reloads the browsers viewing them.
+
+        Args:
+            changes (set): paths of the files that were added, modified or removed
+
+        Returns:
+            int: number of browsers told to reload
+        """
+        if self.live is None:
+            return 0
+        changed = {os.path.normpath(path) for path in changes}
+        if any(
+            path == self.template_path or path.startswith(self.static_dir + os.sep)
+            for path in changed
+        ):
+            return self.live.notify()
+
+        sources = {
+            path
+            for path in changed
+            if path.endswith(".md") and path.startswith(self.content_dir + os.sep)
+        }
+        for source in sources:
+            if os.path.isfile(source):
+                try:
+                    # render now, so the reload is served from memory
+                    self.page(source)
+                except (OSError, ValueError) as error:
+                    print(f"Failed to render {source}: {error}")
+        if self.listing_source is not None and any(
+            source.startswith(self.listing_source + os.sep) for source in sources
+        ):
+            sources.add(self.listing_source)
+        return self.live.notify(sources) if sources else 0
+
+    def respond(
+        self,
+        url_path: str,
+        if_none_match: str | None = None,
+        accept_encoding: str | None = None,
+    ) -> tuple[int, dict, bytes]:
+        """Answers a GET request.
+
+        Args:
+            url_path (str): the decoded path of the request
+            if_none_match (str | None): the If-None-Match header of the request
+            accept_encoding (str | None): the Accept-Encoding header of the request
+
+        Returns:
+            tuple: the status code, the response headers and the body
+        """
+        kind, path = self.resolve(self.strip_basepath(url_path))
+        if kind == "redirect":
+            return 301, {"Location": path}, b""
+        response = None
+        try:
+            if kind == "page":
+                key, template, markdown = self.page_key(path)
+                # a client holding the gzip tag got a page big enough to compress, so
+                # the tag this request would get is known before rendering
+                etag = page_etag(key)
+                if accepts_gzip(accept_encoding):
+                    etag = gzip_etag(etag)
+                if etag_matches(if_none_match, etag):
+                    return self._not_modified(etag)
+                response = self._render_page(key, template, markdown)
+            elif kind == "listing":
+                response = self.listing_page(path)
+            elif kind == "asset":
+                response = self.asset(path)
+        except (OSError, ValueError) as error:
+            return (
+                500,
+                {"Content-Type": "text/plain; charset=utf-8"},
+                f"Failed to render {path}: {error}\n".encode(),
+            )
+        if response is None:
+            return (
+                404,
+                {"Content-Type": "text/plain; charset=utf-8"},
+                f"Not found: {url_path}\n".encode(),
+            )
+
+        compress = len(response.body) >= MIN_GZIP_BYTES and accepts_gzip(
+            accept_encoding
+        )
+        etag = gzip_etag(response.etag) if compress else response.etag
+        if etag_matches(if_none_match, etag):
+            return self._not_modified(etag)
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+        if compress:
+            headers["Content-Encoding"] = "gzip"
+            charged = response.size
+            body = response.gzipped()
+            if response.size != charged:
+                # the compressed copy is held too, so charge it to the cache
+                self.responses.put(response.key, response, response.size)
+        else:
+            body = response.body
+        headers["Content-Type"] = response.content_type
+        return 200, headers, body
+
+    def _not_modified(self, etag: str) -> tuple[int, dict, bytes]:
+        self.stats["not_modified"] += 1
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        return 304, headers, b""
+
+
+class DevRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the DevSite of its server; the HTTP details stay here, the logic in DevSite.
+    """
+
+    server_version = "StaticSiteDev"
+
+    def _stream_reloads(self, query: str) -> None:
+        site = self.server.site
+        page_path = parse_qs(query).get("path", ["/"])[0]
+        kind, source = site.resolve(site.strip_basepath(page_path))
+        if kind == "listing":
+            source = site.listing_source
+        elif kind != "page":
+            source = None
+        subscription = site.live.subscribe(source)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(b"retry: 1000\n\n")
+            self.wfile.flush()
+            while True:
+                try:
+                    event = subscription.get(timeout=LIVE_RELOAD_PING)
+                except queue.Empty:
+                    # also finds out when the browser went away
+                    self.wfile.write(b": ping\n\n")
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    return
+                self.wfile.write(f"event: {event}\ndata: {page_path}\n\n".encode())
+                self.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            site.live.unsubscribe(subscription)
+
+    def _send(self, head_only: bool) -> None:
+        url = urlsplit(self.path)
+        url_path = unquote(url.path)
+        live = self.server.site.live
+        if url_path == LIVE_RELOAD_PATH and live is not None and not head_only:
+            self._stream_reloads(url.query)
+            return
+        status, headers, body = self.server.site.respond(
+            url_path,
+            self.headers.get("If-None-Match"),
+            self.headers.get("Accept-Encoding"),
+        )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head_only and status != 304:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(False)
+
+    def do_HEAD(self):
+        self._send(True)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class DevServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server for a DevSite.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], site: DevSite, verbose: bool = True):
+        """
+        Initialize the DevServer and bind it.
+
+        :param address: A (host, port) tuple to listen on; port 0 picks a free port.
+        :param site: The DevSite to serve.
+        :param verbose: A boolean, whether to log every request.
+        """
+        self.site = site
+        self.verbose = verbose
+        super().__init__(address, DevRequestHandler)
+
+    def server_close(self):
+        if self.site.live is not None:
+            self.site.live.close()
+        super().server_close()
@@ -0,0 +1,99 @@
+import os
+
+from markdown.parser import extract_markdown_images, extract_markdown_links
+
+
+def referenced_assets(markdown: str, static_dir: str) -> list[str]:
+    """Lists the static assets a markdown document links to or embeds.
+
+    Only root-relative targets that resolve to an existing file in the static directory
+    count; links to other pages and to external sites are not dependencies.
+
+    Args:
+        markdown (str): content of a markdown document
+        static_dir (str): path to the static directory
+
+    Returns:
+        list: sorted paths of the referenced files in the static directory
+    """
+    assets = set()
+    for _, url in extract_markdown_images(markdown) + extract_markdown_links(markdown):
+        if not url.startswith("/") or url.startswith("//"):
+            continue
+        path = url.split("#", 1)[0].split("?", 1)[0].lstrip("/")
+        if not path:
+            continue
+        asset = os.path.normpath(os.path.join(static_dir, path))
+        if os.path.isfile(asset):
+            assets.add(asset)
+    return sorted(assets)
+
+
+class DependencyGraph:
+    """
+    Records which input files every output of a build was generated from.
+
+    A page depends on its markdown source, the template and the assets it references;
+    given a set of changed files, affected() answers which outputs are now out of date
+    through a reverse index, without looking at any output that does not depend on them.
+    """
+
+    def __init__(self, dependencies: dict | None = None):
+        """
+        Initialize the DependencyGraph with previously recorded dependencies.
+
+        :param dependencies: A dictionary mapping output paths to lists of input paths.
+        """
+        self.dependencies = {}
+        self.dependents = {}
+        for output, inputs in (dependencies or {}).items():
+            self.set_dependencies(output, inputs)
+
+    def set_dependencies(self, output: str, inputs) -> None:
+        """Replaces the recorded inputs of an output.
+
+        Args:
+            output (str): path of the output file
+            inputs (Iterable[str]): paths of the files it was generated from
+        """
+        self.remove(output)
+        inputs = {os.path.normpath(path) for path in inputs}
+        self.dependencies[output] = inputs
+        for path in inputs:
+            self.dependents.setdefault(path, set()).add(output)
+
+    def remove(self, output: str) -> None:
+        """Forgets an output and its inputs."""
+        for path in self.dependencies.pop(output, ()):
+            outputs = self.dependents[path]
+            outputs.discard(output)
+            if not outputs:
+                del self.dependents[path]
+
+    def dependencies_of(self, output: str) -> set[str]:
+        return set(self.dependencies.get(output, ()))
+
+    def affected(self, changed) -> set[str]:
+        """Returns the outputs built from any of the changed files.
+
+        Args:
+            changed (Iterable[str]): paths of the files that were added, modified or removed
+
+        Returns:
+            set: paths of the outputs to generate again
+        """
+        outputs = set()
+        for path in changed:
+            outputs.update(self.dependents.get(os.path.normpath(path), ()))
+        return outputs
+
+    def prune(self, outputs) -> None:
+        """Drops every output that is not in the given collection."""
+        for output in list(self.dependencies.keys() - set(outputs)):
+            self.remove(output)
+
+    def to_dict(self) -> dict:
+        return {
+            output: sorted(inputs)
+            for output, inputs in sorted(self.dependencies.items())
+        }
@@ -1,35 +1,12 @@
-import os
-import shutil
-
-from markdown.converter import markdown_to_html_node
-
-
-def source_to_destination(src: str, dest: str) -> None:
-    """copies all content from the source directory to the destination directory recursively.
-    This function will delete all the content in the destination directory before copying.
-
-    Args:
-        src (str): path to the source directory
-        dest (str): path to the destination directory
-
-    Returns:
-        None
-    """
-    if not os.path.exists(src):
-        raise FileNotFoundError(f"Source directory {src} does not exist.")
-
-    if os.path.exists(dest):
-        shutil.rmtree(dest)
-
-    os.makedirs(dest)
-
-    for item in os.listdir(src):
-        name = os.path.join(src, item)
-        if os.path.isfile(name):
-            print(f"Copying file {name} to {dest}/{item}")
-            shutil.copy(name, dest)
-        else:
-            source_to_destination(name, os.path.join(dest, item))
+from markdown.converter import iter_markdown_html, markdown_to_html
+from markdown.frontmatter import split_front_matter
+from utils.cache import ParseCache
+from utils.graph import referenced_assets
+from utils.manifest import BuildManifest
+from utils.output import OutputFile, write_output
+from utils.plan import page_name, scan_tree
+from utils.profiler import NULL_PROFILER, Profiler
+from utils.template import Template
 
 
 def extract_title(markdown: str) -> str:
@@ -41,65 +18,210 @@ def extract_title(markdown: str) -> str:
     Returns:
         str: title of the markdown file
     """
-    title_line = markdown.split("\n")[0]
+    title_line = markdown.partition("\n")[0]
     if title_line.startswith("# "):
         return title_line[2:].strip()
     else:
         raise ValueError("Title not found in markdown file.")
 
 
+def split_page(markdown: str) -> tuple[str, str]:
+    """Splits a markdown file into its title and the body to convert.
+
+    The title comes from a `title` front matter field when there is one, and from the
+    first line of the body otherwise.
+
+    Args:
+        markdown (str): content of a markdown file, with optional front matter
+
+    Returns:
+        tuple: the title and the markdown body without its front matter
+    """
+    fields, body = split_front_matter(markdown)
+    title = fields.get("title")
+    if not title:
+        title = extract_title(body)
+    return title, body
+
+
 def generate_page(
-    from_path: str, template_path: str, dest_path: str, basepath: str
-) -> None:
+    from_path: str,
+    template_path: str,
+    dest_path: str,
+    basepath: str,
+    template: Template | None = None,
+    profiler: Profiler | None = None,
+    cache: ParseCache | None = None,
+    static_dir: str | None = None,
+) -> list[str]:
     """Given the path to a markdown file, a template file, and a destination path, parse the markdown file, convert it to HTML string, and generate a new HTML file using the template.
 
     Args:
         from_path (str): path to the markdown file
         template_path (str): path to the template file
         dest_path (str): path to the destination HTML file
+        template (Template | None): the template file already compiled, to avoid reading it for every page
+        profiler (Profiler | None): records the time spent in each phase; the page is then rendered, templated and written in separate steps instead of streamed
+        cache (ParseCache | None): cache of rendered page bodies, consulted before parsing
+        static_dir (str | None): path to the static directory, to find the assets the page references
+
+    Returns:
+        list: paths of the static files the page references, empty without a static_dir
     """
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    with open(from_path, "r") as f:
-        file_contents = f.read()
-        with open(template_path, "r") as t:
-            template_contents = t.read()
-
-            file_contents_html = markdown_to_html_node(file_contents).to_html()
-            page_title = extract_title(file_contents)
-
-            template_contents = template_contents.replace("{{ Title }}", page_title)
-            template_contents = template_contents.replace(
-                "{{ Content }}", file_contents_html
+    if profiler is None:
+        profiler = NULL_PROFILER
+    if template is None:
+        template = Template.from_file(template_path)
+
+    with profiler.page(from_path):
+        with profiler.phase("read"), open(from_path, "r") as f:
+            file_contents = f.read()
+
+        file_contents_html = None
+        if cache is not None:
+            with profiler.phase("cache"):
+                file_contents_html = cache.get(file_contents)
+
+        page_title, body = split_page(file_contents)
+        if file_contents_html is None and (cache is not None or profiler.enabled):
+            with profiler.phase("parse"):
+                file_contents_html = markdown_to_html(
+                    body, profiler if profiler.enabled else None
+                )
+            if cache is not None:
+                with profiler.phase("cache"):
+                    cache.put(file_contents, file_contents_html)
+        assets = (
+            referenced_assets(file_contents, static_dir)
+            if static_dir is not None
+            else []
+        )
+
+        if not profiler.enabled:
+            # the body joined for the cache is still templated straight into the file
+            content = (
+                iter_markdown_html(body)
+                if file_contents_html is None
+                else file_contents_html
             )
-            template_contents = template_contents.replace(
-                'href="/', f'href="{basepath}'
+            with OutputFile(dest_path) as f:
+                template.write(f, {"Title": page_title, "Content": content}, basepath)
+            return assets
+
+        with profiler.phase("template"):
+            page = template.render(
+                {"Title": page_title, "Content": file_contents_html}, basepath
             )
-            template_contents = template_contents.replace('src="/', f'src="{basepath}')
+        with profiler.phase("write"):
+            write_output(dest_path, page)
+    return assets
 
-            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
 
-            with open(dest_path, "w") as f:
-                f.write(template_contents)
+def plan_pages(dir_path_content: str, dest_dir_path: str) -> list[tuple[str, str]]:
+    """Crawls the content directory and lists every page to generate without generating it.
 
+    Args:
+        dir_path_content (str): path to the content directory
+        dest_dir_path (str): path to the destination directory
 
-def generate_pages_recursive(
-    dir_path_content: str, template_path: str, dest_dir_path: str, basepath: str
+    Returns:
+        list: (markdown path, HTML path) tuples, sorted by markdown path
+    """
+    return [
+        (page.source, page.dest)
+        for page in scan_tree(dir_path_content, dest_dir_path, page_name)
+    ]
+
+
+def generate_pages(
+    pages: list[tuple[str, str]],
+    template_path: str,
+    basepath: str,
+    manifest: BuildManifest | None = None,
+    template: Template | None = None,
+    profiler: Profiler | None = None,
+    cache: ParseCache | None = None,
+    static_dir: str | None = None,
 ) -> None:
-    """Crawls the content directory and generates HTML pages to the public directory for each markdown file found using the template provided.
+    """Generates the planned pages one after the other.
+
+    When a build manifest is given, pages whose markdown, template, basepath and output path are unchanged since the last build are skipped.
 
     Args:
-        dir_path_content (str): _description_
-        template_path (str): _description_
-        dest_dir_path (str): _description_
+        pages (list): (markdown path, HTML path) tuples as returned by plan_pages
+        template_path (str): path to the template file
+        basepath (str): basepath to prefix absolute links with
+        manifest (BuildManifest | None): manifest of the previous build, updated in place
+        template (Template | None): the compiled template, compiled once per build if not given
+        profiler (Profiler | None): records the time spent in each phase of each page
+        cache (ParseCache | None): cache of rendered page bodies, consulted before parsing
+        static_dir (str | None): path to the static directory, whose referenced files are recorded as page dependencies
     """
-    for content in os.listdir(dir_path_content):
-        content_path = os.path.join(dir_path_content, content)
-        if os.path.isfile(content_path):
-            if content.endswith(".md"):
-                dest_path = os.path.join(dest_dir_path, content.replace(".md", ".html"))
-                generate_page(content_path, template_path, dest_path, basepath)
+    if template is None:
+        template = Template.from_file(template_path)
+
+    for content_path, dest_path in pages:
+        if manifest is None:
+            generate_page(
+                content_path,
+                template_path,
+                dest_path,
+                basepath,
+                template,
+                profiler,
+                cache,
+                static_dir,
+            )
+        elif manifest.is_fresh(content_path, template_path, dest_path, basepath):
+            manifest.skipped += 1
         else:
-            new_dest_dir = os.path.join(dest_dir_path, content)
-            generate_pages_recursive(
-                content_path, template_path, new_dest_dir, basepath
+            assets = generate_page(
+                content_path,
+                template_path,
+                dest_path,
+                basepath,
+                template,
+                profiler,
+                cache,
+                static_dir,
             )
+            manifest.record(content_path, template_path, dest_path, basepath, assets)
+            manifest.generated += 1
+
+
+def generate_pages_recursive(
+    dir_path_content: str,
+    template_path: str,
+    dest_dir_path: str,
+    basepath: str,
+    manifest: BuildManifest | None = None,
+    template: Template | None = None,
+    profiler: Profiler | None = None,
+    cache: ParseCache | None = None,
+    static_dir: str | None = None,
+) -> None:
+    """Crawls the content directory and generates HTML pages to the public directory for each markdown file found using the template provided.
+
+    When a build manifest is given, pages whose markdown, template, basepath and output path are unchanged since the last build are skipped.
+
+    Args:
+        dir_path_content (str): path to the content directory
+        template_path (str): path to the template file
+        dest_dir_path (str): path to the destination directory
+        manifest (BuildManifest | None): manifest of the previous build, updated in place
+        template (Template | None): the compiled template, compiled once per build if not given
+        profiler (Profiler | None): records the time spent in each phase of each page
+        cache (ParseCache | None): cache of rendered page bodies, consulted before parsing
+        static_dir (str | None): path to the static directory, whose referenced files are recorded as page dependencies
+    """
+    generate_pages(
+        plan_pages(dir_path_content, dest_dir_path),
+        template_path,
+        basepath,
+        manifest,
+        template,
+        profiler,
+        cache,
+        static_dir,
+    )
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+
+from nodes import LeafNode, ParentNode
+from utils.manifest import BuildManifest
+from utils.metadata import MetadataIndex, PageMetadata
+from utils.output import OutputFile
+from utils.plan import PlannedFile
+from utils.sync import remove_empty_parents
+from utils.template import Template
+
+DEFAULT_PAGE_SIZE = 10
+
+
+def page_url(dest: str, dest_dir: str) -> str:
+    """Returns the root-relative URL a generated page is served at.
+
+    Args:
+        dest (str): path to the generated HTML file
+        dest_dir (str): path to the output directory
+
+    Returns:
+        str: the URL, without index.html, e.g. /blog/tom for docs/blog/tom/index.html
+    """
+    path = os.path.relpath(dest, dest_dir).replace(os.sep, "/")
+    if path == "index.html":
+        return "/"
+    if path.endswith("/index.html"):
+        return "/" + path[: -len("/index.html")]
+    return "/" + path
+
+
+def listing_dest(dest_dir: str, section: str, number: int) -> str:
+    """Returns the output path of a listing page; the first page is the section's index."""
+    if number == 1:
+        return os.path.join(dest_dir, section, "index.html")
+    return os.path.join(dest_dir, section, "page", str(number), "index.html")
+
+
+def paginate(posts: list, page_size: int) -> list[list]:
+    """Splits the posts into consecutive pages of page_size, with at least one page."""
+    if page_size < 1:
+        raise ValueError("The page size must be at least 1.")
+    return [posts[i : i + page_size] for i in range(0, len(posts), page_size)] or [[]]
+
+
+def listing_title(section: str, number: int) -> str:
+    title = section.replace("-", " ").replace("_", " ").title()
+    return title if number == 1 else f"{title} - Page {number}"
+
+
+def listing_to_html_node(
+    section: str,
+    posts: list[PageMetadata],
+    number: int,
+    pages: int,
+    dest_dir: str,
+) -> ParentNode:
+    """Builds the HTML of one listing page, wrapped in a div like a converted document.
+
+    Args:
+        section (str): the section listed, e.g. "blog"
+        posts (list[PageMetadata]): the posts of this page, in display order
+        number (int): the number of this page, from 1
+        pages (int): the number of listing pages
+        dest_dir (str): path to the output directory, to compute the URLs of the posts
+
+    Returns:
+        ParentNode: the body of the listing page
+    """
+    items = []
+    for post in posts:
+        url = page_url(post.dest, dest_dir)
+        children = [LeafNode("a", post.title or url, {"href": url})]
+        if post.date:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", post.date, {"datetime": post.date}))
+        if post.summary:
+            children.append(LeafNode("p", post.summary))
+        items.append(ParentNode("li", children))
+
+    children = [LeafNode("h1", listing_title(section, number))]
+    if items:
+        children.append(ParentNode("ul", items))
+    links = []
+    if number > 1:
+        newer = page_url(listing_dest(dest_dir, section, number - 1), dest_dir)
+        links.append(LeafNode("a", "&lt; Newer", {"href": newer, "rel": "prev"}))
+    if number < pages:
+        older = page_url(listing_dest(dest_dir, section, number + 1), dest_dir)
+        links.append(LeafNode("a", "Older &gt;", {"href": older, "rel": "next"}))
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+
+def listing_values(
+    section: str,
+    posts: list[PageMetadata],
+    number: int,
+    pages: int,
+    dest_dir: str,
+) -> dict:
+    """Returns the template values of one listing page, with its body as a stream of chunks."""
+    html_node = listing_to_html_node(section, posts, number, pages, dest_dir)
+    return {"Title": listing_title(section, number), "Content": html_node.iter_html()}
+
+
+def listing_fingerprint(
+    posts: list[PageMetadata],
+    number: int,
+    has_older: bool,
+    template_hash: str,
+    basepath: str,
+) -> str:
+    data = [
+        number,
+        has_older,
+        template_hash,
+        basepath,
+        [[post.dest, post.title, post.date, post.summary] for post in posts],
+    ]
+    return hashlib.sha256(json.dumps(data).encode()).hexdigest()
+
+
+def generate_listing(
+    posts: list[PageMetadata],
+    section: str,
+    template_path: str,
+    dest_dir: str,
+    basepath: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    manifest: BuildManifest | None = None,
+    template: Template | None = None,
+) -> list[str]:
+    """Generates the paginated listing of a section's posts through the page template.
+
+    The first page is the section's index and the others are its archive, at
+    <section>/page/<n>/. With a manifest, a page is only written again when its slice
+    of posts, its neighbours, the template or the basepath changed, and the recorded
+    listing pages it no longer generates are deleted with remove_stale_listings.
+
+    Args:
+        posts (list[PageMetadata]): the posts to list, in display order
+        section (str): the section listed, e.g. "blog"
+        template_path (str): path to the template file
+        dest_dir (str): path to the output directory
+        basepath (str): basepath to prefix absolute links with
+        page_size (int): number of posts per page
+        manifest (BuildManifest | None): manifest of the previous build, updated in place
+        template (Template | None): the compiled template, compiled here if not given
+
+    Returns:
+        list: paths of the listing pages written or deleted
+    """
+    if template is None:
+        template = Template.from_file(template_path)
+    template_hash = manifest.input_hash(template_path) if manifest is not None else ""
+
+    touched = []
+    slices = paginate(posts, page_size)
+    dests = set()
+    for number, page_posts in enumerate(slices, start=1):
+        dest = listing_dest(dest_dir, section, number)
+        dests.add(dest)
+        fingerprint = listing_fingerprint(
+            page_posts, number, number < len(slices), template_hash, basepath
+        )
+        if manifest is not None and manifest.is_listing_fresh(dest, fingerprint):
+            manifest.skipped += 1
+            continue
+
+        print(f"Generating listing page {number} of {section} to {dest}")
+        values = listing_values(section, page_posts, number, len(slices), dest_dir)
+        with OutputFile(dest) as f:
+            template.write(f, values, basepath)
+        touched.append(dest)
+        if manifest is not None:
+            manifest.record_listing(dest, fingerprint)
+            manifest.generated += 1
+
+    if manifest is not None:
+        touched.extend(remove_stale_listings(manifest, dest_dir, dests))
+    return touched
+
+
+def remove_stale_listings(
+    manifest: BuildManifest, dest_dir: str, current=()
+) -> list[str]:
+    """Deletes the listing pages the manifest recorded that are no longer generated.
+
+    That covers archive pages left over from a longer listing, and every page of a
+    listing of another section or of a build without a listing. A recorded page that
+    is now generated from markdown is forgotten but left in place.
+
+    Args:
+        manifest (BuildManifest): manifest of the previous build, updated in place
+        dest_dir (str): path to the output directory
+        current (Collection[str]): paths of the listing pages generated now
+
+    Returns:
+        list: paths of the listing pages deleted or forgotten
+    """
+    pages = {entry["dest"] for entry in manifest.entries.values()}
+    touched = []
+    for dest in manifest.stale_listings(os.path.join(dest_dir, ""), current):
+        if dest not in pages and os.path.isfile(dest):
+            print(f"Deleting stale listing page {dest}")
+            os.remove(dest)
+            remove_empty_parents(dest, dest_dir)
+        touched.append(dest)
+    return touched
+
+
+def build_listing(
+    pages: list[PlannedFile],
+    section: str,
+    content_dir: str,
+    template_path: str,
+    dest_dir: str,
+    basepath: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    manifest: BuildManifest | None = None,
+    metadata: MetadataIndex | None = None,
+    template: Template | None = None,
+) -> list[str]:
+    """Brings the listing of a section up to date with the pages of a build.
+
+    The metadata index is refreshed from the planned pages, which only reads the
+    headers of the files that changed, and saved. No listing is generated when the
+    section has an index page of its own.
+
+    Args:
+        pages (list[PlannedFile]): the pages of the site
+        section (str): the section listed, e.g. "blog"
+        content_dir (str): path to the content directory
+        template_path (str): path to the template file
+        dest_dir (str): path to the output directory
+        basepath (str): basepath to prefix absolute links with
+        page_size (int): number of posts per page
+        manifest (BuildManifest | None): manifest of the previous build, updated in place
+        metadata (MetadataIndex | None): the metadata index, loaded from disk if not given
+        template (Template | None): the compiled template, compiled here if not given
+
+    Returns:
+        list: paths of the listing pages written or deleted
+    """
+    index_dest = listing_dest(dest_dir, section, 1)
+    for page in pages:
+        if page.dest == index_dest:
+            print(f"Not generating the {section} listing: {page.source} is its index")
+            if manifest is None:
+                return []
+            return remove_stale_listings(manifest, dest_dir)
+    if metadata is None:
+        metadata = MetadataIndex.load()
+    metadata.refresh(pages)
+    metadata.save()
+    return generate_listing(
+        metadata.pages(os.path.join(content_dir, section)),
+        section,
+        template_path,
+        dest_dir,
+        basepath,
+        page_size,
+        manifest,
+        template,
+    )
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+
+from markdown.converter import PARSER_VERSION
+from utils.graph import DependencyGraph
+
+MANIFEST_PATH = ".cache/build-manifest.json"
+
+
+def file_hash(path: str) -> str:
+    """Returns the sha256 hex digest of a file's content.
+
+    Args:
+        path (str): path to the file to hash
+
+    Returns:
+        str: hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    A persisted record of the inputs every generated page was built from.
+
+    Each entry maps a markdown source path to the hash of its content, the hash
+    of the template, the basepath, the output path and the PARSER_VERSION used for
+    the last build.
+    A page only needs to be generated again when one of those changed or its
+    output file has gone missing. The manifest also lists the static assets the
+    last sync copied, so stale ones can be removed without touching pages, and
+    the dependency graph of every generated page, and a fingerprint of each generated
+    listing page.
+    """
+
+    VERSION = 3
+
+    def __init__(
+        self,
+        path: str,
+        entries: dict | None = None,
+        assets: list | None = None,
+        graph: DependencyGraph | None = None,
+        listings: dict | None = None,
+    ):
+        """
+        Initialize the BuildManifest with the path it is persisted to and its entries.
+
+        :param path: A string representing the path of the manifest JSON file.
+        :param entries: A dictionary mapping source paths to their recorded build inputs.
+        :param assets: A list of asset paths, relative to the output directory, owned by the asset sync.
+        :param graph: The DependencyGraph of the generated pages.
+        :param listings: A dictionary mapping listing page paths to the fingerprint of their content.
+        """
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.assets = assets if assets is not None else []
+        self.graph = graph if graph is not None else DependencyGraph()
+        self.listings = listings if listings is not None else {}
+        self.generated = 0
+        self.skipped = 0
+        self._seen = set()
+        self._hashes = {}
+
+    @classmethod
+    def load(cls, path: str = MANIFEST_PATH) -> "BuildManifest":
+        """Loads a manifest from disk. A missing, unreadable or outdated manifest yields an empty one.
+
+        Args:
+            path (str): path to the manifest JSON file
+
+        Returns:
+            BuildManifest: the loaded manifest
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+
+        if not isinstance(data, dict) or data.get("version") != cls.VERSION:
+            return cls(path)
+
+        return cls(
+            path,
+            data.get("pages", {}),
+            data.get("assets", []),
+            DependencyGraph(data.get("graph", {})),
+            data.get("listings", {}),
+        )
+
+    def input_hash(self, path: str) -> str:
+        """Returns the content hash of an input file, hashing each file at most once per build.
+
+        Args:
+            path (str): path to the input file
+
+        Returns:
+            str: hex digest of the file content
+        """
+        if path not in self._hashes:
+            self._hashes[path] = file_hash(path)
+        return self._hashes[path]
+
+    def invalidate(self, paths) -> None:
+        """Forgets the cached hashes of files that changed since they were hashed.
+
+        Args:
+            paths (Iterable[str]): paths of the changed files
+        """
+        for path in paths:
+            self._hashes.pop(path, None)
+
+    def _inputs(self, source: str, template: str, dest: str, basepath: str) -> dict:
+        return {
+            "source_hash": self.input_hash(source),
+            "template_hash": self.input_hash(template),
+            "basepath": basepath,
+            "dest": dest,
+            "parser_version": PARSER_VERSION,
+        }
+
+    def is_fresh(self, source: str, template: str, dest: str, basepath: str) -> bool:
+        """Checks whether the output of a page is up to date with its inputs.
+
+        Args:
+            source (str): path to the markdown file
+            template (str): path to the template file
+            dest (str): path to the destination HTML file
+            basepath (str): basepath the page is built with
+
+        Returns:
+            bool: True if the page does not need to be generated again
+        """
+        self._seen.add(source)
+        entry = self.entries.get(source)
+        if entry is None or not os.path.exists(dest):
+            return False
+        return entry == self._inputs(source, template, dest, basepath)
+
+    def record(
+        self,
+        source: str,
+        template: str,
+        dest: str,
+        basepath: str,
+        assets: list[str] | None = None,
+    ) -> None:
+        """Records the inputs a page has just been generated from.
+
+        Args:
+            source (str): path to the markdown file
+            template (str): path to the template file
+            dest (str): path to the destination HTML file
+            basepath (str): basepath the page was built with
+            assets (list | None): paths of the static files the page references
+        """
+        self._seen.add(source)
+        self.entries[source] = self._inputs(source, template, dest, basepath)
+        self.graph.set_dependencies(dest, [source, template, *(assets or ())])
+
+    def is_listing_fresh(self, dest: str, fingerprint: str) -> bool:
+        """Checks whether a listing page was generated with the same content before.
+
+        Args:
+            dest (str): path to the listing page
+            fingerprint (str): digest of everything the listing page shows
+
+        Returns:
+            bool: True if the listing page does not need to be generated again
+        """
+        return self.listings.get(dest) == fingerprint and os.path.exists(dest)
+
+    def record_listing(self, dest: str, fingerprint: str) -> None:
+        self.listings[dest] = fingerprint
+
+    def stale_listings(self, prefix: str, current) -> list[str]:
+        """Forgets the listing pages under a prefix that are no longer generated.
+
+        Args:
+            prefix (str): the output directory of the listing, ending with a separator
+            current (Collection[str]): paths of the listing pages generated now
+
+        Returns:
+            list: paths of the listing pages to delete
+        """
+        stale = sorted(
+            dest
+            for dest in self.listings
+            if dest.startswith(prefix) and dest not in current
+        )
+        for dest in stale:
+            del self.listings[dest]
+        return stale
+
+    def save(self) -> None:
+        """Writes the manifest to disk, dropping entries for sources that no longer exist."""
+        self.entries = {
+            source: entry
+            for source, entry in self.entries.items()
+            if source in self._seen
+        }
+        self.graph.prune(entry["dest"] for entry in self.entries.values())
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": self.VERSION,
+                    "pages": self.entries,
+                    "assets": self.assets,
+                    "graph": self.graph.to_dict(),
+                    "listings": self.listings,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, self.path)
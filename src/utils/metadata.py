@@ -0,0 +1,216 @@
+import json
+import os
+
+from markdown.frontmatter import FRONT_MATTER_DELIMITER, parse_front_matter
+from utils.plan import PlannedFile
+
+METADATA_PATH = ".cache/metadata.json"
+# front matter longer than this is not read as a header
+MAX_HEADER_BYTES = 64 * 1024
+
+
+class PageMetadata:
+    """
+    The metadata of one page, as read from the header of its markdown file.
+    """
+
+    __slots__ = ("date", "dest", "fields", "source", "summary", "tags", "title")
+
+    def __init__(
+        self,
+        source: str,
+        dest: str,
+        title: str | None,
+        fields: dict[str, str] | None = None,
+    ):
+        """
+        Initialize the PageMetadata.
+
+        :param source: A string, the path of the markdown file.
+        :param dest: A string, the path of the page generated from it.
+        :param title: A string, the title of the page, or None if it has none.
+        :param fields: A dictionary of the front matter fields of the page.
+        """
+        self.source = source
+        self.dest = dest
+        self.title = title
+        self.fields = fields if fields is not None else {}
+        self.date = self.fields.get("date")
+        self.summary = self.fields.get("summary")
+        self.tags = [
+            tag.strip() for tag in self.fields.get("tags", "").split(",") if tag.strip()
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "dest": self.dest,
+            "title": self.title,
+            "fields": self.fields,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PageMetadata":
+        return cls(data["source"], data["dest"], data["title"], data["fields"])
+
+    def __repr__(self):
+        return (
+            f"PageMetadata({self.source!r}, title={self.title!r}, date={self.date!r})"
+        )
+
+
+def read_header(source: str, dest: str) -> PageMetadata:
+    """Reads the metadata of a page from the first lines of its markdown file only.
+
+    The front matter, if any, is read line by line up to its closing delimiter, and the
+    title falls back to the first line after it; the rest of the document is never read
+    or parsed.
+
+    Args:
+        source (str): path to the markdown file
+        dest (str): path to the page generated from it
+
+    Returns:
+        PageMetadata: the metadata of the page
+    """
+    with open(source, "r") as f:
+        line = f.readline()
+        fields = {}
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            lines = []
+            read = len(line)
+            closed = False
+            while read < MAX_HEADER_BYTES:
+                line = f.readline()
+                if not line:
+                    break
+                read += len(line)
+                if line.rstrip() == FRONT_MATTER_DELIMITER:
+                    closed = True
+                    break
+                lines.append(line.rstrip("\n"))
+            if closed:
+                fields = parse_front_matter(lines)
+                line = f.readline()
+                while line == "\n":
+                    line = f.readline()
+            else:
+                # an unclosed block is not front matter; the first line is the title line
+                f.seek(0)
+                line = f.readline()
+
+    title = fields.get("title")
+    if not title and line.startswith("# "):
+        title = line[2:].strip()
+    return PageMetadata(source, dest, title or None, fields)
+
+
+class MetadataIndex:
+    """
+    The metadata of every page, persisted between builds and refreshed lazily.
+
+    An entry is keyed by its markdown path and stamped with the size and modification
+    time the file had when its header was read; refresh() only reads the headers of
+    files whose stamp changed, so an unchanged site costs no file reads at all.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str = METADATA_PATH, entries: dict | None = None):
+        """
+        Initialize the MetadataIndex.
+
+        :param path: A string, the path of the index JSON file.
+        :param entries: A dictionary mapping markdown paths to (stamp, PageMetadata) tuples.
+        """
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.read = 0
+
+    @classmethod
+    def load(cls, path: str = METADATA_PATH) -> "MetadataIndex":
+        """Loads an index from disk. A missing, unreadable or outdated index yields an empty one.
+
+        Args:
+            path (str): path to the index JSON file
+
+        Returns:
+            MetadataIndex: the loaded index
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != cls.VERSION:
+            return cls(path)
+        return cls(
+            path,
+            {
+                source: (tuple(entry["stamp"]), PageMetadata.from_dict(entry["page"]))
+                for source, entry in data.get("pages", {}).items()
+            },
+        )
+
+    def refresh(self, pages: list[PlannedFile]) -> None:
+        """Brings the index up to date with the planned pages.
+
+        Args:
+            pages (list[PlannedFile]): the pages of a BuildPlan
+        """
+        entries = {}
+        for planned in pages:
+            stamp = (planned.size, planned.mtime_ns)
+            entry = self.entries.get(planned.source)
+            if entry is None or entry[0] != stamp or entry[1].dest != planned.dest:
+                entry = (stamp, read_header(planned.source, planned.dest))
+                self.read += 1
+            entries[planned.source] = entry
+        self.entries = entries
+
+    def get(self, source: str) -> PageMetadata | None:
+        entry = self.entries.get(source)
+        return entry[1] if entry is not None else None
+
+    def pages(self, directory: str | None = None) -> list[PageMetadata]:
+        """Lists the metadata of the indexed pages, newest first.
+
+        Pages without a date come after the dated ones, ordered by path.
+
+        Args:
+            directory (str | None): only list pages whose markdown is under this directory
+
+        Returns:
+            list[PageMetadata]: the matching pages
+        """
+        prefix = None if directory is None else os.path.join(directory, "")
+        pages = [
+            page
+            for _, page in self.entries.values()
+            if prefix is None or page.source.startswith(prefix)
+        ]
+        pages.sort(key=lambda page: page.source)
+        pages.sort(key=lambda page: page.date or "", reverse=True)
+        return pages
+
+    def tagged(self, tag: str) -> list[PageMetadata]:
+        return [page for page in self.pages() if tag in page.tags]
+
+    def save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": self.VERSION,
+                    "pages": {
+                        source: {"stamp": list(stamp), "page": page.to_dict()}
+                        for source, (stamp, page) in sorted(self.entries.items())
+                    },
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
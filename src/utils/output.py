@@ -0,0 +1,227 @@
+import contextlib
+import json
+import os
+import shutil
+
+CHANGES_PATH = ".cache/changes.json"
+
+
+class OutputFile:
+    """
+    A text file that is only replaced when the text written to it differs from its content.
+
+    Chunks are compared against the existing file as they are written, so nothing more
+    than a chunk is held in memory. At the first difference the output switches to a
+    temporary file next to the target, starting with the prefix that matched; closing
+    renames it over the target. A file whose text is unchanged is left alone, keeping
+    its modification time, so deployments comparing mtimes or checksums skip it.
+
+    Use it as a context manager: the file is committed when the block exits normally
+    and the temporary file removed when it raises.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the OutputFile.
+
+        :param path: A string, the path of the file to write.
+        """
+        self.path = path
+        self.changed = False
+        self._matched = 0
+        self._tmp_path = None
+        self._out = None
+        # every handle is opened through _open, so closing this stack closes them all
+        self._files = contextlib.ExitStack()
+        try:
+            self._old = self._open(path, "rb")
+        except FileNotFoundError:
+            self._old = None
+            self._diverge()
+
+    def _open(self, path: str, mode: str):
+        return self._files.enter_context(open(path, mode))
+
+    def _diverge(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self._out = self._open(self._tmp_path, "wb")
+        if self._old is not None:
+            # the new text starts with what matched so far
+            self._old.seek(0)
+            remaining = self._matched
+            while remaining:
+                data = self._old.read(min(remaining, 65536))
+                self._out.write(data)
+                remaining -= len(data)
+            self._old = None
+        self.changed = True
+
+    def write(self, text: str) -> None:
+        data = text.encode()
+        if self._out is None:
+            if self._old.read(len(data)) == data:
+                self._matched += len(data)
+                return
+            self._diverge()
+        self._out.write(data)
+
+    def close(self) -> bool:
+        """Replaces the target with the new text if it differs.
+
+        Returns:
+            bool: whether the file was written
+        """
+        if self._out is None:
+            longer = self._old.read(1) != b""
+            if not longer:
+                self._files.close()
+                self._old = None
+                return False
+            # the old file had more text after the new one ended
+            self._diverge()
+        self._files.close()
+        self._out = None
+        os.replace(self._tmp_path, self.path)
+        return True
+
+    def discard(self) -> None:
+        self._files.close()
+        self._old = None
+        if self._out is not None:
+            self._out = None
+            os.remove(self._tmp_path)
+        self.changed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.changed = self.close()
+        else:
+            self.discard()
+        return False
+
+
+def write_output(path: str, text: str | bytes) -> bool:
+    """Writes a file atomically, unless it already holds exactly that content.
+
+    Args:
+        path (str): path of the file to write
+        text (str | bytes): the new content, encoded as UTF-8 if it is text
+
+    Returns:
+        bool: whether the file was written
+    """
+    data = text if isinstance(text, bytes) else text.encode()
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove_temp(tmp_path)
+        raise
+    return True
+
+
+def copy_output(source: str, dest: str) -> None:
+    """Copies a file with its metadata, atomically replacing the destination."""
+    tmp_path = f"{dest}.{os.getpid()}.tmp"
+    try:
+        shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, dest)
+    except BaseException:
+        _remove_temp(tmp_path)
+        raise
+
+
+def _remove_temp(tmp_path: str) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(tmp_path)
+
+
+def snapshot_outputs(root: str) -> dict[str, tuple[int, int, int]]:
+    """Records the size, modification time and inode of every file under a directory.
+
+    A file replaced by a rename gets a new inode, so a rewrite is noticed even when it
+    keeps the size and lands within the clock's resolution. Inodes come with the
+    directory entries, so this costs one stat call per file.
+
+    Args:
+        root (str): path to the output directory, which may be missing
+
+    Returns:
+        dict: paths relative to the root, with / separators, mapped to their stamps
+    """
+    files = {}
+    if not os.path.isdir(root):
+        return files
+    stack = [(root, "")]
+    while stack:
+        directory, prefix = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append((entry.path, f"{prefix}{entry.name}/"))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[prefix + entry.name] = (
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                        entry.inode(),
+                    )
+    return files
+
+
+class OutputChanges:
+    """
+    The files of the output directory that a build added, changed or removed.
+
+    Computed by comparing snapshots taken before and after the build, so every way a
+    build writes output, from any process, is accounted for. With write-if-changed
+    output, a page regenerated with identical bytes is not reported.
+    """
+
+    def __init__(self, before: dict, after: dict):
+        """
+        Initialize the OutputChanges from two snapshots of the output directory.
+
+        :param before: A dictionary returned by snapshot_outputs before the build.
+        :param after: A dictionary returned by snapshot_outputs after the build.
+        """
+        self.added = sorted(after.keys() - before.keys())
+        self.removed = sorted(before.keys() - after.keys())
+        self.changed = sorted(
+            path for path in after.keys() & before.keys() if after[path] != before[path]
+        )
+
+    def to_dict(self) -> dict:
+        return {"added": self.added, "changed": self.changed, "removed": self.removed}
+
+    def save(self, path: str = CHANGES_PATH) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def summary(self) -> str:
+        return (
+            f"Output: {len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed"
+        )
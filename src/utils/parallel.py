@@ -0,0 +1,138 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.cache import ParseCache
+from utils.helpers import generate_page
+from utils.manifest import BuildManifest
+from utils.profiler import Profiler
+from utils.template import Template
+
+
+class BuildError(Exception):
+    """
+    Raised when one or more pages of a build failed to generate.
+    """
+
+    def __init__(self, failures: list[tuple[str, Exception]]):
+        """
+        Initialize the BuildError with every failure of the build.
+
+        :param failures: A list of (markdown path, exception) tuples, in plan order.
+        """
+        self.failures = failures
+        details = "\n".join(
+            f"  {source}: {type(error).__name__}: {error}" for source, error in failures
+        )
+        super().__init__(f"{len(failures)} page(s) failed to generate:\n{details}")
+
+
+def _generate_page_task(
+    source: str,
+    template_path: str,
+    dest: str,
+    basepath: str,
+    template: Template,
+    profile: bool,
+    cache: ParseCache | None,
+    static_dir: str | None,
+) -> tuple[list[str], Profiler | None, dict | None]:
+    """Generates one page in a worker and returns what it recorded for the parent to merge."""
+    profiler = Profiler() if profile else None
+    stats_before = dict(cache.stats) if cache is not None else None
+    assets = generate_page(
+        source, template_path, dest, basepath, template, profiler, cache, static_dir
+    )
+    if cache is None:
+        return assets, profiler, None
+    return (
+        assets,
+        profiler,
+        {name: count - stats_before[name] for name, count in cache.stats.items()},
+    )
+
+
+def default_jobs() -> int:
+    """Returns the number of CPU cores available to this process."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def generate_pages_parallel(
+    pages: list[tuple[str, str]],
+    template_path: str,
+    basepath: str,
+    jobs: int,
+    manifest: BuildManifest | None = None,
+    profiler: Profiler | None = None,
+    cache: ParseCache | None = None,
+    static_dir: str | None = None,
+    sizes: dict[str, int] | None = None,
+) -> None:
+    """Generates the planned pages in a pool of worker processes.
+
+    Pages that are up to date according to the manifest are skipped before any work is
+    dispatched. Every page is attempted even if some fail; the failures are then raised
+    together, in plan order, so the outcome does not depend on scheduling.
+
+    Args:
+        pages (list): (markdown path, HTML path) tuples as returned by plan_pages
+        template_path (str): path to the template file
+        basepath (str): basepath to prefix absolute links with
+        jobs (int): number of worker processes
+        manifest (BuildManifest | None): manifest of the previous build, updated in place
+        profiler (Profiler | None): receives the times recorded in every worker
+        cache (ParseCache | None): cache of rendered page bodies shared by the workers
+        static_dir (str | None): path to the static directory, whose referenced files are recorded as page dependencies
+        sizes (dict | None): markdown sizes from a BuildPlan; the largest pages are then dispatched first, so no long page starts last
+
+    Raises:
+        BuildError: if any page failed to generate
+    """
+    if manifest is not None:
+        stale = []
+        for source, dest in pages:
+            if manifest.is_fresh(source, template_path, dest, basepath):
+                manifest.skipped += 1
+            else:
+                stale.append((source, dest))
+        pages = stale
+
+    template = Template.from_file(template_path)
+    failures = []
+    with ProcessPoolExecutor(max_workers=max(1, jobs)) as executor:
+        order = pages
+        if sizes is not None:
+            order = sorted(pages, key=lambda page: sizes.get(page[0], 0), reverse=True)
+        submitted = {
+            page: executor.submit(
+                _generate_page_task,
+                page[0],
+                template_path,
+                page[1],
+                basepath,
+                template,
+                profiler is not None,
+                cache,
+                static_dir,
+            )
+            for page in order
+        }
+        futures = [submitted[page] for page in pages]
+        for (source, dest), future in zip(pages, futures):
+            error = future.exception()
+            if error is not None:
+                failures.append((source, error))
+                continue
+            assets, page_profile, cache_stats = future.result()
+            if profiler is not None:
+                profiler.merge(page_profile)
+            if cache is not None:
+                cache.merge_stats(cache_stats)
+            if manifest is not None:
+                manifest.record(source, template_path, dest, basepath, assets)
+                manifest.generated += 1
+
+    if failures:
+        raise BuildError(failures)
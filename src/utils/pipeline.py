@@ -0,0 +1,280 @@
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from markdown.converter import markdown_to_html
+from utils.cache import ParseCache
+from utils.graph import referenced_assets
+from utils.helpers import split_page
+from utils.manifest import BuildManifest
+from utils.output import write_output
+from utils.parallel import BuildError
+from utils.profiler import NULL_PROFILER, Profiler
+from utils.template import Template
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# a rendered page is charged as this many times the size of its markdown
+PAGE_EXPANSION = 3
+
+_worker = {}
+
+
+class ByteBudget:
+    """
+    A counting limit on the bytes held by pages that are in flight in a pipeline.
+
+    acquire() blocks while the pages already admitted would exceed the limit, and
+    release() admits the next ones once a page has been written. A single page larger
+    than the whole limit is still admitted when nothing else is in flight.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Initialize the ByteBudget.
+
+        :param limit: An integer, the number of bytes that may be in flight at once.
+        """
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size: int) -> None:
+        with self._condition:
+            while self.used and self.used + size > self.limit:
+                self._condition.wait()
+            self.used += size
+            self.peak = max(self.peak, self.used)
+
+    def release(self, size: int) -> None:
+        with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+
+def _init_worker(
+    template: Template,
+    basepath: str,
+    cache: ParseCache | None,
+    static_dir: str | None,
+    profile: bool = False,
+) -> None:
+    _worker.update(
+        template=template,
+        basepath=basepath,
+        cache=cache,
+        static_dir=static_dir,
+        profile=profile,
+    )
+
+
+def _render_page(
+    markdown: str, source: str = ""
+) -> tuple[str, list[str], dict | None, Profiler | None]:
+    """Renders a markdown document into a full page in a worker process.
+
+    Args:
+        markdown (str): content of the markdown document
+        source (str): path of the markdown file, to attribute profiled time to
+
+    Returns:
+        tuple: the page, the static files it references, the cache stats delta and
+        the times recorded if the worker profiles
+    """
+    cache = _worker["cache"]
+    profile = Profiler() if _worker.get("profile") else None
+    profiler = profile if profile is not None else NULL_PROFILER
+    stats_before = dict(cache.stats) if cache is not None else None
+    with profiler.page(source):
+        html = None
+        if cache is not None:
+            with profiler.phase("cache"):
+                html = cache.get(markdown)
+        title, body = split_page(markdown)
+        if html is None:
+            with profiler.phase("parse"):
+                html = markdown_to_html(body, profile)
+            if cache is not None:
+                with profiler.phase("cache"):
+                    cache.put(markdown, html)
+        with profiler.phase("template"):
+            page = _worker["template"].render(
+                {"Title": title, "Content": html}, _worker["basepath"]
+            )
+    static_dir = _worker["static_dir"]
+    assets = referenced_assets(markdown, static_dir) if static_dir is not None else []
+    if cache is None:
+        return page, assets, None, profile
+    return (
+        page,
+        assets,
+        {name: count - stats_before[name] for name, count in cache.stats.items()},
+        profile,
+    )
+
+
+def generate_pages_pipeline(
+    pages: list[tuple[str, str]],
+    template_path: str,
+    basepath: str,
+    jobs: int,
+    manifest: BuildManifest | None = None,
+    cache: ParseCache | None = None,
+    static_dir: str | None = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    readers: int = 4,
+    sizes: dict[str, int] | None = None,
+    profiler: Profiler | None = None,
+) -> ByteBudget:
+    """Generates the planned pages in a staged pipeline, so reading, parsing and writing overlap.
+
+    Reader threads load markdown files, a pool of worker processes parses, renders and
+    templates them, and a writer thread writes the pages as they come in. The stages are
+    connected by bounded queues, and every page is charged against a byte budget from
+    the moment it is read until it is written, so a slow writer stalls the readers
+    instead of letting pages pile up in memory.
+
+    Args:
+        pages (list): (markdown path, HTML path) tuples as returned by plan_pages
+        template_path (str): path to the template file
+        basepath (str): basepath to prefix absolute links with
+        jobs (int): number of worker processes
+        manifest (BuildManifest | None): manifest of the previous build, updated in place
+        cache (ParseCache | None): cache of rendered page bodies shared by the workers
+        static_dir (str | None): path to the static directory, whose referenced files are recorded as page dependencies
+        max_bytes (int): bytes of markdown and rendered pages that may be in flight at once
+        readers (int): number of reader threads
+        sizes (dict | None): markdown sizes from a BuildPlan, so readers need not stat the files again
+        profiler (Profiler | None): receives the times recorded by every stage; each thread and worker records its own and they are merged at the end
+
+    Returns:
+        ByteBudget: the budget of the run, whose peak records the most bytes in flight
+
+    Raises:
+        BuildError: if any page failed to generate, with the failures in plan order
+    """
+    if manifest is not None:
+        stale = []
+        for source, dest in pages:
+            if manifest.is_fresh(source, template_path, dest, basepath):
+                manifest.skipped += 1
+            else:
+                stale.append((source, dest))
+        pages = stale
+
+    jobs = max(1, jobs)
+    readers = max(1, min(readers, len(pages)))
+    budget = ByteBudget(max_bytes)
+    pending = queue.Queue()
+    for index, page in enumerate(pages):
+        pending.put((index, *page))
+    read_queue = queue.Queue(maxsize=jobs * 2)
+    write_queue = queue.Queue(maxsize=jobs * 2)
+    failures = []
+    # Phase timers are not thread-safe, so every thread records into its own profiler
+    stage_profilers = []
+
+    def stage_profiler():
+        if profiler is None:
+            return NULL_PROFILER
+        own = Profiler()
+        stage_profilers.append(own)
+        return own
+
+    def read():
+        own = stage_profiler()
+        while True:
+            try:
+                index, source, dest = pending.get_nowait()
+            except queue.Empty:
+                read_queue.put(None)
+                return
+            size = 0
+            try:
+                if sizes is not None and source in sizes:
+                    size = sizes[source] * PAGE_EXPANSION
+                else:
+                    size = os.path.getsize(source) * PAGE_EXPANSION
+                budget.acquire(size)
+                with own.page(source), own.phase("read"), open(source, "r") as f:
+                    markdown = f.read()
+            except (OSError, ValueError) as error:
+                # ValueError covers sources that are not valid UTF-8
+                read_queue.put((index, source, dest, size, error))
+                continue
+            read_queue.put((index, source, dest, size, markdown))
+
+    def write():
+        own = stage_profiler()
+        while True:
+            item = write_queue.get()
+            if item is None:
+                return
+            source, dest, size, result = item
+            try:
+                # a read error, or whatever the worker raised while rendering
+                error = result if isinstance(result, Exception) else result.exception()
+                if error is None:
+                    page, assets, cache_stats, page_profile = result.result()
+                    print(
+                        f"Generating page from {source} to {dest} using {template_path}"
+                    )
+                    try:
+                        with own.page(source), own.phase("write"):
+                            write_output(dest, page)
+                    except OSError as write_error:
+                        error = write_error
+            finally:
+                budget.release(size)
+            if error is not None:
+                failures.append((source, error))
+                continue
+            if cache is not None:
+                cache.merge_stats(cache_stats)
+            if page_profile is not None:
+                own.merge(page_profile)
+            if manifest is not None:
+                manifest.record(source, template_path, dest, basepath, assets)
+                manifest.generated += 1
+
+    reader_threads = [
+        threading.Thread(target=read, daemon=True) for _ in range(readers)
+    ]
+    writer = threading.Thread(target=write, daemon=True)
+    for thread in reader_threads:
+        thread.start()
+    writer.start()
+
+    template = Template.from_file(template_path)
+    order = {}
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(template, basepath, cache, static_dir, profiler is not None),
+        ) as executor:
+            finished = 0
+            while finished < readers:
+                item = read_queue.get()
+                if item is None:
+                    finished += 1
+                    continue
+                index, source, dest, size, markdown = item
+                order[source] = index
+                if isinstance(markdown, Exception):
+                    write_queue.put((source, dest, size, markdown))
+                else:
+                    future = executor.submit(_render_page, markdown, source)
+                    write_queue.put((source, dest, size, future))
+    finally:
+        write_queue.put(None)
+        writer.join()
+    # the readers have all finished once the last of them signalled the end
+    for own in stage_profilers:
+        profiler.merge(own)
+
+    if failures:
+        failures.sort(key=lambda failure: order[failure[0]])
+        raise BuildError(failures)
+    return budget
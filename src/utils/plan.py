@@ -0,0 +1,137 @@
+import os
+
+
+class PlannedFile:
+    """
+    A source file of the build, with its destination and the stat info of the scan.
+    """
+
+    __slots__ = ("dest", "mtime_ns", "size", "source")
+
+    def __init__(self, source: str, dest: str, size: int, mtime_ns: int):
+        """
+        Initialize the PlannedFile.
+
+        :param source: A string, the path of the source file.
+        :param dest: A string, the path of the output file.
+        :param size: An integer, the size of the source file in bytes.
+        :param mtime_ns: An integer, the modification time of the source file in ns.
+        """
+        self.source = source
+        self.dest = dest
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, PlannedFile)
+            and self.source == other.source
+            and self.dest == other.dest
+            and self.size == other.size
+            and self.mtime_ns == other.mtime_ns
+        )
+
+    def __repr__(self):
+        return (
+            f"PlannedFile({self.source!r}, {self.dest!r}, {self.size}, {self.mtime_ns})"
+        )
+
+
+def scan_tree(root: str, dest: str, rename=None) -> list[PlannedFile]:
+    """Lists every file under a directory with os.scandir, one stat call per file.
+
+    Directory entries are told apart with the file type scandir already returned, so
+    directories cost no stat call at all and a file only the one that records its size
+    and modification time.
+
+    Args:
+        root (str): path to the directory to scan
+        dest (str): path to the directory the files map to
+        rename (callable | None): maps a file name to its output name, or to None to skip the file
+
+    Returns:
+        list: the files found, sorted by source path
+    """
+    files = []
+    stack = [(root, dest)]
+    while stack:
+        directory, dest_directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append((entry.path, os.path.join(dest_directory, entry.name)))
+                    continue
+                if not entry.is_file():
+                    continue
+                name = entry.name if rename is None else rename(entry.name)
+                if name is None:
+                    continue
+                stat = entry.stat()
+                files.append(
+                    PlannedFile(
+                        entry.path,
+                        os.path.join(dest_directory, name),
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                    )
+                )
+    files.sort(key=lambda planned: planned.source)
+    return files
+
+
+def page_name(name: str) -> str | None:
+    """Returns the output name of a markdown file, or None for any other file."""
+    if not name.endswith(".md"):
+        return None
+    return name.replace(".md", ".html")
+
+
+class BuildPlan:
+    """
+    Every page and asset of a site, discovered in a single walk before anything is built.
+
+    Later stages take their work from the plan instead of walking the tree again: the
+    page list feeds sequential, parallel and pipelined generation, the asset list feeds
+    the static sync with the stat info already gathered, and the sizes feed reports.
+    """
+
+    def __init__(self, pages: list[PlannedFile], assets: list[PlannedFile]):
+        """
+        Initialize the BuildPlan.
+
+        :param pages: A list of PlannedFile, the markdown files and their HTML pages.
+        :param assets: A list of PlannedFile, the static files and their copies.
+        """
+        self.pages = pages
+        self.assets = assets
+
+    @classmethod
+    def scan(cls, content_dir: str, static_dir: str, dest_dir: str) -> "BuildPlan":
+        """Walks the content and static directories once each.
+
+        Args:
+            content_dir (str): path to the content directory
+            static_dir (str): path to the static directory, which may be missing
+            dest_dir (str): path to the output directory
+
+        Returns:
+            BuildPlan: the plan of the build
+        """
+        pages = scan_tree(content_dir, dest_dir, page_name)
+        assets = scan_tree(static_dir, dest_dir) if os.path.isdir(static_dir) else []
+        return cls(pages, assets)
+
+    def page_pairs(self) -> list[tuple[str, str]]:
+        """Returns the (markdown path, HTML path) tuples, as plan_pages does."""
+        return [(page.source, page.dest) for page in self.pages]
+
+    def page_sizes(self) -> dict[str, int]:
+        return {page.source: page.size for page in self.pages}
+
+    def summary(self) -> str:
+        page_bytes = sum(page.size for page in self.pages)
+        asset_bytes = sum(asset.size for asset in self.assets)
+        return (
+            f"Planned {len(self.pages)} pages ({page_bytes / 1024:.1f} KiB), "
+            f"{len(self.assets)} assets ({asset_bytes / 1024:.1f} KiB)"
+        )
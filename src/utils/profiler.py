@@ -0,0 +1,155 @@
+import json
+import time
+from contextlib import nullcontext
+
+NULL_PHASE = nullcontext()
+
+
+class Phase:
+    """
+    A reusable timer accumulating the wall and CPU time spent in one build phase.
+    """
+
+    __slots__ = ("_cpu_start", "_wall_start", "count", "cpu", "wall")
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.count = 0
+
+    def __enter__(self):
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall += time.perf_counter() - self._wall_start
+        self.cpu += time.process_time() - self._cpu_start
+        self.count += 1
+        return False
+
+
+class Profiler:
+    """
+    Records wall and CPU time per build phase and per page.
+
+    Phases are timed with `with profiler.phase("read"):` blocks; nested phases are
+    named with a slash (e.g. "parse/inline") and are included in their parent's time.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.phases = {}
+        self.pages = {}
+
+    def phase(self, name: str) -> Phase:
+        """Returns the timer of a phase, to be used as a context manager.
+
+        Args:
+            name (str): name of the phase
+
+        Returns:
+            Phase: the timer accumulating that phase's time
+        """
+        timer = self.phases.get(name)
+        if timer is None:
+            timer = self.phases[name] = Phase()
+        return timer
+
+    def page(self, path: str) -> Phase:
+        """Returns the timer of a page, to be used as a context manager.
+
+        Args:
+            path (str): path of the page's markdown file
+
+        Returns:
+            Phase: the timer accumulating that page's time
+        """
+        timer = self.pages.get(path)
+        if timer is None:
+            timer = self.pages[path] = Phase()
+        return timer
+
+    def merge(self, other: "Profiler") -> None:
+        """Adds the times recorded by another profiler, e.g. one from a worker process.
+
+        Args:
+            other (Profiler): the profiler to merge into this one
+        """
+        for target, source in ((self.phases, other.phases), (self.pages, other.pages)):
+            for name, timer in source.items():
+                merged = target.get(name)
+                if merged is None:
+                    merged = target[name] = Phase()
+                merged.wall += timer.wall
+                merged.cpu += timer.cpu
+                merged.count += timer.count
+
+    def to_dict(self, top: int | None = None) -> dict:
+        """Returns the recorded times as plain data.
+
+        Args:
+            top (int | None): number of slowest pages to include, all if None
+
+        Returns:
+            dict: phases and pages mapped to their wall time, CPU time and call count
+        """
+        pages = sorted(self.pages.items(), key=lambda item: item[1].wall, reverse=True)
+        return {
+            "phases": {
+                name: {"wall": timer.wall, "cpu": timer.cpu, "count": timer.count}
+                for name, timer in sorted(self.phases.items())
+            },
+            "pages": [
+                {"path": path, "wall": timer.wall, "cpu": timer.cpu}
+                for path, timer in pages[:top]
+            ],
+        }
+
+    def write_json(self, path: str, top: int | None = None) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(top), f, indent=2)
+
+    def summary(self, top: int = 10) -> str:
+        """Formats the phase totals and the slowest pages as a table.
+
+        Args:
+            top (int): number of slowest pages to list
+
+        Returns:
+            str: the summary table
+        """
+        data = self.to_dict(top)
+        lines = [f"{'phase':<20}{'wall (ms)':>12}{'cpu (ms)':>12}{'calls':>8}"]
+        for name, timer in data["phases"].items():
+            lines.append(
+                f"{name:<20}{timer['wall'] * 1000:>12.2f}"
+                f"{timer['cpu'] * 1000:>12.2f}{timer['count']:>8}"
+            )
+        if data["pages"]:
+            lines.append("")
+            lines.append(f"{'slowest pages':<48}{'wall (ms)':>12}{'cpu (ms)':>12}")
+            for page in data["pages"]:
+                lines.append(
+                    f"{page['path']:<48}{page['wall'] * 1000:>12.2f}"
+                    f"{page['cpu'] * 1000:>12.2f}"
+                )
+        return "\n".join(lines)
+
+
+class NullProfiler:
+    """
+    A profiler that records nothing, used when profiling is disabled.
+    """
+
+    enabled = False
+
+    def phase(self, name: str):
+        return NULL_PHASE
+
+    def page(self, path: str):
+        return NULL_PHASE
+
+
+NULL_PROFILER = NullProfiler()
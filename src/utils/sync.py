@@ -0,0 +1,105 @@
+import os
+
+from utils.manifest import file_hash
+from utils.output import copy_output
+from utils.plan import PlannedFile, scan_tree
+
+
+class SyncResult:
+    """
+    The outcome of a directory sync, as paths relative to the destination.
+    """
+
+    def __init__(self):
+        self.copied = []
+        self.deleted = []
+        self.unchanged = []
+
+    @property
+    def owned(self) -> list[str]:
+        """Every file the sync is now responsible for in the destination."""
+        return sorted(self.copied + self.unchanged)
+
+    def __repr__(self):
+        return f"SyncResult(copied={len(self.copied)}, deleted={len(self.deleted)}, unchanged={len(self.unchanged)})"
+
+
+def _is_unchanged(planned: PlannedFile, checksum: bool) -> bool:
+    try:
+        dest_stat = os.stat(planned.dest)
+    except FileNotFoundError:
+        return False
+    if planned.size != dest_stat.st_size:
+        return False
+    if checksum:
+        return file_hash(planned.source) == file_hash(planned.dest)
+    return planned.mtime_ns == dest_stat.st_mtime_ns
+
+
+def remove_empty_parents(path: str, root: str) -> None:
+    """Removes the directories between a deleted file and root that are now empty."""
+    directory = os.path.dirname(path)
+    while os.path.abspath(directory) != os.path.abspath(root):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
+
+
+def sync_directory(
+    src: str,
+    dest: str,
+    owned: list[str] | None = None,
+    checksum: bool = False,
+    files: list[PlannedFile] | None = None,
+) -> SyncResult:
+    """Makes the destination directory mirror the source directory, copying only what changed.
+
+    A file is copied when it is missing from the destination or differs in size or
+    modification time (or in content hash when checksum is set). Files are copied with
+    their modification time so an unchanged file is recognised on the next sync.
+
+    Only files listed in owned, i.e. copied by a previous sync, are deleted when they no
+    longer exist in the source; anything else in the destination, such as generated
+    pages, is left alone.
+
+    Args:
+        src (str): path to the source directory
+        dest (str): path to the destination directory
+        owned (list[str] | None): paths relative to dest that a previous sync copied
+        checksum (bool): compare file content hashes instead of modification times
+        files (list[PlannedFile] | None): the source files as scanned by a BuildPlan, scanned here if not given
+
+    Returns:
+        SyncResult: the copied, deleted and unchanged files
+    """
+    if not os.path.exists(src):
+        raise FileNotFoundError(f"Source directory {src} does not exist.")
+
+    if files is None:
+        files = scan_tree(src, dest)
+
+    result = SyncResult()
+    present = set()
+    # directory by directory, each directory's own files before its subdirectories
+    for planned in sorted(files, key=lambda planned: os.path.split(planned.source)):
+        relative_path = os.path.relpath(planned.source, src)
+        present.add(relative_path)
+        if _is_unchanged(planned, checksum):
+            result.unchanged.append(relative_path)
+            continue
+        print(f"Copying file {planned.source} to {planned.dest}")
+        os.makedirs(os.path.dirname(planned.dest), exist_ok=True)
+        copy_output(planned.source, planned.dest)
+        result.copied.append(relative_path)
+
+    for relative_path in sorted(set(owned or []) - present):
+        dest_path = os.path.join(dest, relative_path)
+        if os.path.isfile(dest_path):
+            print(f"Deleting stale file {dest_path}")
+            os.remove(dest_path)
+            remove_empty_parents(dest_path, dest)
+        result.deleted.append(relative_path)
+
+    return result
@@ -0,0 +1,129 @@
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ *(\w+) *\}\}")
+ROOT_ATTRIBUTES = ('href="', 'src="')
+
+
+def rewrite_root_links(html: str, basepath: str) -> str:
+    """Prefixes root-relative href and src attributes with the basepath.
+
+    Args:
+        html (str): HTML to rewrite
+        basepath (str): basepath to prefix absolute links with
+
+    Returns:
+        str: the rewritten HTML
+    """
+    if basepath == "/":
+        return html
+    for attribute in ROOT_ATTRIBUTES:
+        if attribute + "/" in html:
+            html = html.replace(attribute + "/", attribute + basepath)
+    return html
+
+
+class Template:
+    """
+    A page template compiled into static segments and named placeholder slots.
+
+    The template `<title>{{ Title }}</title>` compiles to the segments
+    `["<title>", "</title>"]` and the slots `["Title"]`, so rendering a page is
+    a single join of the segments with the slot values in between.
+    """
+
+    def __init__(self, source: str):
+        """
+        Initialize the Template by compiling its source.
+
+        :param source: A string containing the template, with placeholders written as `{{ Name }}`.
+        """
+        self.segments = []
+        self.slots = []
+        self.placeholders = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            self.segments.append(source[position : match.start()])
+            self.slots.append(match.group(1))
+            self.placeholders.append(match.group(0))
+            position = match.end()
+        self.segments.append(source[position:])
+        self._rewritten_segments = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> "Template":
+        """Reads and compiles a template file.
+
+        Args:
+            path (str): path to the template file
+
+        Returns:
+            Template: the compiled template
+        """
+        with open(path, "r") as f:
+            return cls(f.read())
+
+    def _segments_for(self, basepath: str) -> list[str]:
+        if basepath not in self._rewritten_segments:
+            self._rewritten_segments[basepath] = [
+                rewrite_root_links(segment, basepath) for segment in self.segments
+            ]
+        return self._rewritten_segments[basepath]
+
+    def iter_render(self, values: dict, basepath: str = "/"):
+        """Renders the template as a stream of string chunks.
+
+        Root-relative href and src attributes are prefixed with the basepath, both in
+        the template itself and in the values. Placeholders without a value are left
+        in the output untouched. An iterable value is consumed the first time its
+        placeholder is rendered.
+
+        Args:
+            values (dict): placeholder names mapped to a string, or to an iterable of string chunks
+            basepath (str): basepath to prefix absolute links with
+
+        Returns:
+            Iterator[str]: the chunks of the rendered page
+        """
+        segments = self._segments_for(basepath)
+        yield segments[0]
+        for index, slot in enumerate(self.slots):
+            value = values.get(slot)
+            if value is None:
+                yield self.placeholders[index]
+            else:
+                chunks = [value] if isinstance(value, str) else value
+                for position, chunk in enumerate(chunks):
+                    if (
+                        position == 0
+                        and basepath != "/"
+                        and chunk.startswith("/")
+                        and self.segments[index].endswith(ROOT_ATTRIBUTES)
+                    ):
+                        # the attribute is split between the template and the value
+                        yield basepath + rewrite_root_links(chunk[1:], basepath)
+                    else:
+                        yield rewrite_root_links(chunk, basepath)
+            yield segments[index + 1]
+
+    def render(self, values: dict, basepath: str = "/") -> str:
+        """Renders the template with the given placeholder values.
+
+        Args:
+            values (dict): placeholder names mapped to a string, or to an iterable of string chunks
+            basepath (str): basepath to prefix absolute links with
+
+        Returns:
+            str: the rendered page
+        """
+        return "".join(self.iter_render(values, basepath))
+
+    def write(self, stream, values: dict, basepath: str = "/") -> None:
+        """Renders the template straight into a writable text stream.
+
+        Args:
+            stream: an object with a write(str) method, such as an open file
+            values (dict): placeholder names mapped to a string, or to an iterable of string chunks
+            basepath (str): basepath to prefix absolute links with
+        """
+        for chunk in self.iter_render(values, basepath):
+            stream.write(chunk)
@@ -0,0 +1,247 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def snapshot(paths: list[str]) -> dict[str, tuple[int, int]]:
+    """Records the modification time and size of every file under the given paths.
+
+    Args:
+        paths (list): files and directories to scan
+
+    Returns:
+        dict: file paths mapped to (mtime in ns, size)
+    """
+    files = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                for name in names:
+                    file_path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(file_path)
+                    except FileNotFoundError:
+                        continue
+                    files[file_path] = (stat.st_mtime_ns, stat.st_size)
+        elif os.path.exists(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class PollingWatcher:
+    """
+    Detects changed files by comparing snapshots of the watched paths.
+    """
+
+    def __init__(self, paths: list[str], interval: float = 0.1):
+        """
+        Initialize the PollingWatcher with the paths to watch.
+
+        :param paths: A list of files and directories to watch.
+        :param interval: A float, the number of seconds between two snapshots.
+        """
+        self.paths = [os.path.normpath(path) for path in paths]
+        self.interval = interval
+        self.files = snapshot(self.paths)
+
+    def poll(self, timeout: float | None = None) -> set[str]:
+        """Waits for changes.
+
+        Args:
+            timeout (float | None): seconds to wait at most, forever if None
+
+        Returns:
+            set: paths of the files added, modified or removed, empty on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            files = snapshot(self.paths)
+            changed = {
+                path
+                for path in files.keys() | self.files.keys()
+                if files.get(path) != self.files.get(path)
+            }
+            self.files = files
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detects changed files with Linux inotify, loaded from libc through ctypes.
+
+    Directories are watched recursively. A single file is watched through its parent
+    directory, so editors that save by replacing the file are still noticed.
+    """
+
+    def __init__(self, paths: list[str]):
+        """
+        Initialize the InotifyWatcher and add watches for the paths.
+
+        :param paths: A list of files and directories to watch.
+        :raises OSError: If inotify is not available on this system.
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+        self.directories = {}
+        self.roots = []
+        self.files = set()
+        for path in paths:
+            path = os.path.normpath(path)
+            if os.path.isdir(path):
+                self.roots.append(path)
+                self._watch_tree(path)
+            else:
+                self.files.add(path)
+                self._watch(os.path.dirname(path) or ".")
+
+    def _watch(self, directory: str) -> None:
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), directory)
+        self.directories[wd] = directory
+
+    def _watch_tree(self, root: str) -> set[str]:
+        found = set()
+        for directory, _, names in os.walk(root):
+            self._watch(directory)
+            found.update(os.path.join(directory, name) for name in names)
+        return found
+
+    def _is_watched(self, path: str) -> bool:
+        if path in self.files:
+            return True
+        return any(path.startswith(root + os.sep) for root in self.roots)
+
+    def _read_events(self) -> set[str]:
+        changed = set()
+        try:
+            buffer = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # events were dropped; report everything so nothing is missed
+                changed.update(snapshot(self.roots + list(self.files)))
+                continue
+            directory = self.directories.get(wd)
+            if directory is None or mask & IN_IGNORED:
+                self.directories.pop(wd, None)
+                continue
+            path = os.path.normpath(os.path.join(directory, name))
+            if not self._is_watched(path):
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self._watch_tree(path))
+                continue
+            changed.add(path)
+        return changed
+
+    def poll(self, timeout: float | None = None) -> set[str]:
+        """Waits for changes.
+
+        Args:
+            timeout (float | None): seconds to wait at most, forever if None
+
+        Returns:
+            set: paths of the files added, modified or removed, empty on timeout
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        return self._read_events()
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def create_watcher(paths: list[str], polling: bool = False):
+    """Creates an inotify watcher where available, falling back to polling.
+
+    Args:
+        paths (list): files and directories to watch
+        polling (bool): always use the polling watcher
+
+    Returns:
+        InotifyWatcher | PollingWatcher: the watcher
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths)
+
+
+def watch(watcher, on_change, debounce: float = 0.05) -> None:
+    """Calls on_change with each burst of changes, until interrupted.
+
+    Changes arriving less than debounce seconds apart are gathered into one burst, so
+    an editor saving several files, or one file in several writes, triggers one call.
+
+    Args:
+        watcher (InotifyWatcher | PollingWatcher): the watcher to read changes from
+        on_change (callable): called with the set of changed paths
+        debounce (float): seconds of quiet that end a burst
+    """
+    while True:
+        changes = watcher.poll()
+        while changes:
+            more = watcher.poll(debounce)
+            if not more:
+                break
+            changes |= more
+        if changes:
+            on_change(changes)